@@ -4,16 +4,38 @@ Streamlit App: Agent WITHOUT Memory Demo
 Run with: streamlit run no_memory_demo.py
 """
 
+import os
+import sys
+import time
+from pathlib import Path
+
 import streamlit as st
-from strands import Agent
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.startup import create_model, prewarm
+from common.streaming import StreamedTurn, format_timings
+from common.tracing import Tracer, TracingHookProvider
+
+# Per-turn timing breakdown: MEMORY_TRACING=1 turns it on by default,
+# MEMORY_TRACE_FILE=traces.jsonl also appends every traced turn to a file
+TRACING = os.environ.get("MEMORY_TRACING", "0") == "1"
+TRACE_FILE = os.environ.get("MEMORY_TRACE_FILE")
+
+
+@st.cache_resource
+def get_model():
+    """Bedrock model client shared by every browser session"""
+    return create_model()
 
-def create_agent():
+
+def create_agent(tracer: Tracer):
     """Create agent WITHOUT memory"""
+    from strands import Agent
     agent = Agent(
+        model=get_model(),
         name="TravelAssistant",
         system_prompt="You are a helpful travel assistant. Provide travel recommendations.",
-        hooks=[],
+        hooks=[TracingHookProvider(tracer)],
         tools=[]
     )
     return agent
@@ -24,6 +46,7 @@ def main():
     
     st.title("🤖 Agent WITHOUT Memory Demo")
     st.markdown("Chat with an AI agent that **does NOT remember** previous conversations!")
+    prewarm()  # load strands in the background while the page renders
     
     # Sidebar
     with st.sidebar:
@@ -33,15 +56,21 @@ def main():
             st.session_state.messages = []
             st.rerun()
         
+        stream_responses = st.toggle("Stream responses", value=True)
+        tracing = st.toggle("Trace turns", value=TRACING)
+        
         st.info("💡 **No Memory**: Each message is independent!")
     
     # Initialize session state
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "turn_timings" not in st.session_state:
+        st.session_state.turn_timings = []
     
-    if "agent" not in st.session_state:
-        st.session_state.agent = create_agent()
-        st.success("✅ Agent initialized WITHOUT memory")
+    if "tracer" not in st.session_state:
+        st.session_state.tracer = Tracer(sink_path=TRACE_FILE)
+    tracer = st.session_state.tracer
+    tracer.enabled = tracing
     
     # Display chat messages
     for message in st.session_state.messages:
@@ -50,6 +79,11 @@ def main():
     
     # Chat input
     if prompt := st.chat_input("Ask me about travel..."):
+        # Built on the first prompt, so the page doesn't wait for strands to load
+        if "agent" not in st.session_state:
+            st.session_state.agent = create_agent(tracer)
+            st.success("✅ Agent initialized WITHOUT memory")
+        
         # Add user message
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
@@ -57,21 +91,39 @@ def main():
         
         # Get agent response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    result = st.session_state.agent(prompt)
-                    response = result.message['content'][0]['text']
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                except Exception as e:
-                    error_msg = f"Error: {e}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+            try:
+                with tracer.turn("turn", prompt_chars=len(prompt), streaming=stream_responses):
+                    if stream_responses:
+                        # Render tokens as they arrive instead of waiting for the whole reply
+                        turn = StreamedTurn(st.session_state.agent, prompt)
+                        response = st.write_stream(turn) or str(turn.result)
+                        timings = turn.timings
+                    else:
+                        with st.spinner("Thinking..."):
+                            start = time.perf_counter()
+                            result = st.session_state.agent(prompt)
+                            response = result.message['content'][0]['text']
+                            timings = {"ttft": None, "total": time.perf_counter() - start}
+                        st.markdown(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                st.session_state.turn_timings.append(timings)
+            except Exception as e:
+                error_msg = f"Error: {e}"
+                st.error(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
     
     # Info
     with st.expander("ℹ️ Agent Info"):
         st.write("**Memory:** None")
         st.write(f"**Messages in UI:** {len(st.session_state.messages)}")
+        if st.session_state.turn_timings:
+            st.write(f"**Last turn:** {format_timings(st.session_state.turn_timings[-1])}")
+        last_trace = tracer.last_turn()
+        if last_trace:
+            st.write("**Last turn breakdown:**")
+            st.table(last_trace.breakdown())
+            st.download_button("⬇️ Traces (JSON lines)", tracer.export_jsonl(), "traces.jsonl")
+            st.download_button("⬇️ Traces (OTLP JSON)", tracer.export_otlp(), "traces-otlp.json")
         st.warning("⚠️ Agent cannot access previous conversation context!")
 
 
@@ -4,63 +4,238 @@ Simplified AgentCore Memory Demo
 Shows how short-term memory persists across browser sessions
 """
 
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import streamlit as st
 from datetime import datetime
-from strands import Agent
-from strands.hooks import AgentInitializedEvent, HookProvider, HookRegistry, MessageAddedEvent
-from bedrock_agentcore.memory import MemoryClient
 
+if TYPE_CHECKING:  # strands is imported on first use so the page renders sooner
+    from strands.hooks import AfterInvocationEvent, AgentInitializedEvent, HookRegistry, MessageAddedEvent
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.agent_pool import AgentPool
+from common.batching import EventBatcher
+from common.clients import get_memory_catalog, get_memory_client
+from common.compaction import ConversationCompactor
+from common.context import ContextAssembler
+from common.history_cache import HistoryCache
+from common.journal import EventJournal
+from common.prefetch import Prefetcher
+from common.provisioning import MemoryProvisioner
+from common.resilience import DeadlineExceeded, MemoryUnavailable, ResilientClient
+from common.startup import create_model, prewarm
+from common.streaming import StreamedTurn, format_timings
+from common.tracing import TracedClient, Tracer, TracingHookProvider
+
+# Per-turn timing breakdown: MEMORY_TRACING=1 turns it on by default,
+# MEMORY_TRACE_FILE=traces.jsonl also appends every traced turn to a file
+TRACING = os.environ.get("MEMORY_TRACING", "0") == "1"
+TRACE_FILE = os.environ.get("MEMORY_TRACE_FILE")
+# Messages are journaled to this SQLite file before being sent, so a failed write or a
+# crash doesn't lose them; MEMORY_JOURNAL=0 uses the in-memory EventBatcher instead.
+# The file is locked while the app runs: give a second copy of the app its own file
+JOURNAL_PATH = os.environ.get("MEMORY_JOURNAL",
+                              str(Path.home() / ".agentcore-memory-demo" / "short-term-journal.db"))
+# Agents kept in memory for the whole process (idle ones are rebuilt from the history cache)
+MAX_AGENTS = int(os.environ.get("MEMORY_MAX_AGENTS", "64"))
+AGENT_IDLE_SECONDS = float(os.environ.get("MEMORY_AGENT_IDLE_SECONDS", "1800"))
+# Turns kept verbatim in the agent's context; older ones are summarized (0 keeps everything)
+KEEP_TURNS = int(os.environ.get("MEMORY_KEEP_TURNS", "6"))
+# Memory calls get deadlines (slow history loads are hedged) and a circuit breaker that
+# skips memory while the service is failing; MEMORY_RESILIENCE=0 calls it directly
+RESILIENCE = os.environ.get("MEMORY_RESILIENCE", "1") != "0"
+# When an agent has to be built, load its history in the background while strands loads
+# and the agent is constructed; MEMORY_PREFETCH=0 loads it when the agent starts
+PREFETCH = os.environ.get("MEMORY_PREFETCH", "1") != "0"
 
-class MemoryHookProvider(HookProvider):
-    """Handles loading and saving messages to AgentCore Memory"""
-    def __init__(self, memory_client, memory_id, actor_id, session_id):
+
+class MemoryHookProvider:
+    """Handles loading and saving messages to AgentCore Memory (a strands HookProvider)"""
+    def __init__(self, memory_client, memory_id, actor_id, session_id, batcher: EventBatcher = None,
+                 history_cache: HistoryCache = None, context_assembler: ContextAssembler = None,
+                 tracer: Tracer = None, prefetcher: Prefetcher = None):
         self.memory_client = memory_client
         self.memory_id = memory_id
         self.actor_id = actor_id
         self.session_id = session_id
+        self.batcher = batcher
+        self.history_cache = history_cache
+        self.context_assembler = context_assembler or ContextAssembler(token_budget=2000)
+        self.tracer = tracer or Tracer()
+        self.prefetcher = prefetcher
+
+    @property
+    def event_key(self):
+        return (self.memory_id, self.actor_id, self.session_id)
 
     def on_agent_initialized(self, event: AgentInitializedEvent):
         """Load recent conversation when agent starts"""
         try:
-            # Get last 5 conversation turns from memory
-            history = self.memory_client.get_last_k_turns(
-                memory_id=self.memory_id, actor_id=self.actor_id, 
-                session_id=self.session_id, k=5
-            )
-            
-            if history:
-                # Convert to agent message format
-                context_messages = []
-                for turn in history:
-                    for message in turn:
-                        role = "assistant" if message["role"] == "ASSISTANT" else "user"
-                        content = message["content"]["text"]
-                        context_messages.append({"role": role, "content": [{"text": content}]})
+            with self.tracer.span("history.load", memory_id=self.memory_id) as span:
+                # Picks up the load started before the agent was built, if there was one
+                if self.prefetcher:
+                    context_messages = self.prefetcher.take(self.event_key, self._load_history)
+                else:
+                    context_messages = self._load_history()
                 
+                # Keep the newest turns that fit the history token budget
+                context_messages, packed = self.context_assembler.assemble_history(context_messages)
+                span.set(messages=len(context_messages), context_tokens=packed.tokens_used)
+            if context_messages:
                 event.agent.messages = context_messages
-                st.info(f"🔄 Loaded {len(context_messages)} messages from memory")
+                st.info(f"🔄 Loaded {len(context_messages)} messages from memory "
+                        f"({packed.tokens_used} tokens, {packed.tokens_saved} saved)")
+        except MemoryUnavailable as e:
+            st.warning(f"⚠️ Starting without history: {e}")
         except Exception as e:
             st.error(f"Memory load error: {e}")
 
+    def prefetch_history(self):
+        """Start loading the history in the background; on_agent_initialized picks it up"""
+        if self.prefetcher:
+            self.prefetcher.start(self.event_key, self._load_history)
+
+    def _load_history(self):
+        # Get last 5 conversation turns (from the history cache when it's warm)
+        if self.history_cache:
+            return self.history_cache.load(self.event_key, 5, self._fetch_turns)
+        context_messages = []
+        for turn in self._fetch_turns(5):
+            for message in turn:
+                role = "assistant" if message["role"] == "ASSISTANT" else "user"
+                content = message["content"]["text"]
+                context_messages.append({"role": role, "content": [{"text": content}]})
+        return context_messages
+
+    def _fetch_turns(self, k):
+        # Make sure messages still queued for this session are readable first
+        # (not while memory is degraded: the read would be skipped anyway)
+        if self.batcher and not getattr(self.memory_client, "degraded", False):
+            with self.tracer.span("memory.flush_pending"):
+                self.batcher.flush(self.event_key, timeout=5)
+        return self.memory_client.get_last_k_turns(
+            memory_id=self.memory_id, actor_id=self.actor_id, 
+            session_id=self.session_id, k=k
+        )
+
     def on_message_added(self, event: MessageAddedEvent):
-        """Save new message to memory"""
+        """Save new message to memory (queued when a batcher is configured)"""
         messages = event.agent.messages
-        self.memory_client.create_event(
-            memory_id=self.memory_id, actor_id=self.actor_id, session_id=self.session_id,
-            messages=[(messages[-1]["content"][0]["text"], messages[-1]["role"])]
-        )
+        text, role = messages[-1]["content"][0]["text"], messages[-1]["role"]
+        with self.tracer.span("memory.save_message", role=role, chars=len(text), queued=bool(self.batcher)):
+            if self.history_cache:
+                self.history_cache.append(self.event_key, role, text)
+            if self.prefetcher:
+                self.prefetcher.discard(self.event_key)  # a history load started earlier misses this message
+            if self.batcher:
+                self.batcher.add(self.memory_id, self.actor_id, self.session_id, text, role)
+                return
+            try:
+                self.memory_client.create_event(
+                    memory_id=self.memory_id, actor_id=self.actor_id, session_id=self.session_id,
+                    messages=[(text, role)]
+                )
+            except DeadlineExceeded as e:
+                st.warning(f"⚠️ Save not confirmed (the message may still be stored): {e}")
+            except MemoryUnavailable as e:
+                st.warning(f"⚠️ Message not saved: {e}")
+
+    def on_after_invocation(self, event: AfterInvocationEvent):
+        """End of turn: write the queued messages as one event in the background"""
+        if self.batcher:
+            self.batcher.flush(self.event_key, wait=False)
 
     def register_hooks(self, registry: HookRegistry):
+        from strands.hooks import AfterInvocationEvent, AgentInitializedEvent, MessageAddedEvent
         registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
         registry.add_callback(MessageAddedEvent, self.on_message_added)
+        registry.add_callback(AfterInvocationEvent, self.on_after_invocation)
+
+@st.cache_resource
+def get_event_batcher():
+    """Process-wide write-behind queue shared by every browser session (durable unless MEMORY_JOURNAL=0)"""
+    if JOURNAL_PATH in ("0", "off"):
+        return EventBatcher(get_memory_client())
+    return EventJournal(JOURNAL_PATH, get_memory_client())
+
+@st.cache_resource
+def get_resilient_client():
+    """MemoryClient for the chat turns with deadlines and a circuit breaker shared by every session"""
+    return ResilientClient(get_memory_client()) if RESILIENCE else get_memory_client()
+
+@st.cache_resource
+def get_prefetcher():
+    """History loads started before their agent is built, shared by every browser session"""
+    return Prefetcher(wait_seconds=3.0)
+
+@st.cache_resource
+def get_history_cache():
+    """Process-wide conversation history cache (LRU + TTL)"""
+    return HistoryCache(max_sessions=512, ttl_seconds=900)
+
+@st.cache_resource
+def get_context_assembler():
+    """History token budget shared by every browser session"""
+    return ContextAssembler(token_budget=2000)
+
+def create_memory_hook(memory_id: str, actor_id: str, tracer: Tracer = None):
+    """MemoryHookProvider for one (memory_id, actor_id), wired to the process-wide caches"""
+    # Key insight: session_id based on memory ensures persistence across browser refreshes
+    session_id = f"{actor_id}_{memory_id[:8]}_session"
+    client = get_resilient_client()
+    return MemoryHookProvider(TracedClient(client, tracer) if tracer else client, memory_id, actor_id, session_id,
+                              batcher=get_event_batcher(), history_cache=get_history_cache(),
+                              context_assembler=get_context_assembler(), tracer=tracer,
+                              prefetcher=get_prefetcher() if PREFETCH else None)
+
+def build_agent(key):
+    """(agent, tracer, compactor) for one (memory_id, actor_id); the agent loads recent history on creation"""
+    from strands import Agent
+    memory_id, actor_id = key
+    tracer = Tracer(sink_path=TRACE_FILE)
+    hook = create_memory_hook(memory_id, actor_id, tracer)
+    compactor = ConversationCompactor(keep_turns=KEEP_TURNS, tracer=tracer) if KEEP_TURNS > 0 else None
+    # Agent creation loads the history, so it is traced like a turn
+    tracer.enabled = st.session_state.get("tracing", TRACING)
+    with tracer.turn("agent.setup", memory_id=memory_id):
+        agent = Agent(
+            model=get_model(),
+            name="Assistant",
+            system_prompt="You are a helpful assistant with memory.",
+            # The compactor goes first so it runs after the other end-of-turn hooks
+            hooks=[h for h in (compactor, TracingHookProvider(tracer), hook) if h]
+        )
+    return agent, tracer, compactor
+
+@st.cache_resource
+def get_model():
+    """Bedrock model client shared by every agent in the process"""
+    return create_model()
+
+@st.cache_resource
+def get_agent_pool():
+    """Process-wide LRU pool of agents, one per (memory, actor), shared by every browser session"""
+    return AgentPool(build_agent, max_agents=MAX_AGENTS, idle_ttl_seconds=AGENT_IDLE_SECONDS)
+
+@st.cache_resource
+def get_provisioner():
+    """Background poller for memories being created; refreshes the catalog when one is ready"""
+    return MemoryProvisioner(get_memory_client(), on_ready=lambda job: get_memory_catalog().invalidate())
 
 def get_memories():
     """Get available memories from AgentCore"""
     try:
-        client = MemoryClient()
-        memories = client.list_memories()
+        memories = get_memory_catalog().list()
         result = {}
         for m in memories:
+            if m.get('status', 'ACTIVE') != 'ACTIVE':
+                continue  # still being created (shown under Create Memory)
             memory_id = m['id']
             name = m.get('name', f'Memory-{memory_id[:8]}')
             display_name = f"{name} ({memory_id[:8]}...)"
@@ -71,18 +246,40 @@ def get_memories():
         return {}
 
 def create_memory(name: str):
-    """Create short-term memory (no strategies = raw events only)"""
-    client = MemoryClient()
-    memory = client.create_memory_and_wait(
+    """Start creating a short-term memory (no strategies = raw events only) without waiting"""
+    return get_provisioner().start(
         name=name, strategies=[], description="Short-term memory", event_expiry_days=7
     )
-    return memory['id']
+
+def show_provisioning():
+    """Status of memories being created; polls only while one is still CREATING"""
+    jobs = get_provisioner().jobs()
+    if "ready_memories" not in st.session_state:
+        st.session_state.ready_memories = {job.memory_id for job in jobs if job.done}
+    for job in jobs:
+        if job.status == "FAILED":
+            st.caption(f"❌ {job.name}: {job.error}")
+        elif job.done and job.memory_id not in st.session_state.ready_memories:
+            st.session_state.ready_memories.add(job.memory_id)
+            st.toast(f"✅ Memory {job.name} is ready")
+    if get_provisioner().pending():
+        poll_provisioning()
+
+@st.fragment(run_every=5)
+def poll_provisioning():
+    """Reruns on its own every 5s; reruns the app once nothing is pending"""
+    pending = get_provisioner().pending()
+    for job in pending:
+        st.caption(f"⏳ Creating {job.name}...")
+    if not pending:
+        st.rerun()
 
 
 def main():
     st.set_page_config(page_title="AgentCore Memory Demo", page_icon="🧠")
     st.title("🧠 AgentCore Short-Term Memory Demo")
     st.markdown("**Memory persists across browser refreshes for 7 days!**")
+    prewarm()  # load strands in the background while a memory is picked
     
     # Sidebar configuration
     with st.sidebar:
@@ -102,10 +299,12 @@ def main():
             new_name = st.text_input("Name", value="MyMemory")
             if st.button("Create") and new_name:
                 create_memory(new_name)
-                st.rerun()
+        show_provisioning()
         
         # Settings
         actor_id = st.text_input("Actor ID", value="demo_user")
+        stream_responses = st.toggle("Stream responses", value=True)
+        tracing = st.toggle("Trace turns", value=TRACING, key="tracing")
         
         if st.button("Clear Chat"):
             st.session_state.messages = []
@@ -116,24 +315,30 @@ def main():
         st.warning("Please select or create a memory")
         return
     
-    # Key insight: session_id based on memory ensures persistence across browser refreshes
     session_id = f"{actor_id}_{memory_id[:8]}_session"
     
-    # Initialize agent with memory
-    if "agent" not in st.session_state or st.session_state.get("current_memory") != memory_id:
-        client = MemoryClient()
-        hook = MemoryHookProvider(client, memory_id, actor_id, session_id)
-        st.session_state.agent = Agent(
-            name="Assistant", 
-            system_prompt="You are a helpful assistant with memory.",
-            hooks=[hook]
-        )
-        st.session_state.current_memory = memory_id
+    # The agent lives in the process-wide pool, not in this browser session
+    pool = get_agent_pool()
+    agent_key = (memory_id, actor_id)
+    # The agent is about to be built (new selection, or evicted and a prompt came in): start
+    # loading its history now, so the round trip overlaps with loading strands and building it
+    needs_agent = st.session_state.get("current_agent") != agent_key or st.session_state.get("prompt")
+    if PREFETCH and needs_agent and agent_key not in pool:
+        create_memory_hook(*agent_key).prefetch_history()
+    if st.session_state.get("current_agent") != agent_key:
+        with pool.lease(agent_key):
+            pass  # build it now so the history is loaded before the first turn
+        st.session_state.current_agent = agent_key
         st.success(f"✅ Connected to memory: {memory_id[:8]}...")
     
     # Initialize chat
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "turn_timings" not in st.session_state:
+        st.session_state.turn_timings = []
+    
+    if getattr(get_resilient_client(), "degraded", False):
+        st.warning("⚠️ Memory is degraded: chatting without it until it recovers")
     
     # Display chat
     for message in st.session_state.messages:
@@ -141,7 +346,7 @@ def main():
             st.markdown(message["content"])
     
     # Chat input
-    if prompt := st.chat_input("Type your message..."):
+    if prompt := st.chat_input("Type your message...", key="prompt"):
         # User message
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
@@ -149,20 +354,73 @@ def main():
         
         # Agent response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    result = st.session_state.agent(prompt)
-                    response = result.message['content'][0]['text']
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            try:
+                # Waits while another tab of the same actor is mid-turn; rebuilds the agent if it was evicted
+                with pool.lease(agent_key) as (agent, tracer, _):
+                    tracer.enabled = tracing
+                    with tracer.turn("turn", memory_id=memory_id, prompt_chars=len(prompt),
+                                     streaming=stream_responses):
+                        if stream_responses:
+                            # Render tokens as they arrive; memory hooks fire as usual
+                            turn = StreamedTurn(agent, prompt)
+                            response = st.write_stream(turn) or str(turn.result)
+                            timings = turn.timings
+                        else:
+                            with st.spinner("Thinking..."):
+                                start = time.perf_counter()
+                                result = agent(prompt)
+                                response = result.message['content'][0]['text']
+                                timings = {"ttft": None, "total": time.perf_counter() - start}
+                            st.markdown(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                st.session_state.turn_timings.append(timings)
+            except Exception as e:
+                st.error(f"Error: {e}")
     
     # Memory info
     with st.expander("Memory Info"):
         st.write(f"**Memory ID:** {memory_id}")
         st.write(f"**Session ID:** {session_id}")
         st.write(f"**Current messages:** {len(st.session_state.messages)}")
+        batcher = get_event_batcher()
+        stats = batcher.stats
+        st.write(f"**Memory writes:** {stats['events']} events for {stats['messages']} messages")
+        parked = batcher.parked()
+        if isinstance(batcher, EventJournal):
+            st.write(f"**Journal:** {batcher.pending()} messages pending, {parked} parked, "
+                     f"{stats['retries']} retries")
+        elif parked:
+            st.warning(f"⚠️ {parked} messages could not be saved; they are kept in memory only "
+                       f"until retried or the app stops")
+        if parked and st.button("🔁 Retry parked writes"):
+            batcher.retry_parked()
+        st.write(f"**History tokens saved:** {get_context_assembler().stats['tokens_saved']}")
+        if PREFETCH:
+            stats = get_prefetcher().stats
+            st.write(f"**Prefetched history loads:** {stats['ready'] + stats['waited']} used "
+                     f"({stats['ready']} ready in time), {stats['overlap_seconds']:.1f}s overlapped")
+        client = get_resilient_client()
+        if isinstance(client, ResilientClient):
+            breaker = client.breaker
+            health = f"⚠️ degraded, retrying in {breaker.retry_in():.0f}s" if breaker.degraded else "✅ healthy"
+            st.write(f"**Memory service:** {health} ({client.stats['timeouts']} timeouts, "
+                     f"{client.stats['hedges']} hedged reads, {breaker.stats['short_circuited']} calls skipped)")
+        pool_stats = pool.stats
+        st.write(f"**Agent pool:** {len(pool)}/{pool.max_agents} agents, {pool_stats['builds']} built, "
+                 f"{pool_stats['evictions']} evicted")
+        if st.session_state.turn_timings:
+            st.write(f"**Last turn:** {format_timings(st.session_state.turn_timings[-1])}")
+        agent, tracer, compactor = pool.peek(agent_key) or (None, None, None)
+        if compactor:
+            stats = compactor.stats
+            st.write(f"**Context compaction:** {stats['turns_dropped']} turns summarized, "
+                     f"{stats['tokens_before'] - stats['tokens_after']} prompt tokens trimmed")
+        last_trace = tracer.last_turn() if tracer else None
+        if last_trace:
+            st.write(f"**Last {last_trace.root.name} breakdown:**")
+            st.table(last_trace.breakdown())
+            st.download_button("⬇️ Traces (JSON lines)", tracer.export_jsonl(), "traces.jsonl")
+            st.download_button("⬇️ Traces (OTLP JSON)", tracer.export_otlp(), "traces-otlp.json")
 
 
 if __name__ == "__main__":
@@ -4,21 +4,94 @@ Streamlit App: AgentCore Long-Term Memory Demo
 Run with: streamlit run long_term_memory_demo.py
 """
 
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import streamlit as st
 from datetime import datetime
-from strands import Agent
-from strands.hooks import AfterInvocationEvent, HookProvider, HookRegistry, MessageAddedEvent
-from strands_tools import calculator
-from bedrock_agentcore.memory import MemoryClient
-from bedrock_agentcore.memory.constants import StrategyType
-
-class LongTermMemoryHookProvider(HookProvider):
-    def __init__(self, memory_id: str, client: MemoryClient, actor_id: str, session_id: str):
+
+if TYPE_CHECKING:  # strands, strands_tools and boto3 are imported on first use so the page renders sooner
+    from bedrock_agentcore.memory import MemoryClient
+    from strands.hooks import AfterInvocationEvent, HookRegistry, MessageAddedEvent
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.agent_pool import AgentPool
+from common.clients import get_memory_catalog, get_memory_client
+from common.compaction import CONTEXT_MARKER, ConversationCompactor, MemorySummarizer
+from common.context import ContextAssembler
+from common.journal import EventJournal
+from common.multi_namespace import MultiNamespaceRetriever, NamespaceQuery
+from common.prefetch import Prefetcher
+from common.provisioning import MemoryProvisioner
+from common.resilience import DeadlineExceeded, MemoryUnavailable, ResilientClient
+from common.retrieval_cache import RetrievalCache
+from common.startup import create_model, prewarm
+from common.streaming import StreamedTurn, format_timings
+from common.tracing import TracedClient, Tracer, TracingHookProvider
+
+# Opt-in local mirror of memory records (needs numpy): MEMORY_LOCAL_MIRROR=1 streamlit run app.py
+USE_LOCAL_MIRROR = os.environ.get("MEMORY_LOCAL_MIRROR", "0") == "1"
+# Per-turn timing breakdown: MEMORY_TRACING=1 turns it on by default,
+# MEMORY_TRACE_FILE=traces.jsonl also appends every traced turn to a file
+TRACING = os.environ.get("MEMORY_TRACING", "0") == "1"
+TRACE_FILE = os.environ.get("MEMORY_TRACE_FILE")
+# Turns are journaled to this SQLite file and delivered in the background;
+# MEMORY_JOURNAL=0 saves them with a synchronous create_event instead.
+# The file is locked while the app runs: give a second copy of the app its own file
+JOURNAL_PATH = os.environ.get("MEMORY_JOURNAL",
+                              str(Path.home() / ".agentcore-memory-demo" / "long-term-journal.db"))
+# Agents kept in memory for the whole process; an evicted student's agent is rebuilt on
+# their next turn and picks up again from long-term memory
+MAX_AGENTS = int(os.environ.get("MEMORY_MAX_AGENTS", "64"))
+AGENT_IDLE_SECONDS = float(os.environ.get("MEMORY_AGENT_IDLE_SECONDS", "1800"))
+# Turns kept verbatim in the agent's context; older ones are summarized (0 keeps everything)
+KEEP_TURNS = int(os.environ.get("MEMORY_KEEP_TURNS", "6"))
+# Namespaces searched (concurrently) for every question, one per memory strategy;
+# quota is the most memories injected from each, out of RETRIEVAL_TOP_K in total
+NAMESPACES = [
+    NamespaceQuery("semantic", "/students/math/{actorId}", quota=3),
+    NamespaceQuery("preferences", "/students/preferences/{actorId}", quota=2),
+    NamespaceQuery("summary", "/summaries/{actorId}/{sessionId}", quota=1, top_k=1),
+]
+RETRIEVAL_TOP_K = 5
+# Long-term extraction runs asynchronously after create_event; cached searches of a
+# namespace are kept until then, so repeated questions still skip the service
+EXTRACTION_DELAY_SECONDS = float(os.environ.get("MEMORY_EXTRACTION_DELAY_SECONDS", "60"))
+# Start the memory search as soon as a prompt is submitted, while the page renders and
+# the agent is leased or built; MEMORY_PREFETCH=0 searches when the hook asks for it
+PREFETCH = os.environ.get("MEMORY_PREFETCH", "1") != "0"
+# Memory calls get deadlines (slow retrievals are hedged) and a circuit breaker that
+# skips memory while the service is failing; MEMORY_RESILIENCE=0 calls it directly
+RESILIENCE = os.environ.get("MEMORY_RESILIENCE", "1") != "0"
+
+class LongTermMemoryHookProvider:
+    """Retrieves relevant long-term memories into each question and saves every turn (a strands HookProvider)"""
+    def __init__(self, memory_id: str, client: MemoryClient, actor_id: str, session_id: str,
+                 retrieval_cache: RetrievalCache = None, vector_mirror=None,
+                 context_assembler: ContextAssembler = None, tracer: Tracer = None,
+                 journal: EventJournal = None, retriever: MultiNamespaceRetriever = None,
+                 prefetcher: Prefetcher = None):
         self.memory_id = memory_id
         self.client = client
         self.actor_id = actor_id
         self.session_id = session_id
-        self.namespace = f"/students/math/{self.actor_id}"
+        # Without a retriever only the semantic facts are searched
+        self.retriever = retriever or MultiNamespaceRetriever([NAMESPACES[0]], top_k=3)
+        self.namespaces = self.retriever.paths(actor_id, session_id)
+        self.retrieval_cache = retrieval_cache
+        self.vector_mirror = vector_mirror
+        self.context_assembler = context_assembler or ContextAssembler(token_budget=500)
+        self.tracer = tracer or Tracer()
+        self.journal = journal
+        self.prefetcher = prefetcher
+        if vector_mirror:
+            for namespace in self.namespaces.values():
+                vector_mirror.track(memory_id, namespace)
     
     def retrieve_memories(self, event: MessageAddedEvent):
         messages = event.agent.messages
@@ -26,32 +99,71 @@ class LongTermMemoryHookProvider(HookProvider):
             user_message = messages[-1]["content"][0].get("text", "")
             
             try:
-                memories = self.client.retrieve_memories(
-                    memory_id=self.memory_id,
-                    namespace=self.namespace,
-                    query=user_message
-                )
-                
-                memory_context = []
-                for memory in memories:
-                    if isinstance(memory, dict):
-                        content = memory.get('content', {})
-                        if isinstance(content, dict):
-                            text = content.get('text', '').strip()
-                            if text:
-                                memory_context.append(text)
+                with self.tracer.span("memory.retrieve", memory_id=self.memory_id, query_chars=len(user_message)) as span:
+                    # Picks up the search started when the prompt was submitted, if there was one
+                    if self.prefetcher:
+                        merged = self.prefetcher.take(self._prefetch_key(user_message),
+                                                      lambda: self._search(user_message))
+                    else:
+                        merged = self._search(user_message)
+                    memories = merged.records
+                    
+                    # Deduplicate, rank and fit the memories into the context token budget
+                    packed = self.context_assembler.assemble_memories(memories)
+                    memory_context = packed.texts
+                    span.set(memories=len(memories), injected=len(memory_context), context_tokens=packed.tokens_used,
+                             namespaces=len(merged.answered), late=len(merged.late))
                 
                 if memory_context:
                     context_text = "\n".join(memory_context)
                     original_text = messages[-1]["content"][0].get("text", "")
                     messages[-1]["content"][0]["text"] = (
-                        f"{original_text}\n\nPrevious context: {context_text}"
+                        f"{original_text}{CONTEXT_MARKER}{context_text}"
                     )
-                    st.info(f"🧠 Retrieved {len(memory_context)} memories")
+                    st.info(f"🧠 Retrieved {len(memory_context)} memories from {len(merged.answered)} namespaces "
+                            f"({packed.tokens_used} tokens, {packed.tokens_saved} saved)")
                     
+            except MemoryUnavailable as e:
+                st.warning(f"⚠️ Answering without long-term memory: {e}")
             except Exception as e:
                 st.error(f"Memory retrieval error: {e}")
     
+    def prefetch(self, query: str):
+        """Start searching for query in the background; retrieve_memories picks up the result"""
+        if self.prefetcher:
+            self.prefetcher.start(self._prefetch_key(query), lambda: self._search(query))
+    
+    def _prefetch_key(self, query: str):
+        return (self.memory_id, self.actor_id, self.session_id, query)
+    
+    def _search(self, query: str):
+        # Every namespace at once; merged by score within their quotas
+        return self.retriever.retrieve(
+            lambda namespace, top_k: self._fetch(namespace, query, top_k), self.namespaces
+        )
+    
+    def _fetch(self, namespace: str, query: str, top_k: int):
+        if self.retrieval_cache:
+            return self.retrieval_cache.get_or_fetch(
+                self.memory_id, namespace, query, lambda: self._retrieve(namespace, query, top_k)
+            )
+        return self._retrieve(namespace, query, top_k)
+    
+    def _retrieve(self, namespace: str, query: str, top_k: int):
+        # Answer from the local mirror when it is fresh, otherwise ask the service
+        if self.vector_mirror:
+            with self.tracer.span("mirror.search", namespace=namespace) as span:
+                memories = self.vector_mirror.search(self.memory_id, namespace, query, top_k)
+                span.set(fresh=memories is not None)
+            if memories is not None:
+                return memories
+        return self.client.retrieve_memories(
+            memory_id=self.memory_id,
+            namespace=namespace,
+            query=query,
+            top_k=top_k
+        )
+    
     def save_memories(self, event: AfterInvocationEvent):
         try:
             messages = event.agent.messages
@@ -67,34 +179,170 @@ class LongTermMemoryHookProvider(HookProvider):
                         break
                 
                 if user_msg and assistant_msg:
-                    self.client.create_event(
-                        memory_id=self.memory_id,
-                        actor_id=self.actor_id,
-                        session_id=self.session_id,
-                        messages=[(user_msg, "USER"), (assistant_msg, "ASSISTANT")]
-                    )
+                    turn = [(user_msg, "USER"), (assistant_msg, "ASSISTANT")]
+                    with self.tracer.span("memory.save", chars=len(user_msg) + len(assistant_msg),
+                                          journaled=bool(self.journal)):
+                        if self.journal:
+                            # Durable local append; the journal delivers it in the background
+                            self.journal.append(self.memory_id, self.actor_id, self.session_id, turn)
+                            self.journal.flush(wait=False)
+                        else:
+                            self.client.create_event(
+                                memory_id=self.memory_id,
+                                actor_id=self.actor_id,
+                                session_id=self.session_id,
+                                messages=turn
+                            )
+                    # The turn shows up in the namespaces once extraction has run; refresh after that
+                    if self.retrieval_cache:
+                        for namespace in self.namespaces.values():
+                            self.retrieval_cache.mark_stale(self.memory_id, namespace, EXTRACTION_DELAY_SECONDS)
                     st.success("💾 Saved to long-term memory")
                     
+        except DeadlineExceeded as e:
+            st.warning(f"⚠️ Save not confirmed (the turn may still be stored): {e}")
+        except MemoryUnavailable as e:
+            st.warning(f"⚠️ Turn not saved: {e}")
         except Exception as e:
             st.error(f"Memory save error: {e}")
     
     def register_hooks(self, registry: HookRegistry):
+        from strands.hooks import AfterInvocationEvent, MessageAddedEvent
         registry.add_callback(MessageAddedEvent, self.retrieve_memories)
         registry.add_callback(AfterInvocationEvent, self.save_memories)
 
+@st.cache_resource
+def get_retrieval_cache():
+    """Process-wide retrieval cache shared by every browser session"""
+    return RetrievalCache(max_entries=1024, ttl_seconds=300, similarity_threshold=0.9)
+
+@st.cache_resource
+def get_resilient_client():
+    """MemoryClient for the chat turns with deadlines and a circuit breaker shared by every session"""
+    return ResilientClient(get_memory_client()) if RESILIENCE else get_memory_client()
+
+@st.cache_resource
+def get_retriever():
+    """Searches every strategy's namespace concurrently (one thread pool for the process)"""
+    # Mirror answers carry cosine similarities, not the service's scores: merge those by rank
+    return MultiNamespaceRetriever(NAMESPACES, top_k=RETRIEVAL_TOP_K, deadline_seconds=1.2,
+                                   merge="rank" if USE_LOCAL_MIRROR else "score")
+
+@st.cache_resource
+def get_prefetcher():
+    """Background memory searches started when a prompt arrives, shared by every browser session"""
+    return Prefetcher(wait_seconds=2.0)
+
+@st.cache_resource
+def get_journal():
+    """Process-wide durable queue for long-term memory events, or None when disabled"""
+    if JOURNAL_PATH in ("0", "off"):
+        return None
+    return EventJournal(JOURNAL_PATH, get_memory_client())
+
+@st.cache_resource
+def get_context_assembler():
+    """Token budget for injected memories, shared by every browser session"""
+    return ContextAssembler(token_budget=500)
+
+@st.cache_resource
+def get_vector_mirror():
+    """Process-wide local mirror of memory records, or None when disabled"""
+    if not USE_LOCAL_MIRROR:
+        return None
+    from common.vector_mirror import TitanEmbedder, VectorMirror, memory_record_source
+    embedder = TitanEmbedder()
+    return VectorMirror(memory_record_source(get_memory_client()), embedder, dim=embedder.dim)
+
+def create_memory_hooks(memory_id: str, actor_id: str, tracer: Tracer = None):
+    """LongTermMemoryHookProvider for one student, wired to the process-wide caches"""
+    # Persistent identifiers for memory continuity across browser refreshes
+    session_id = f"{actor_id}_{memory_id[:8]}_session"
+    client = get_resilient_client()
+    return LongTermMemoryHookProvider(
+        memory_id=memory_id,
+        client=TracedClient(client, tracer) if tracer else client,
+        actor_id=actor_id,
+        session_id=session_id,
+        retrieval_cache=get_retrieval_cache(),
+        vector_mirror=get_vector_mirror(),
+        context_assembler=get_context_assembler(),
+        tracer=tracer,
+        journal=get_journal(),
+        retriever=get_retriever(),
+        prefetcher=get_prefetcher() if PREFETCH else None
+    )
+
+def build_agent(key):
+    """(agent, tracer, compactor) for one (memory_id, actor_id)"""
+    from strands import Agent
+    memory_id, actor_id = key
+    tracer = Tracer(sink_path=TRACE_FILE)
+    memory_hooks = create_memory_hooks(memory_id, actor_id, tracer)
+    session_id = memory_hooks.session_id
+    compactor = None
+    if KEEP_TURNS > 0:
+        # Older turns are replaced by the session summary from the memory's summary strategy
+        # (or a local one until it exists); stale "Previous context" is stripped every turn
+        summarizer = MemorySummarizer(memory_hooks.client, memory_id, f"/summaries/{actor_id}/{session_id}")
+        compactor = ConversationCompactor(keep_turns=KEEP_TURNS, summarizer=summarizer, tracer=tracer)
+    agent = Agent(
+        model=get_model(),
+        # The compactor goes first so it runs after save_memories
+        hooks=[h for h in (compactor, TracingHookProvider(tracer), memory_hooks) if h],
+        tools=get_tools(),
+        system_prompt="You are a helpful math tutor. Use your memory to provide personalized assistance based on the student's learning history."
+    )
+    return agent, tracer, compactor
+
+@st.cache_resource
+def get_model():
+    """Bedrock model client shared by every agent in the process"""
+    return create_model()
+
+@st.cache_resource
+def get_tools():
+    """Tools for every agent; strands_tools.calculator pulls in sympy (~0.5s), so it loads on first use"""
+    from strands_tools import calculator
+    return [calculator]
+
+@st.cache_resource
+def get_agent_pool():
+    """Process-wide LRU pool of agents, one per (memory, student), shared by every browser session"""
+    return AgentPool(build_agent, max_agents=MAX_AGENTS, idle_ttl_seconds=AGENT_IDLE_SECONDS)
+
+@st.cache_resource
+def get_provisioner():
+    """Background poller for the memory being created; refreshes the catalog when it is ready"""
+    return MemoryProvisioner(get_memory_client(), on_ready=lambda job: get_memory_catalog().invalidate())
+
 def create_memory():
-    """Create or get existing long-term memory with semantic strategy"""
-    client = MemoryClient()
+    """Get existing long-term memory, or start creating one with semantic, preference and summary strategies.
+    Returns (memory_id, client); memory_id is None while the memory is still being created."""
+    client = get_memory_client()
+    provisioner = get_provisioner()
     
-    # Get existing memories
-    memories = client.list_memories()
+    # Get existing memories (cached catalog)
+    memories = get_memory_catalog().list()
     
-    # If any memory exists, use the first one
-    if memories:
-        memory_id = memories[0]['id']
+    # If any memory is ready, use the first one
+    active = [m for m in memories if m.get('status', 'ACTIVE') == 'ACTIVE']
+    if active:
+        memory_id = active[0]['id']
         return memory_id, client
     
+    # Creation already in progress (started by this or another browser session)
+    for m in memories:
+        if m.get('status') == 'CREATING':
+            provisioner.track(m['id'], m.get('name', ''))
+    if provisioner.pending():
+        return None, client
+    failed = [job for job in provisioner.jobs() if job.status == 'FAILED']
+    if failed:
+        raise RuntimeError(f"Memory creation failed: {failed[-1].error}")
+    
     # Create new memory with unique name to avoid conflicts
+    from bedrock_agentcore.memory.constants import StrategyType
     unique_name = f"MathAssistant_{datetime.now().strftime('%Y%m%d_%H%M')}"
     
     strategies = [{
@@ -103,76 +351,117 @@ def create_memory():
             "description": "Captures math learning patterns",
             "namespaces": ["/students/math/{actorId}"]
         }
+    }, {
+        StrategyType.USER_PREFERENCE.value: {
+            "name": "StudentPreferences",
+            "description": "How each student likes to learn (explanations, pace, examples)",
+            "namespaces": ["/students/preferences/{actorId}"]
+        }
+    }, {
+        StrategyType.SUMMARY.value: {
+            "name": "MathSessionSummary",
+            "description": "Running summary of each tutoring session, used to compact long chats",
+            "namespaces": ["/summaries/{actorId}/{sessionId}"]
+        }
     }]
     
-    memory = client.create_memory_and_wait(
+    provisioner.start(
         name=unique_name,
         strategies=strategies,
         description="Long-term memory for math learning",
         event_expiry_days=30
     )
-    return memory['id'], client
+    return None, client
+
+@st.fragment(run_every=5)
+def show_setup_progress():
+    """Shown while the memory is being created; reruns the app once it is ready"""
+    pending = get_provisioner().pending()
+    if not pending:
+        st.rerun()
+    for job in pending:
+        st.info(f"⏳ Creating long-term memory {job.name} (this can take a few minutes)...")
 
 def main():
     st.set_page_config(page_title="Long-Term Memory Demo", page_icon="🧮")
     
     st.title("🧮 Math Assistant - Long-Term Memory Demo")
     st.markdown("**A math tutor that remembers your learning progress across sessions!**")
+    prewarm("strands", "strands.models.bedrock", "strands_tools.calculator")  # in the background
     
     # Initialize memory
     if "memory_setup" not in st.session_state:
         with st.spinner("Setting up long-term memory..."):
             try:
                 memory_id, client = create_memory()
-                st.session_state.memory_id = memory_id
-                st.session_state.client = client
-                st.session_state.memory_setup = True
-                st.success(f"✅ Memory initialized: {memory_id[:8]}...")
             except Exception as e:
                 st.error(f"❌ Memory setup failed: {e}")
                 return
+        if memory_id is None:
+            show_setup_progress()
+            return
+        st.session_state.memory_id = memory_id
+        st.session_state.client = client
+        st.session_state.memory_setup = True
+        st.success(f"✅ Memory initialized: {memory_id[:8]}...")
     
-    # Persistent identifiers for memory continuity across browser refreshes
-    actor_id = "demo_student"
+    # Each student gets their own memory namespace and pooled agent
+    actor_id = st.sidebar.text_input("Student ID", value="demo_student")
     session_id = f"{actor_id}_{st.session_state.memory_id[:8]}_session"
+    tracing = st.sidebar.toggle("Trace turns", value=TRACING)
     
-    # Create agent with long-term memory
-    if "agent" not in st.session_state:
-        memory_hooks = LongTermMemoryHookProvider(
-            memory_id=st.session_state.memory_id,
-            client=st.session_state.client,
-            actor_id=actor_id,
-            session_id=session_id
-        )
-        
-        st.session_state.agent = Agent(
-            hooks=[memory_hooks],
-            tools=[calculator],
-            system_prompt="You are a helpful math tutor. Use your memory to provide personalized assistance based on the student's learning history."
-        )
+    # The agent lives in the process-wide pool, not in this browser session
+    pool = get_agent_pool()
+    agent_key = (st.session_state.memory_id, actor_id)
+    
+    # A prompt submitted with this run is known before anything below renders: start
+    # its memory search now so the round trip overlaps with rendering and the agent lease
+    if PREFETCH and st.session_state.get("prompt"):
+        create_memory_hooks(*agent_key).prefetch(st.session_state.prompt)
+    
+    stream_responses = st.sidebar.toggle("Stream responses", value=True)
     
     # Chat interface
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "turn_timings" not in st.session_state:
+        st.session_state.turn_timings = []
+    
+    if getattr(get_resilient_client(), "degraded", False):
+        st.warning("⚠️ Long-term memory is degraded: answering without it until it recovers")
     
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
-    if prompt := st.chat_input("Ask me a math question..."):
+    if prompt := st.chat_input("Ask me a math question...", key="prompt"):
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    result = st.session_state.agent(prompt)
-                    response = result.message['content'][0]['text']
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            try:
+                # Waits while another tab of the same student is mid-turn; rebuilds the agent if it was evicted
+                with pool.lease(agent_key) as (agent, tracer, _):
+                    tracer.enabled = tracing
+                    with tracer.turn("turn", memory_id=st.session_state.memory_id, prompt_chars=len(prompt),
+                                     streaming=stream_responses):
+                        if stream_responses:
+                            # Render tokens as they arrive; memory hooks fire as usual
+                            turn = StreamedTurn(agent, prompt)
+                            response = st.write_stream(turn) or str(turn.result)
+                            timings = turn.timings
+                        else:
+                            with st.spinner("Thinking..."):
+                                start = time.perf_counter()
+                                result = agent(prompt)
+                                response = result.message['content'][0]['text']
+                                timings = {"ttft": None, "total": time.perf_counter() - start}
+                            st.markdown(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                st.session_state.turn_timings.append(timings)
+            except Exception as e:
+                st.error(f"Error: {e}")
     
     # Sidebar
     with st.sidebar:
@@ -181,6 +470,43 @@ def main():
         st.write(f"**Student ID:** {actor_id}")
         st.write(f"**Session ID:** {session_id}")
         st.write(f"**Memory Type:** Long-term (30 days)")
+        st.write(f"**Context tokens saved:** {get_context_assembler().stats['tokens_saved']}")
+        retriever_stats = get_retriever().stats
+        if PREFETCH:
+            stats = get_prefetcher().stats
+            st.write(f"**Prefetched searches:** {stats['ready'] + stats['waited']} used "
+                     f"({stats['ready']} ready in time), {stats['overlap_seconds']:.1f}s overlapped")
+        st.write(f"**Namespaces searched:** {', '.join(ns.name for ns in NAMESPACES)} "
+                 f"({retriever_stats['late']} late, {retriever_stats['duplicates']} duplicates merged)")
+        client = get_resilient_client()
+        if isinstance(client, ResilientClient):
+            breaker = client.breaker
+            health = f"⚠️ degraded, retrying in {breaker.retry_in():.0f}s" if breaker.degraded else "✅ healthy"
+            st.write(f"**Memory service:** {health} ({client.stats['timeouts']} timeouts, "
+                     f"{client.stats['hedges']} hedged reads, {breaker.stats['short_circuited']} calls skipped)")
+        journal = get_journal()
+        if journal:
+            parked = journal.parked()
+            st.write(f"**Journal:** {journal.pending()} messages pending, {parked} parked, "
+                     f"{journal.stats['retries']} retries")
+            if parked and st.button("🔁 Retry parked writes"):
+                journal.retry_parked()
+        pool_stats = pool.stats
+        st.write(f"**Agent pool:** {len(pool)}/{pool.max_agents} agents, {pool_stats['builds']} built, "
+                 f"{pool_stats['evictions']} evicted")
+        if st.session_state.turn_timings:
+            st.write(f"**Last turn:** {format_timings(st.session_state.turn_timings[-1])}")
+        agent, tracer, compactor = pool.peek(agent_key) or (None, None, None)
+        if compactor:
+            stats = compactor.stats
+            st.write(f"**Context compaction:** {stats['turns_dropped']} turns summarized, "
+                     f"{stats['tokens_before'] - stats['tokens_after']} prompt tokens trimmed")
+        last_trace = tracer.last_turn() if tracer else None
+        if last_trace:
+            st.write("**Last turn breakdown:**")
+            st.table(last_trace.breakdown())
+            st.download_button("⬇️ Traces (JSON lines)", tracer.export_jsonl(), "traces.jsonl")
+            st.download_button("⬇️ Traces (OTLP JSON)", tracer.export_otlp(), "traces-otlp.json")
         
         if st.button("🔄 Clear Chat"):
             st.session_state.messages = []
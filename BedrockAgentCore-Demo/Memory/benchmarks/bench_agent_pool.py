@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for common/agent_pool.py
+Many actors chat with the 02-ShortTerm hook provider (StubModel, FakeMemoryClient)
+from a few worker threads, once with every agent kept forever (like agents held in
+st.session_state) and once with a size cap, where evicted agents are rebuilt
+from the history cache. Reports traced memory, builds/evictions,
+turn latency and whether any actor ever had two turns running at once.
+
+Run with: python benchmarks/bench_agent_pool.py --actors 300 --max-agents 32
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from strands import Agent
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from bench_hooks import MEMORY_ID, PROMPTS, load_app
+from common.agent_pool import AgentPool
+from common.batching import EventBatcher
+from common.history_cache import HistoryCache
+from fakes import FakeMemoryClient, StubModel
+
+
+def run(mode: str, short_term, args) -> dict:
+    client = FakeMemoryClient(latency=args.latency)
+    batcher = EventBatcher(client)
+    history_cache = HistoryCache(max_sessions=max(args.actors, 512))
+
+    def build(key):
+        memory_id, actor_id = key
+        hook = short_term.MemoryHookProvider(client, memory_id, actor_id, f"{actor_id}_{memory_id[:8]}_session",
+                                             batcher=batcher, history_cache=history_cache)
+        return Agent(model=StubModel(delay=args.model_delay), hooks=[hook], callback_handler=None)
+
+    pool = AgentPool(build, max_agents=args.max_agents if mode == "pool" else args.actors)
+    rng = random.Random(0)
+    # Skewed traffic: a few actors are much more active than the rest
+    weights = [1 / (i + 1) for i in range(args.actors)]
+    schedule = rng.choices(range(args.actors), weights=weights, k=args.turns)
+    schedule[:args.actors] = range(args.actors)  # everyone talks at least once
+    running, overlaps, latencies = set(), [0], []
+    guard = threading.Lock()
+
+    def turn(i: int):
+        key = (MEMORY_ID, f"actor_{schedule[i]}")
+        start = time.perf_counter()
+        with pool.lease(key) as agent:
+            with guard:
+                overlaps[0] += key in running
+                running.add(key)
+            try:
+                agent(PROMPTS[i % len(PROMPTS)])
+            finally:
+                with guard:
+                    running.discard(key)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as executor:
+        list(executor.map(turn, range(args.turns)))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    batcher.close()
+    latencies.sort()
+    return {
+        "agents": len(pool), "builds": pool.stats["builds"], "evictions": pool.stats["evictions"],
+        "current_mib": current / 2**20, "peak_mib": peak / 2**20, "turns_per_s": args.turns / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000, "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "overlaps": overlaps[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actors", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=1500)
+    parser.add_argument("--max-agents", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent browser sessions")
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds per MemoryClient call")
+    parser.add_argument("--model-delay", type=float, default=0.005, help="seconds per model reply")
+    args = parser.parse_args()
+
+    short_term = load_app("02-ShortTerm", "short_term_app")
+    logging.getLogger(get_script_run_ctx.__module__).addFilter(lambda record: False)
+    print(f"{args.actors} actors, {args.turns} turns, {args.workers} workers, pool cap {args.max_agents}")
+    for mode in ("unbounded", "pool"):
+        r = run(mode, short_term, args)
+        print(f"{mode:<10} {r['agents']:4d} agents ({r['builds']} built, {r['evictions']} evicted)  "
+              f"{r['current_mib']:6.1f} MiB held, {r['peak_mib']:6.1f} MiB peak  "
+              f"{r['turns_per_s']:6.0f} turns/s  p50 {r['p50_ms']:.1f}ms p99 {r['p99_ms']:.1f}ms  "
+              f"same-actor overlaps {r['overlaps']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for common/multi_namespace.py
+Searches the 03-LongTerm namespaces (semantic, preferences, summary) of a seeded
+FakeMemoryClient, where each namespace has its own latency distribution:
+  single      each namespace on its own
+  sequential  one after another (what searching them in a loop would cost)
+  fan-out     MultiNamespaceRetriever, all at once with merged top-k
+then repeats the fan-out with one namespace stuck for --stuck seconds to show the
+overall deadline. Reports p50/p95 latency and what the merge kept.
+
+Run with: python benchmarks/bench_fanout.py [--queries 50]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.multi_namespace import MultiNamespaceRetriever, NamespaceQuery
+from fake_memory import FakeMemoryClient, lognormal
+
+MEMORY_ID, ACTOR_ID, SESSION_ID = "bench-memory", "bench_student", "bench_session"
+# Same namespaces and quotas as 03-LongTerm, with a median latency each
+NAMESPACES = [
+    (NamespaceQuery("semantic", "/students/math/{actorId}", quota=3), 0.12),
+    (NamespaceQuery("preferences", "/students/preferences/{actorId}", quota=2), 0.08),
+    (NamespaceQuery("summary", "/summaries/{actorId}/{sessionId}", quota=1, top_k=1), 0.06),
+]
+QUESTIONS = ["How do I solve equations with negative numbers?", "Explain the chain rule step by step",
+             "What is a derivative?", "Can you give me practice problems on fractions?",
+             "Show me how to factor a quadratic with worked examples"]
+RECORDS = {
+    "semantic": ["The student struggles with negative numbers in equations",
+                 "The student solved 2x + 5 = 13 correctly", "The student is learning the chain rule",
+                 "The student knows what a derivative is", "The student practices fractions weekly",
+                 "The student prefers worked examples"],  # also a preference: dropped as a duplicate
+    "preferences": ["The student prefers worked examples", "The student likes step by step explanations",
+                    "The student wants practice problems after each explanation"],
+    "summary": ["Session so far: equations with negative numbers, then the chain rule and derivatives"],
+}
+
+
+class NamespaceLatency:
+    """Delays retrieve_memories by a per-namespace distribution (the fake itself has none)"""
+
+    def __init__(self, client: FakeMemoryClient, latencies: dict, seed: int = 0):
+        self.client = client
+        self.latencies = latencies
+        self._random = random.Random(seed)
+
+    def retrieve_memories(self, namespace: str, **kwargs):
+        time.sleep(self.latencies[namespace](namespace, self._random))
+        return self.client.retrieve_memories(namespace=namespace, **kwargs)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[max(0, int(len(samples) * 0.95) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--deadline", type=float, default=1.2, help="overall fan-out deadline (as in 03)")
+    parser.add_argument("--stuck", type=float, default=3.0, help="seconds the stuck namespace takes")
+    args = parser.parse_args()
+
+    fake = FakeMemoryClient()
+    retriever = MultiNamespaceRetriever([ns for ns, _ in NAMESPACES], top_k=5, deadline_seconds=args.deadline)
+    paths = retriever.paths(ACTOR_ID, SESSION_ID)
+    for name, texts in RECORDS.items():
+        for text in texts:
+            fake.add_record(MEMORY_ID, paths[name], text)
+    client = NamespaceLatency(fake, {paths[ns.name]: lognormal(median, 0.3) for ns, median in NAMESPACES})
+
+    def fetch_for(query):
+        return lambda namespace, top_k: client.retrieve_memories(
+            memory_id=MEMORY_ID, namespace=namespace, query=query, top_k=top_k)
+
+    timings = {ns.name: [] for ns, _ in NAMESPACES}
+    timings.update(sequential=[], fanout=[])
+    sources, duplicates = Counter(), 0
+    for i in range(args.queries):
+        query = QUESTIONS[i % len(QUESTIONS)]
+        fetch = fetch_for(query)
+        start = time.perf_counter()
+        for ns, _ in NAMESPACES:
+            single = time.perf_counter()
+            fetch(paths[ns.name], ns.top_k)
+            timings[ns.name].append(time.perf_counter() - single)
+        timings["sequential"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        merged = retriever.retrieve(fetch, paths)
+        timings["fanout"].append(time.perf_counter() - start)
+        sources.update(record["source"] for record in merged.records)
+        duplicates += merged.duplicates
+
+    print(f"{args.queries} queries over {len(NAMESPACES)} namespaces")
+    for name, samples in timings.items():
+        p50, p95 = percentiles(samples)
+        print(f"  {name:<12} p50 {p50:6.0f}ms  p95 {p95:6.0f}ms")
+    slowest = max(statistics.median(timings[ns.name]) for ns, _ in NAMESPACES)
+    print(f"  fan-out p50 is {statistics.median(timings['fanout']) / slowest:.2f}x the slowest single namespace, "
+          f"{statistics.median(timings['fanout']) / statistics.median(timings['sequential']):.2f}x sequential")
+    print(f"  merged records per query by source: "
+          + ", ".join(f"{name} {count / args.queries:.1f}" for name, count in sources.items())
+          + f"; {duplicates / args.queries:.1f} duplicates dropped")
+
+    # One namespace stops answering: the others still arrive within the deadline
+    stuck = paths[NAMESPACES[0][0].name]
+    client.latencies[stuck] = lambda namespace, rng: args.stuck
+    samples, late = [], 0
+    for i in range(5):
+        start = time.perf_counter()
+        merged = retriever.retrieve(fetch_for(QUESTIONS[i]), paths)
+        samples.append(time.perf_counter() - start)
+        late += len(merged.late)
+    p50, _ = percentiles(samples)
+    print(f"  with {NAMESPACES[0][0].name} stuck for {args.stuck:.0f}s: p50 {p50:.0f}ms "
+          f"(deadline {args.deadline * 1000:.0f}ms), {late} of 5 searches left it out")
+
+
+if __name__ == "__main__":
+    main()
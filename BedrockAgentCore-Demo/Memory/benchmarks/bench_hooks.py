@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the memory hook providers
+Drives MemoryHookProvider (02-ShortTerm) and LongTermMemoryHookProvider (03-LongTerm)
+through real Strands agents backed by StubModel and FakeMemoryClient, and reports
+per turn: time added by the hooks, time in each hook callback, MemoryClient calls,
+memory allocated and the size of the last prompt sent to the model. Results are compared with baselines.json when it exists.
+
+Run with:
+    python benchmarks/bench_hooks.py                 # compare with saved baselines
+    python benchmarks/bench_hooks.py --latency 0.02  # 20ms per MemoryClient call
+    python benchmarks/bench_hooks.py --save          # record new baselines
+    python benchmarks/bench_hooks.py --check         # exit 1 on regression (for CI)
+
+Timings are the median of --repeats runs, so one slow run doesn't fail the check.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from strands import Agent
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from strands.hooks import HookProvider, HookRegistry
+
+from common.batching import EventBatcher
+from common.compaction import ConversationCompactor
+from common.history_cache import HistoryCache
+from common.journal import EventJournal
+from common.retrieval_cache import RetrievalCache
+from fakes import FakeMemoryClient, StubModel
+
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+MEMORY_ID, ACTOR_ID = "bench-memory", "bench_student"
+PROMPTS = [
+    "What is the derivative of x squared?",
+    "Can you explain the chain rule?",
+    "How do I integrate 2x?",
+    "What is a limit?",
+    "Explain the product rule with an example",
+]
+
+
+def load_app(folder: str, name: str):
+    """Import an app.py by path (the app folders are not Python packages)"""
+    spec = importlib.util.spec_from_file_location(name, ROOT / folder / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TimedHooks(HookProvider):
+    """Registers another provider's callbacks wrapped with timers"""
+
+    def __init__(self, provider: HookProvider, timings: dict):
+        self.provider = provider
+        self.timings = timings
+
+    def register_hooks(self, registry: HookRegistry):
+        timings = self.timings
+
+        class _Registry:
+            def add_callback(self, event_type, callback):
+                key = f"{event_type.__name__}:{callback.__name__}"
+
+                def timed(event):
+                    start = time.perf_counter()
+                    try:
+                        callback(event)
+                    finally:
+                        timings[key].append(time.perf_counter() - start)
+                registry.add_callback(event_type, timed)
+
+        self.provider.register_hooks(_Registry())
+
+
+class Hooks(HookProvider):
+    """Several providers registered as one, in order"""
+
+    def __init__(self, *providers: HookProvider):
+        self.providers = providers
+
+    def register_hooks(self, registry: HookRegistry):
+        for provider in self.providers:
+            provider.register_hooks(registry)
+
+
+def retrieval_caches(provider):
+    providers = getattr(provider, "providers", (provider,))
+    return [p.retrieval_cache for p in providers if getattr(p, "retrieval_cache", None) is not None]
+
+
+def scenarios(short_term, long_term):
+    """name -> factory(client, session_id) returning a hook provider (or None), a cleanup
+    and a settle callback run between turns, outside the timings (both optional)"""
+    def short_plain(client, session_id):
+        return short_term.MemoryHookProvider(client, MEMORY_ID, ACTOR_ID, session_id), None, None
+
+    def short_cached(client, session_id):
+        batcher = EventBatcher(client)
+        provider = short_term.MemoryHookProvider(client, MEMORY_ID, ACTOR_ID, session_id, batcher=batcher,
+                                                 history_cache=HistoryCache())
+        return provider, batcher.close, None
+
+    def long_plain(client, session_id):
+        return long_term.LongTermMemoryHookProvider(MEMORY_ID, client, ACTOR_ID, session_id), None, None
+
+    def long_cached(client, session_id):
+        return long_term.LongTermMemoryHookProvider(MEMORY_ID, client, ACTOR_ID, session_id,
+                                                    retrieval_cache=RetrievalCache()), None, None
+
+    def short_compacted(client, session_id):
+        provider, cleanup, settle = short_cached(client, session_id)
+        return Hooks(ConversationCompactor(keep_turns=6), provider), cleanup, settle
+
+    def long_compacted(client, session_id):
+        provider, cleanup, settle = long_cached(client, session_id)
+        return Hooks(ConversationCompactor(keep_turns=6), provider), cleanup, settle
+
+    def long_journaled(client, session_id):
+        workdir = tempfile.TemporaryDirectory()
+        journal = EventJournal(Path(workdir.name) / "journal.db", client)
+        provider = long_term.LongTermMemoryHookProvider(MEMORY_ID, client, ACTOR_ID, session_id,
+                                                        retrieval_cache=RetrievalCache(), journal=journal)
+
+        def cleanup():
+            journal.close()
+            workdir.cleanup()
+        # Deliver each turn before the next one reads, or the prompt depends on the replayer's timing
+        return provider, cleanup, journal.flush
+
+    return {
+        "no_hooks": lambda client, session_id: (None, None, None),
+        "short_term": short_plain,
+        "short_term_cached": short_cached,
+        "short_term_compacted": short_compacted,
+        "long_term": long_plain,
+        "long_term_cached": long_cached,
+        "long_term_journaled": long_journaled,
+        "long_term_compacted": long_compacted,
+    }
+
+
+def run_scenario(factory, sessions: int, turns: int, latency: float, trace_memory: bool):
+    """Simulate `sessions` browser sessions (one new Agent each) of `turns` turns"""
+    client = FakeMemoryClient(latency=latency)
+    timings = defaultdict(list)
+    turn_times, setup_times, last_prompts = [], [], []
+    cleanups, caches = [], []
+    if trace_memory:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+    # Same ids every time, like the app after a browser refresh
+    session_id = f"{ACTOR_ID}_{MEMORY_ID[:8]}_session"
+    for _ in range(sessions):
+        provider, cleanup, settle = factory(client, session_id)
+        if cleanup:
+            cleanups.append(cleanup)
+        caches += retrieval_caches(provider)
+        start = time.perf_counter()
+        model = StubModel()
+        agent = Agent(model=model, hooks=[TimedHooks(provider, timings)] if provider else [],
+                      callback_handler=None)
+        setup_times.append(time.perf_counter() - start)
+        for turn in range(turns):
+            start = time.perf_counter()
+            agent(PROMPTS[turn % len(PROMPTS)])
+            turn_times.append(time.perf_counter() - start)
+            if settle:
+                settle()
+        last_prompts.append(model.prompt_tokens[-1])
+
+    for cleanup in cleanups:
+        cleanup()  # flushes queued writes so their calls are counted
+    # Median per call x calls, so a GC pause in one callback doesn't swing the totals
+    def total_ms(init: bool) -> float:
+        return sum(statistics.median(values) * len(values) * 1000 for key, values in timings.items()
+                   if key.startswith("AgentInitializedEvent") == init)
+
+    result = {
+        "hook_ms_per_turn": total_ms(False) / (sessions * turns),
+        "init_hook_ms": total_ms(True) / sessions,
+        "setup_ms": statistics.median(setup_times) * 1000,
+        "turn_ms": statistics.median(turn_times) * 1000,
+        "calls_per_turn": sum(client.calls.values()) / (sessions * turns),
+        "last_prompt_tokens": statistics.mean(last_prompts),
+        "calls": dict(client.calls),
+        "hooks_us": {key: statistics.median(values) * 1e6 for key, values in sorted(timings.items())},
+    }
+    lookups = sum(sum(cache.stats.values()) for cache in caches)
+    if lookups:
+        result["cache_hit_rate"] = sum(cache.stats["hits"] + cache.stats["near_hits"] for cache in caches) / lookups
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        growth = tracemalloc.take_snapshot().compare_to(before, "filename")
+        tracemalloc.stop()
+        result["peak_kib"] = peak / 1024
+        result["alloc_blocks_per_turn"] = sum(s.count_diff for s in growth if s.count_diff > 0) / (sessions * turns)
+    return result
+
+
+def compare(name: str, metric: str, value: float, baseline: dict, tolerance: float, floor: Optional[float]) -> str:
+    """Mark a metric that grew more than tolerance (and more than floor in absolute terms).
+    Metrics with floor None are shown for reference only (too noisy to gate on)."""
+    old = baseline.get(name, {}).get(metric)
+    if old is None:
+        return ""
+    if floor is not None and value > old * (1 + tolerance) and value - old > floor:
+        return f" REGRESSION (was {old:.2f})"
+    return f" (was {old:.2f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every MemoryClient call")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth before flagging")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per scenario; timings are their median")
+    parser.add_argument("--save", action="store_true", help=f"write results to {BASELINES.name}")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if anything regressed")
+    args = parser.parse_args()
+
+    short_term = load_app("02-ShortTerm", "short_term_app")
+    long_term = load_app("03-LongTerm", "long_term_app")
+    # The hooks report through st.info/st.success, which only warn outside `streamlit run`
+    logging.getLogger(get_script_run_ctx.__module__).addFilter(lambda record: False)
+    settings = {"sessions": args.sessions, "turns": args.turns, "latency": args.latency}
+    baseline = {}
+    if BASELINES.exists() and not args.save:
+        saved = json.loads(BASELINES.read_text())
+        if saved.get("settings") == settings:
+            baseline = saved.get("results", {})
+        else:
+            print(f"Not comparing: {BASELINES.name} was recorded with {saved.get('settings')}")
+
+    results, regressions = {}, 0
+    for name, factory in scenarios(short_term, long_term).items():
+        run_scenario(factory, 2, 2, args.latency, False)  # warm-up (imports, first-call caches)
+        runs = [run_scenario(factory, args.sessions, args.turns, args.latency, False)
+                 for _ in range(max(1, args.repeats))]
+        result = dict(runs[0])
+        for metric in ("hook_ms_per_turn", "init_hook_ms", "setup_ms", "turn_ms"):
+            result[metric] = statistics.median(run[metric] for run in runs)
+        result.update({k: v for k, v in run_scenario(factory, args.sessions, args.turns, args.latency, True).items()
+                       if k in ("peak_kib", "alloc_blocks_per_turn")})
+        results[name] = result
+
+        lines = [
+            ("hook_ms_per_turn", result["hook_ms_per_turn"], 0.5, "ms/turn spent in hooks"),
+            ("init_hook_ms", result["init_hook_ms"], 0.5, "ms in hooks at agent start"),
+            ("turn_ms", result["turn_ms"], None, "ms/turn end to end"),
+            ("setup_ms", result["setup_ms"], None, "ms agent setup"),
+            ("calls_per_turn", result["calls_per_turn"], 0.0, "MemoryClient calls/turn"),
+            ("last_prompt_tokens", result["last_prompt_tokens"], 0.0, "tokens in the last turn's prompt"),
+            ("alloc_blocks_per_turn", result["alloc_blocks_per_turn"], 50, "blocks allocated/turn"),
+            ("peak_kib", result["peak_kib"], 64, "KiB peak traced memory"),
+        ]
+        if "cache_hit_rate" in result:
+            lines.append(("cache_hit_rate", result["cache_hit_rate"], None, "retrieval cache hit rate"))
+        print(f"\n{name}")
+        for metric, value, floor, label in lines:
+            note = compare(name, metric, value, baseline, args.tolerance, floor)
+            regressions += "REGRESSION" in note
+            print(f"  {value:10.2f} {label}{note}")
+        for key, micros in result["hooks_us"].items():
+            print(f"  {micros:10.1f} us  {key}")
+        print(f"  calls: {result['calls']}")
+
+    if args.save:
+        BASELINES.write_text(json.dumps({
+            "settings": settings,
+            "results": results,
+        }, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baselines to {BASELINES}")
+    elif baseline:
+        print(f"\n{regressions} regression(s) against {BASELINES.name}")
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
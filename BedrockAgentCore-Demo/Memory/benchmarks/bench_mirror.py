@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline check and benchmark for common/vector_mirror.py
+Mirrors a seeded FakeMemoryClient namespace (through memory_record_source, which pages
+list_memory_records) with HashingEmbedder, then compares
+retrieve_memories on the fake service (--latency per call) with the local search:
+  sync       records embedded on the first sync, and on a re-sync after new records
+             (only the new ones should be embedded)
+  search     p50/p95 of service vs mirror lookups, and how often the top record is on topic
+  queries    embedder calls for the same query searched in 3 namespaces (should be 1)
+  stale      a mirror past max_staleness_seconds returns None, so callers use the service
+
+Run with: python benchmarks/bench_mirror.py [--records 500] [--queries 200]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.vector_mirror import HashingEmbedder, VectorMirror, memory_record_source
+from fake_memory import FakeMemoryClient
+
+MEMORY_ID, NAMESPACE = "bench-memory", "/students/math/bench_student"
+TOPICS = ["negative numbers", "the chain rule", "fractions", "quadratic equations", "derivatives",
+          "integrals", "limits", "the product rule", "long division", "percentages"]
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, dim: int = 256):
+        super().__init__(dim)
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        return super().__call__(texts)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[max(0, int(len(samples) * 0.95) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake retrieve_memories latency")
+    args = parser.parse_args()
+    problems = []
+
+    client = FakeMemoryClient()
+    for i in range(args.records):
+        client.add_record(MEMORY_ID, NAMESPACE, f"The student practiced {TOPICS[i % len(TOPICS)]} (exercise {i})")
+    embedder = CountingEmbedder()
+    mirror = VectorMirror(memory_record_source(client), embedder, dim=embedder.dim, background=False)
+    start = time.perf_counter()
+    mirror.sync(MEMORY_ID, NAMESPACE)
+    print(f"sync       {mirror.stats['embedded']} records embedded in {(time.perf_counter() - start) * 1000:.0f}ms")
+    for i in range(10):
+        client.add_record(MEMORY_ID, NAMESPACE, f"The student asked about {TOPICS[i]} again")
+    embedded = mirror.stats["embedded"]
+    mirror.sync(MEMORY_ID, NAMESPACE)
+    resynced = mirror.stats["embedded"] - embedded
+    print(f"           re-sync after 10 new records embedded {resynced}")
+    if resynced != 10:
+        problems.append(f"re-sync embedded {resynced} records, expected 10")
+
+    client.latency = args.latency
+    service, local, agree = [], [], 0
+    for i in range(args.queries):
+        query = f"How do I get better at {TOPICS[i % len(TOPICS)]}? ({i})"  # a new query every time
+        begin = time.perf_counter()
+        client.retrieve_memories(memory_id=MEMORY_ID, namespace=NAMESPACE, query=query, top_k=3)
+        service.append(time.perf_counter() - begin)
+        begin = time.perf_counter()
+        mirrored = mirror.search(MEMORY_ID, NAMESPACE, query, top_k=3)
+        local.append(time.perf_counter() - begin)
+        agree += TOPICS[i % len(TOPICS)] in mirrored[0]["content"]["text"]
+    for label, samples in (("service", service), ("mirror", local)):
+        p50, p95 = percentiles(samples)
+        print(f"search     {label:<8} p50 {p50:7.2f}ms  p95 {p95:7.2f}ms")
+    print(f"           mirror's top record was about the asked topic for {agree} of {args.queries} queries")
+    if percentiles(local)[0] >= 1.0:
+        problems.append("local search p50 is not under 1ms")
+
+    for namespace in ("/a", "/b"):
+        for text in ("The student likes worked examples", "Session summary: fractions"):
+            client.add_record(MEMORY_ID, namespace, text)
+        mirror.sync(MEMORY_ID, namespace)
+    calls = embedder.calls
+    for namespace in (NAMESPACE, "/a", "/b"):
+        mirror.search(MEMORY_ID, namespace, "Can I have a worked example on fractions?", top_k=2)
+    print(f"queries    one query searched in 3 namespaces: {embedder.calls - calls} embedder call(s)")
+    if embedder.calls - calls != 1:
+        problems.append("query embedded more than once")
+
+    mirror.max_staleness_seconds = 0.0
+    stale = mirror.search(MEMORY_ID, NAMESPACE, "fractions", top_k=3)
+    print(f"stale      search on a stale mirror returned {stale!r} (callers fall back to the service)")
+    if stale is not None:
+        problems.append("stale mirror answered")
+
+    print("PASS" if not problems else "FAIL " + "; ".join(problems))
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
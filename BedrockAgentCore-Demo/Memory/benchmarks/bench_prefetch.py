@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for common/prefetch.py
+Runs 02-ShortTerm and 03-LongTerm in streamlit's AppTest, in fresh processes with
+MEMORY_PREFETCH on and off, against FakeMemoryClient (--read-latency per history
+load or retrieval) and StubModel. Measures, per script run:
+  02  connect  selecting a memory builds the agent, which loads the history
+  03  first    first prompt of a new student: the agent is built, then it retrieves
+  03  warm     later prompts: rendering the chat and leasing the agent, then it retrieves
+Each run starts --think seconds after the previous one (prewarm() imports strands
+meanwhile, so how much is left to overlap varies from run to run). Off and on runs
+alternate, and each line shows the median with the interquartile range: import
+timing makes the spread as large as the read itself, so compare the ranges, not
+just the medians. With prefetch on, it also reports how much of each read was done
+before the hook asked for it.
+
+Run with: python benchmarks/bench_prefetch.py [--read-latency 0.15] [--repeat 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROMPTS = ["What is the derivative of x squared?", "Can you explain the chain rule?", "How do I integrate 2x?",
+           "What is a limit?", "Explain the product rule with an example", "What is an integral?"]
+
+
+def measure(app: str, args) -> dict:
+    import streamlit  # noqa: F401 (loaded by `streamlit run` before the app)
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import common.clients
+    import common.prefetch
+    import common.startup
+    from fake_memory import FakeMemoryClient, per_method
+
+    class RecordingPrefetcher(common.prefetch.Prefetcher):
+        instances = []
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.instances.append(self)
+
+    common.prefetch.Prefetcher = RecordingPrefetcher  # the apps import it on every script run
+
+    client = FakeMemoryClient(latency=per_method(0.0, retrieve_memories=args.read_latency,
+                                                 get_last_k_turns=args.read_latency, create_event=0.02))
+    memory_id = client.create_memory("Prefetch")["id"]
+    for prompt in PROMPTS[:3]:  # history for the 02 actor
+        client.create_event(memory_id, "demo_user", f"demo_user_{memory_id[:8]}_session",
+                            [(prompt, "USER"), ("Sure, here is the answer.", "ASSISTANT")])
+    common.clients.get_memory_client = lambda region_name=None: client
+    common.startup.create_model = lambda **config: __import__("fakes").StubModel(delay=args.model_delay)
+
+    def timed(element) -> float:
+        start = time.perf_counter()
+        element.run()
+        return (time.perf_counter() - start) * 1000
+
+    at = AppTest.from_file(str(ROOT / app / "app.py"), default_timeout=120)
+    at.run()
+    time.sleep(args.think)
+    result = {}
+    if at.selectbox:  # 02: picking the memory builds the agent and loads its history
+        result["connect_ms"] = timed(at.selectbox[0].select(at.selectbox[0].options[1]))
+        time.sleep(args.think)
+    first = timed(at.chat_input[0].set_value(PROMPTS[0]))
+    if "connect_ms" not in result:
+        result["first_ms"] = first
+        result["warm_ms"] = statistics.median(timed(at.chat_input[0].set_value(prompt))
+                                              for prompt in PROMPTS[1:args.turns])
+    stats = [prefetcher.stats for prefetcher in RecordingPrefetcher.instances]
+    used = sum(s["ready"] + s["waited"] for s in stats)
+    result["overlap_ms"] = sum(s["overlap_seconds"] for s in stats) * 1000 / used if used else None
+    result["errors"] = [e.value for e in at.exception] + [e.value for e in at.error]
+    return result
+
+
+def spread(samples) -> str:
+    q1, median, q3 = statistics.quantiles(samples, n=4) if len(samples) > 1 else samples * 3
+    return f"{median:6.0f}ms [{q1:.0f}-{q3:.0f}]"
+
+
+def run_child(app: str, prefetch: bool, args) -> dict:
+    env = dict(os.environ, MEMORY_PREFETCH="1" if prefetch else "0",
+               MEMORY_JOURNAL=str(Path(args.workdir) / f"{app}-{time.monotonic_ns()}.db"))
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", app, "--think", str(args.think), "--turns", str(args.turns),
+         "--read-latency", str(args.read_latency), "--model-delay", str(args.model_delay)],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if out.returncode or not lines:
+        raise RuntimeError(f"{app} failed:\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--read-latency", type=float, default=0.15, help="seconds per history load or retrieval")
+    parser.add_argument("--model-delay", type=float, default=0.2, help="seconds per model reply")
+    parser.add_argument("--think", type=float, default=0.5, help="seconds between runs")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=15, help="fresh processes per measurement (median)")
+    parser.add_argument("--child", metavar="APP", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print("\n" + json.dumps(measure(args.child, args)))  # the agents' default callback handler prints replies
+        return
+
+    print(f"memory reads {args.read_latency * 1000:.0f}ms, model {args.model_delay * 1000:.0f}ms, "
+          f"{args.think:.1f}s between runs")
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        for app, metrics in (("02-ShortTerm", ("connect_ms",)), ("03-LongTerm", ("first_ms", "warm_ms"))):
+            runs = {False: [], True: []}
+            for _ in range(args.repeat):  # alternate, so drift on the machine hits both settings alike
+                for prefetch in (False, True):
+                    runs[prefetch].append(run_child(app, prefetch, args))
+            for error in {e for rs in runs.values() for r in rs for e in r["errors"]}:
+                print(f"  {app}: {error}")
+            for metric in metrics:
+                off, on = ([r[metric] for r in runs[prefetch]] for prefetch in (False, True))
+                print(f"{app:<13} {metric[:-3]:<8} {spread(off)} -> {spread(on)} with prefetch "
+                      f"({statistics.median(off) - statistics.median(on):.0f}ms saved at the median)")
+            overlap = statistics.median(r["overlap_ms"] for r in runs[True])
+            print(f"{app:<13} prefetched reads were {overlap:.0f}ms along (of {args.read_latency * 1000:.0f}ms) "
+                  f"when the hook asked for them")
+
+
+if __name__ == "__main__":
+    main()
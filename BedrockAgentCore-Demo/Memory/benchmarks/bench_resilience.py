@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for common/resilience.py
+Several students chat at once with the 03-LongTerm hook provider (StubModel, no
+journal, so every turn retrieves and saves inline) while FakeMemoryClient goes
+through three phases:
+  steady    lognormal latency, with a few retrievals straggling for --straggler seconds
+  outage    every call takes --outage-latency seconds and half of them fail
+  recovered back to steady
+  search down  steady latency, but every retrieval fails (MemoryClient would log it and
+            return [], so the breaker has to see the underlying retrieve_memory_records)
+Each phase runs once against the raw client and once through ResilientClient, and
+reports turn latency, how many turns went without memory and what the breaker did.
+
+Run with: python benchmarks/bench_resilience.py [--actors 8] [--turns 20]
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from strands import Agent
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from bench_hooks import MEMORY_ID, PROMPTS, load_app
+from common.resilience import CircuitBreaker, ResilientClient
+from fake_memory import FakeMemoryClient, lognormal, per_method, stragglers
+from fakes import StubModel
+
+
+def phases(args):
+    steady = per_method(lognormal(0.03),
+                        retrieve_memories=stragglers(lognormal(0.08), args.straggler, args.straggler_rate),
+                        create_event=lognormal(0.05))
+    return [("steady", steady, 0.0, args.turns), ("outage", args.outage_latency, 0.5, args.outage_turns),
+            ("recovered", steady, 0.0, args.turns),
+            ("search down", steady, {"retrieve_memories": 1.0}, args.outage_turns)]
+
+
+def run(mode: str, long_term, args):
+    fake = FakeMemoryClient(seed=1)
+    client = fake
+    if mode == "resilient":
+        client = ResilientClient(fake, hedge_after=args.hedge_after,
+                                 breaker=CircuitBreaker(cooldown_seconds=args.cooldown))
+    agents = {}
+    for i in range(args.actors):
+        actor_id = f"student_{i}"
+        hook = long_term.LongTermMemoryHookProvider(MEMORY_ID, client, actor_id, f"{actor_id}_session")
+        agents[actor_id] = Agent(model=StubModel(delay=args.model_delay), hooks=[hook], callback_handler=None)
+
+    def chat(actor_id: str, turns: int):
+        latencies = []
+        for turn in range(turns):
+            start = time.perf_counter()
+            agents[actor_id](PROMPTS[turn % len(PROMPTS)])
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    results = []
+    for name, latency, error_rate, turns in phases(args):
+        fake.latency, fake.error_rate = latency, error_rate
+        before = dict(client.stats) if mode == "resilient" else {}
+        skipped_before = client.breaker.stats["short_circuited"] if mode == "resilient" else 0
+        retrieves_before = fake.calls["retrieve_memories"]
+        with ThreadPoolExecutor(args.actors) as executor:
+            latencies = sorted(t for ts in executor.map(chat, agents, [turns] * args.actors) for t in ts)
+        result = {
+            "phase": name, "turns": len(latencies),
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "retrieve_calls": fake.calls["retrieve_memories"] - retrieves_before,
+        }
+        if mode == "resilient":
+            result.update({key: client.stats[key] - before[key] for key in ("timeouts", "hedges", "hedge_wins")})
+            result["skipped"] = client.breaker.stats["short_circuited"] - skipped_before
+            result["breaker"] = client.breaker.state
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actors", type=int, default=8, help="students chatting at once")
+    parser.add_argument("--turns", type=int, default=20, help="turns per student in the steady phases")
+    parser.add_argument("--outage-turns", type=int, default=3, help="turns per student during the outage")
+    parser.add_argument("--model-delay", type=float, default=0.2, help="seconds per model reply")
+    parser.add_argument("--straggler", type=float, default=2.0, help="seconds a straggling retrieval takes")
+    parser.add_argument("--straggler-rate", type=float, default=0.03, help="share of retrievals that straggle")
+    parser.add_argument("--outage-latency", type=float, default=2.0, help="seconds per call during the outage")
+    parser.add_argument("--hedge-after", type=float, default=0.3)
+    parser.add_argument("--cooldown", type=float, default=2.0, help="breaker cooldown (30s in the apps)")
+    args = parser.parse_args()
+
+    logging.getLogger(get_script_run_ctx.__module__).addFilter(lambda record: False)
+    long_term = load_app("03-LongTerm", "long_term_app")
+    logging.getLogger("common.resilience").setLevel(logging.ERROR)
+    logging.getLogger("fake_memory").setLevel(logging.ERROR)
+    print(f"{args.actors} students, model {args.model_delay * 1000:.0f}ms per reply")
+    print(f"{'mode':<10} {'phase':<11} {'turns':>5} {'p50':>8} {'p99':>8} {'max':>8}  memory service")
+    for mode in ("direct", "resilient"):
+        for r in run(mode, long_term, args):
+            line = (f"{mode:<10} {r['phase']:<11} {r['turns']:5d} {r['p50_ms']:6.0f}ms {r['p99_ms']:6.0f}ms "
+                    f"{r['max_ms']:6.0f}ms  {r['retrieve_calls']} retrievals")
+            if mode == "resilient":
+                line += (f", {r['hedges']} hedged ({r['hedge_wins']} won), {r['timeouts']} timed out, "
+                         f"{r['skipped']} skipped, breaker {r['breaker']}")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
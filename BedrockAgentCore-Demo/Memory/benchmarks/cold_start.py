@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cold start of the Streamlit demo apps, fully offline
+Every measurement runs in a fresh Python process with streamlit already imported
+(as under `streamlit run`):
+  import       time to import app.py, and which heavy modules that loaded
+  first page   first script run in streamlit's AppTest (what a new visitor waits for)
+  first reply  time from sending the first prompt to the reply, after --think seconds
+               on the page (prewarm() imports strands meanwhile)
+MemoryClient and the Bedrock model are replaced by benchmarks/fake_memory.py and
+StubModel, patched in without importing strands early, so only local work is timed.
+
+Run with: python benchmarks/cold_start.py [--think 1.0] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ["01-NoMemory", "02-ShortTerm", "03-LongTerm"]
+HEAVY = ["strands", "strands_tools", "sympy", "boto3", "bedrock_agentcore"]
+
+
+def measure_import(app: str) -> dict:
+    import importlib.util
+    import streamlit  # noqa: F401 (loaded by `streamlit run` before the app)
+
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("app", ROOT / app / "app.py")
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    return {"import_ms": (time.perf_counter() - start) * 1000, "heavy": [m for m in HEAVY if m in sys.modules]}
+
+
+def measure_serve(app: str, think: float, latency: float) -> dict:
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import common.clients
+    import common.startup
+    from fake_memory import FakeMemoryClient
+
+    client = FakeMemoryClient(latency=latency)
+    client.create_memory("ColdStart")
+    common.clients.get_memory_client = lambda region_name=None: client
+    # StubModel needs strands, so it is imported when the app first asks for a model
+    common.startup.create_model = lambda **config: __import__("fakes").StubModel()
+
+    at = AppTest.from_file(str(ROOT / app / "app.py"), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    first_page = time.perf_counter() - start
+    if at.selectbox:  # 02 asks which memory to use
+        at.selectbox[0].select(at.selectbox[0].options[1]).run()
+    time.sleep(think)
+    start = time.perf_counter()
+    at.chat_input[0].set_value("What is the derivative of x squared?").run()
+    first_reply = time.perf_counter() - start
+    errors = [e.value for e in at.exception] + [e.value for e in at.error]
+    return {"first_page_ms": first_page * 1000, "first_reply_ms": first_reply * 1000, "errors": errors}
+
+
+def run_child(mode: str, app: str, args) -> dict:
+    env = dict(os.environ, MEMORY_JOURNAL=str(Path(args.workdir) / f"{app}-{time.monotonic_ns()}.db"))
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, app, "--think", str(args.think), "--latency", str(args.latency)],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if out.returncode or not lines:
+        raise RuntimeError(f"{mode} {app} failed:\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between page load and first prompt")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake MemoryClient call")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement (median)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "APP"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        mode, app = args.child
+        result = measure_import(app) if mode == "import" else measure_serve(app, args.think, args.latency)
+        print("\n" + json.dumps(result))  # the agents' default callback handler prints replies to stdout
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        print(f"{'app':<14} {'import':>9} {'first page':>11} {'first reply':>12}  heavy modules at import")
+        for app in APPS:
+            imports = [run_child("import", app, args) for _ in range(args.repeat)]
+            serves = [run_child("serve", app, args) for _ in range(args.repeat)]
+            for error in {e for s in serves for e in s["errors"]}:
+                print(f"  {app}: {error}")
+            print(f"{app:<14} {statistics.median(r['import_ms'] for r in imports):7.0f}ms "
+                  f"{statistics.median(r['first_page_ms'] for r in serves):9.0f}ms "
+                  f"{statistics.median(r['first_reply_ms'] for r in serves):10.0f}ms  "
+                  f"{', '.join(imports[0]['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
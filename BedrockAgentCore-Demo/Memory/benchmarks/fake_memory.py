@@ -0,0 +1,188 @@
+"""
+In-process fake of bedrock_agentcore's MemoryClient for running the memory demos without AWS
+Keeps events and extracted records in memory, with injected latency (a constant or
+a distribution, see below), injected failures and per-method call counts. Imports
+nothing heavy, so cold_start.py can use it before strands loads.
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Latency = Callable[[str, random.Random], float]  # (method, rng) -> seconds
+
+
+def lognormal(median: float, sigma: float = 0.5) -> Latency:
+    """Right-skewed latency around median, like most network services"""
+    return lambda method, rng: rng.lognormvariate(0, sigma) * median
+
+
+def stragglers(base: Union[float, Latency], slow: float, probability: float) -> Latency:
+    """base latency, except that `probability` of the calls take `slow` seconds"""
+    base = _as_latency(base)
+    return lambda method, rng: slow if rng.random() < probability else base(method, rng)
+
+
+def per_method(default: Union[float, Latency] = 0.0, **methods: Union[float, Latency]) -> Latency:
+    """Different latency per MemoryClient method, e.g. per_method(0.01, retrieve_memories=lognormal(0.1))"""
+    default = _as_latency(default)
+    methods = {name: _as_latency(latency) for name, latency in methods.items()}
+    return lambda method, rng: methods.get(method, default)(method, rng)
+
+
+def _as_latency(latency: Union[float, Latency]) -> Latency:
+    return latency if callable(latency) else (lambda method, rng: latency)
+
+
+class FakeServiceError(RuntimeError):
+    pass
+
+
+class FakeMemoryClient:
+    """Keeps events in memory and sleeps latency (+ up to jitter) seconds per call.
+
+    latency is seconds or a distribution (lognormal(), stragglers(), per_method());
+    error_rate is the share of calls that fail with FakeServiceError after their delay
+    (or a dict of method name -> share). Both can be changed while the client is in use, e.g. to simulate an outage.
+    Every user message is "extracted" into each of the namespaces templates.
+    Like MemoryClient, retrieve_memories logs a failed retrieve_memory_records and returns [].
+    New memories stay CREATING for activation_seconds, then turn activation_status
+    ("ACTIVE", or "FAILED" to simulate a failed creation).
+    """
+
+    def __init__(self, latency: Union[float, Latency] = 0.0, jitter: float = 0.0, seed: int = 0,
+                 error_rate: Union[float, Dict[str, float]] = 0.0, namespaces: Iterable[str] = ("/students/math/{actorId}",),
+                 activation_seconds: float = 0.0, activation_status: str = "ACTIVE"):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.activation_seconds = activation_seconds
+        self.activation_status = activation_status
+        self.namespaces = tuple(namespaces)
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._events: Dict[tuple, List[List[Dict]]] = defaultdict(list)
+        self._records: Dict[tuple, List[Dict]] = defaultdict(list)
+        self._memories: Dict[str, Dict] = {}
+        self._activations: Dict[str, Tuple[float, str]] = {}  # memory id -> (monotonic ready time, final status)
+        self._tokens: Dict[str, Dict] = {}  # client_token -> event, for idempotent retries
+
+    def _call(self, name: str):
+        with self._lock:
+            self.calls[name] += 1
+            delay = self.latency(name, self._random) if callable(self.latency) else self.latency
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            rate = self.error_rate.get(name, 0.0) if isinstance(self.error_rate, dict) else self.error_rate
+            failed = rate and self._random.random() < rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise FakeServiceError(f"Injected {name} failure")
+
+    def create_event(self, memory_id: str, actor_id: str, session_id: str, messages: List[tuple],
+                     client_token: Optional[str] = None, **kwargs):
+        self._call("create_event")
+        turn = [{"role": role.upper(), "content": {"text": text}} for text, role in messages]
+        with self._lock:
+            if client_token and client_token in self._tokens:
+                return self._tokens[client_token]  # same request again: don't store a duplicate
+            event = {"eventId": uuid.uuid4().hex}
+            if client_token:
+                self._tokens[client_token] = event
+            self._events[(memory_id, actor_id, session_id)].append(turn)
+            # Pretend the long-term strategies extracted every user message into their namespaces
+            for text, role in messages:
+                if role != "USER":
+                    continue
+                for template in self.namespaces:
+                    self._add_record(memory_id, template.format(actorId=actor_id, sessionId=session_id),
+                                     f"The student asked: {text}")
+        return event
+
+    def add_record(self, memory_id: str, namespace: str, text: str):
+        """Seed a long-term memory record directly (no call is counted)"""
+        with self._lock:
+            self._add_record(memory_id, namespace, text)
+
+    def _add_record(self, memory_id: str, namespace: str, text: str):
+        self._records[(memory_id, namespace)].append({
+            "memoryRecordId": uuid.uuid4().hex,
+            "content": {"text": text},
+            "namespaces": [namespace],
+            "createdAt": datetime.now(timezone.utc),
+        })
+
+    def get_last_k_turns(self, memory_id: str, actor_id: str, session_id: str, k: int = 5, **kwargs):
+        self._call("get_last_k_turns")
+        with self._lock:
+            return [list(turn) for turn in self._events[(memory_id, actor_id, session_id)][-k:]]
+
+    def retrieve_memories(self, memory_id: str, namespace: str, query: str, top_k: int = 3, **kwargs):
+        try:
+            response = self.retrieve_memory_records(memoryId=memory_id, namespace=namespace,
+                                                    searchCriteria={"searchQuery": query, "topK": top_k})
+        except FakeServiceError as e:
+            logger.warning("Memory retrieval failed: %s", e)
+            return []
+        return response["memoryRecordSummaries"]
+
+    def retrieve_memory_records(self, memoryId: str, namespace: str, searchCriteria: Dict, **kwargs):
+        self._call("retrieve_memories")  # counted (and delayed) as the search it serves
+        memory_id, query, top_k = memoryId, searchCriteria["searchQuery"], searchCriteria.get("topK", 10)
+        words = set(query.lower().split())
+        with self._lock:
+            records = list(self._records[(memory_id, namespace)])
+        scored = []
+        for record in records:
+            overlap = len(words & set(record["content"]["text"].lower().split()))
+            scored.append(dict(record, score=overlap / (len(words) or 1)))
+        scored.sort(key=lambda r: r["score"], reverse=True)
+        return {"memoryRecordSummaries": scored[:top_k]}
+
+    def list_memory_records(self, memoryId: str, namespace: str, maxResults: int = 100,
+                            nextToken: Optional[str] = None, **kwargs):
+        """Pages like the service's ListMemoryRecords (what vector_mirror.memory_record_source reads)"""
+        self._call("list_memory_records")
+        start = int(nextToken or 0)
+        with self._lock:
+            records = self._records[(memoryId, namespace)]
+            page = {"memoryRecordSummaries": [dict(r) for r in records[start:start + maxResults]]}
+            if start + maxResults < len(records):
+                page["nextToken"] = str(start + maxResults)
+        return page
+
+    def list_memories(self, **kwargs):
+        self._call("list_memories")
+        with self._lock:
+            return [dict(memory, status=self._status(memory_id)) for memory_id, memory in self._memories.items()]
+
+    def create_memory(self, name: str, strategies: Optional[List[Dict]] = None, **kwargs):
+        self._call("create_memory")
+        creating = self.activation_seconds > 0
+        memory = {"id": f"{name}-{uuid.uuid4().hex[:10]}", "name": name,
+                  "status": "CREATING" if creating else self.activation_status}
+        memory["memoryId"] = memory["id"]
+        with self._lock:
+            self._memories[memory["id"]] = memory
+            self._activations[memory["id"]] = (time.monotonic() + self.activation_seconds, self.activation_status)
+        return dict(memory)
+
+    def get_memory_status(self, memory_id: str):
+        self._call("get_memory_status")
+        with self._lock:
+            return self._status(memory_id)
+
+    def _status(self, memory_id: str) -> str:
+        if memory_id not in self._memories:
+            return "FAILED"
+        ready_at, status = self._activations.get(memory_id, (0.0, "ACTIVE"))
+        return status if time.monotonic() >= ready_at else "CREATING"
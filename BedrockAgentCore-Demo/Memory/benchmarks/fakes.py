@@ -0,0 +1,44 @@
+"""
+In-process fakes for running the memory demos without AWS
+FakeMemoryClient (fake_memory.py) stands in for bedrock_agentcore's MemoryClient
+with injected latency and per-method call counts; StubModel is a Strands model that answers
+instantly with a canned reply and records how many tokens each prompt had.
+"""
+
+import asyncio
+from typing import Any, List
+
+from strands.models import Model
+
+from common.compaction import message_tokens
+from fake_memory import FakeMemoryClient  # noqa: F401 (re-exported for the benchmarks)
+
+
+class StubModel(Model):
+    """Streams a fixed reply (optionally after a delay) without calling Bedrock"""
+
+    def __init__(self, reply: str = "Sure, here is the answer.", delay: float = 0.0):
+        self.config = {"model_id": "stub", "reply": reply, "delay": delay}
+        self.prompt_tokens: List[int] = []  # estimated tokens sent with each call
+
+    def update_config(self, **model_config: Any):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("StubModel does not support structured output")
+        yield  # pragma: no cover
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.prompt_tokens.append(sum(message_tokens(m) for m in messages))
+        if self.config["delay"]:
+            await asyncio.sleep(self.config["delay"])
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockStart": {"start": {}}}
+        yield {"contentBlockDelta": {"delta": {"text": self.config["reply"]}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {"usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+                            "metrics": {"latencyMs": 0}}}
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Crash recovery and latency check for common/journal.py, fully offline
+A child process writes conversation turns through an EventJournal and is killed
+with os._exit; the parent reopens the journal and checks that every message
+reached the (file-backed fake) service exactly once and in order.
+
+Scenarios:
+  service_down    the service fails every call, the process dies with everything pending
+  crash_mid_send  the process dies right after an event was accepted but before the
+                  journal recorded it as delivered (the resend must be deduplicated)
+  lost_response   in-process: the first attempt of every batch is applied but times out
+  stuck_session   in-process: one memory rejects every event (AccessDenied); the other
+                  session must still be delivered promptly and the rejected batch parked
+  locked          a second journal on a file that is in use must refuse to open
+Then append latency: journal.add vs a synchronous create_event with --latency.
+
+Run with: python benchmarks/journal_recovery.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from botocore.exceptions import ClientError
+
+from common.journal import EventJournal, JournalLocked
+from fakes import FakeMemoryClient
+
+SESSIONS, TURNS = 3, 10
+
+
+def expected_messages():
+    """(session_id, text, role) in the order the app would write them"""
+    for turn in range(TURNS):
+        for s in range(SESSIONS):
+            yield f"session-{s}", f"s{s} turn {turn} question", "USER"
+            yield f"session-{s}", f"s{s} turn {turn} answer", "ASSISTANT"
+
+
+class FileService:
+    """Fake create_event that persists accepted events to a JSON lines file, deduplicated by client_token"""
+
+    def __init__(self, path: Path, fail: bool = False, crash_after: int = 0):
+        self.path = path
+        self.fail = fail
+        self.crash_after = crash_after
+        self.accepted = 0
+        self.open = threading.Event()  # calls block until the test opens the service
+        self.open.set()
+
+    def events(self):
+        if not self.path.exists():
+            return []
+        return [json.loads(line) for line in self.path.read_text().splitlines()]
+
+    def create_event(self, memory_id, actor_id, session_id, messages, client_token=None, **kwargs):
+        self.open.wait()
+        if self.fail:
+            raise ConnectionError("service unavailable")
+        if client_token and any(e["token"] == client_token for e in self.events()):
+            return {"eventId": client_token}
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"token": client_token, "session_id": session_id, "messages": messages}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.accepted += 1
+        if self.crash_after and self.accepted >= self.crash_after:
+            os._exit(137)  # accepted by the service, never confirmed in the journal
+        return {"eventId": client_token}
+
+
+def child(journal_path: str, service_path: str, scenario: str):
+    service = FileService(Path(service_path), fail=scenario == "service_down",
+                          crash_after=2 if scenario == "crash_mid_send" else 0)
+    service.open.clear()  # every message is acknowledged before anything can be delivered
+    journal = EventJournal(journal_path, service, max_delay_seconds=0.05, retry_backoff_seconds=0.05)
+    for session_id, text, role in expected_messages():
+        journal.add("memory", "actor", session_id, text, role)
+        if role == "ASSISTANT":
+            journal.flush(("memory", "actor", session_id), wait=False)
+    service.open.set()
+    if scenario == "service_down":
+        time.sleep(0.5)  # let a few attempts fail
+        os._exit(137)
+    time.sleep(10)  # crash_mid_send exits from inside create_event
+    sys.exit(1)
+
+
+def check_delivery(service: FileService) -> list:
+    problems = []
+    events = service.events()
+    tokens = [e["token"] for e in events]
+    if len(tokens) != len(set(tokens)):
+        problems.append("duplicate events")
+    delivered = {}
+    for event in events:
+        delivered.setdefault(event["session_id"], []).extend(tuple(m) for m in event["messages"])
+    for s in range(SESSIONS):
+        session_id = f"session-{s}"
+        want = [(text, role) for sid, text, role in expected_messages() if sid == session_id]
+        got = delivered.get(session_id, [])
+        if got != want:
+            problems.append(f"{session_id}: expected {len(want)} messages in order, got {len(got)}")
+    return problems
+
+
+def run_crash_scenario(scenario: str, workdir: Path) -> bool:
+    journal_path, service_path = workdir / f"{scenario}.db", workdir / f"{scenario}-service.jsonl"
+    code = subprocess.run([sys.executable, __file__, "--child", scenario, str(journal_path), str(service_path)]).returncode
+    service = FileService(service_path)
+    before = len(service.events())
+    journal = EventJournal(journal_path, service, max_delay_seconds=0.05)
+    delivered = journal.flush(timeout=30)
+    journal.close()
+    problems = check_delivery(service) if delivered else ["journal did not drain"]
+    if code != 137:
+        problems.append(f"child exited with {code}, expected a crash")
+    print(f"{scenario:<16} child exit {code}, {before} events before restart, {len(service.events())} after: "
+          f"{'PASS' if not problems else 'FAIL ' + '; '.join(problems)}")
+    return not problems
+
+
+class LostResponseClient(FakeMemoryClient):
+    """Applies every event, but the first attempt with each token 'times out' afterwards"""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = set()
+
+    def create_event(self, *args, client_token=None, **kwargs):
+        event = super().create_event(*args, client_token=client_token, **kwargs)
+        if client_token not in self.seen:
+            self.seen.add(client_token)
+            raise TimeoutError("response lost")
+        return event
+
+
+def run_lost_response(workdir: Path) -> bool:
+    client = LostResponseClient()
+    journal = EventJournal(workdir / "lost.db", client, max_delay_seconds=0.05, retry_backoff_seconds=0.01)
+    for session_id, text, role in expected_messages():
+        journal.add("memory", "actor", session_id, text, role)
+    ok = journal.flush(timeout=30)
+    journal.close()
+    problems = [] if ok else ["journal did not drain"]
+    for s in range(SESSIONS):
+        session_id = f"session-{s}"
+        want = [(text, role) for sid, text, role in expected_messages() if sid == session_id]
+        got = [(m["content"]["text"], m["role"])
+               for turn in client.get_last_k_turns("memory", "actor", session_id, k=1000) for m in turn]
+        if got != want:
+            problems.append(f"{session_id}: {len(got)} messages stored, expected {len(want)}")
+    print(f"{'lost_response':<16} {journal.stats['retries']} retries, {journal.stats['events']} events: "
+          f"{'PASS' if not problems else 'FAIL ' + '; '.join(problems)}")
+    return not problems
+
+
+class DeniedMemoryClient(FakeMemoryClient):
+    """create_event for the "denied" memory always fails like a missing IAM permission"""
+
+    def create_event(self, memory_id, *args, **kwargs):
+        if memory_id == "denied":
+            raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "not allowed"}}, "CreateEvent")
+        return super().create_event(memory_id, *args, **kwargs)
+
+
+def run_stuck_session(workdir: Path) -> bool:
+    client = DeniedMemoryClient()
+    journal = EventJournal(workdir / "stuck.db", client, max_delay_seconds=0.05)
+    journal.append("denied", "actor", "session-0", [("question", "USER"), ("answer", "ASSISTANT")])
+    journal.flush(wait=False)
+    time.sleep(0.1)  # the denied batch is sent (and rejected) first
+    journal.append("memory", "actor", "session-1", [("question", "USER"), ("answer", "ASSISTANT")])
+    start = time.perf_counter()
+    delivered = journal.flush(("memory", "actor", "session-1"), timeout=5)
+    seconds = time.perf_counter() - start
+    journal.close(timeout=1)
+    problems = []
+    if not delivered or len(client.get_last_k_turns("memory", "actor", "session-1")) != 1:
+        problems.append("healthy session not delivered")
+    if seconds > 1:
+        problems.append(f"healthy session waited {seconds:.1f}s")
+    if journal.parked() != 2 or journal.stats["retries"]:
+        problems.append(f"denied batch not parked at once ({journal.stats['retries']} retries)")
+    print(f"{'stuck_session':<16} healthy session delivered in {seconds * 1000:.0f}ms, "
+          f"{journal.parked()} messages parked: {'PASS' if not problems else 'FAIL ' + '; '.join(problems)}")
+    return not problems
+
+
+def run_locked(workdir: Path) -> bool:
+    journal = EventJournal(workdir / "locked.db", FakeMemoryClient())
+    try:
+        EventJournal(workdir / "locked.db", FakeMemoryClient()).close()
+        refused = False
+    except JournalLocked:
+        refused = True
+    journal.close()
+    reopened = EventJournal(workdir / "locked.db", FakeMemoryClient())  # released on close
+    reopened.close()
+    print(f"{'locked':<16} second journal on the same file refused: {'PASS' if refused else 'FAIL'}")
+    return refused
+
+
+def measure_latency(workdir: Path, latency: float, count: int):
+    def summary(label, samples):
+        samples = sorted(samples)
+        print(f"  {label:<32} p50={statistics.median(samples) * 1000:7.2f}ms "
+              f"p99={samples[int(len(samples) * 0.99) - 1] * 1000:7.2f}ms")
+
+    print(f"append latency ({count} messages, fake service latency {latency * 1000:.0f}ms):")
+    client = FakeMemoryClient(latency=latency)
+    samples = []
+    for i in range(min(count, 50)):
+        start = time.perf_counter()
+        client.create_event("memory", "actor", "session", [(f"message {i}", "USER")])
+        samples.append(time.perf_counter() - start)
+    summary("create_event (synchronous)", samples)
+    for synchronous in ("FULL", "NORMAL"):
+        journal = EventJournal(workdir / f"latency-{synchronous}.db", FakeMemoryClient(latency=latency),
+                               synchronous=synchronous)
+        samples = []
+        for i in range(count):
+            start = time.perf_counter()
+            journal.add("memory", "actor", "session", f"message {i}", "USER")
+            samples.append(time.perf_counter() - start)
+        summary(f"journal.add (synchronous={synchronous})", samples)
+        journal.close(timeout=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake create_event latency for the comparison")
+    parser.add_argument("--appends", type=int, default=500)
+    parser.add_argument("--child", nargs=3, metavar=("SCENARIO", "JOURNAL", "SERVICE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[1], args.child[2], args.child[0])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = [run_crash_scenario("service_down", workdir), run_crash_scenario("crash_mid_send", workdir),
+                   run_lost_response(workdir), run_stuck_session(workdir), run_locked(workdir)]
+        measure_latency(workdir, args.latency, args.appends)
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline check for common/provisioning.py
+Drives MemoryProvisioner against a FakeMemoryClient whose memories stay CREATING
+for --activation seconds:
+  start      returns at once while the memory is still CREATING
+  active     wait() sees ACTIVE, polls follow the backoff schedule, on_ready runs once
+  failed     a memory that turns FAILED is reported with an error and no on_ready
+  flaky      failing status checks are retried until the memory is ACTIVE
+  timeout    a memory still CREATING after timeout seconds is marked FAILED
+
+Run with: python benchmarks/provisioning_check.py [--activation 1.0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.provisioning import MemoryProvisioner
+from fake_memory import FakeMemoryClient
+
+BACKOFF = dict(initial_delay=0.1, max_delay=0.4, backoff_factor=2.0)
+
+
+class FlakyStatusClient(FakeMemoryClient):
+    """get_memory_status fails the first `failures` times"""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def get_memory_status(self, memory_id: str):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("status check failed")
+        return super().get_memory_status(memory_id)
+
+
+def expected_polls(activation: float) -> int:
+    """Polls the backoff schedule makes until one lands after activation"""
+    delay = at = BACKOFF["initial_delay"]
+    polls = 1
+    while at < activation:
+        delay = min(delay * BACKOFF["backoff_factor"], BACKOFF["max_delay"])
+        at += delay
+        polls += 1
+    return polls
+
+
+def provision(client, timeout: float = 30.0):
+    ready = []
+    provisioner = MemoryProvisioner(client, timeout=timeout, on_ready=ready.append, **BACKOFF)
+    begin = time.perf_counter()
+    job = provisioner.start("CheckMemory")
+    started = time.perf_counter() - begin
+    status_at_start = job.status
+    finished = provisioner.wait(job.memory_id, timeout=timeout + 5)
+    return job, ready, started, status_at_start, finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activation", type=float, default=1.0, help="seconds a new memory stays CREATING")
+    args = parser.parse_args()
+    problems = []
+
+    job, ready, started, status_at_start, finished = provision(FakeMemoryClient(activation_seconds=args.activation))
+    print(f"start      returned in {started * 1000:.1f}ms with status {status_at_start}")
+    if started > 0.05 or status_at_start != "CREATING":
+        problems.append("start blocked or did not report CREATING")
+    took = job.ready_at - job.started_at
+    expected = expected_polls(args.activation)
+    print(f"active     {job.status} after {took:.2f}s ({args.activation}s activation), "
+          f"{job.polls} polls (backoff schedule: {expected}), on_ready ran {len(ready)}x")
+    if not finished or job.status != "ACTIVE" or len(ready) != 1:
+        problems.append("memory did not become ACTIVE exactly once")
+    if job.polls != expected:
+        problems.append(f"{job.polls} polls, expected {expected}")
+    if not args.activation <= took <= args.activation + BACKOFF["max_delay"] + 0.1:
+        problems.append(f"ACTIVE noticed {took - args.activation:.2f}s late")
+
+    job, ready, _, _, finished = provision(
+        FakeMemoryClient(activation_seconds=args.activation / 2, activation_status="FAILED"))
+    print(f"failed     {job.status} ({job.error}) after {job.polls} polls, on_ready ran {len(ready)}x")
+    if not finished or job.status != "FAILED" or not job.error or ready:
+        problems.append("failed creation not reported")
+
+    job, ready, _, _, finished = provision(FlakyStatusClient(2, activation_seconds=args.activation / 2))
+    print(f"flaky      {job.status} after {job.polls} polls with 2 failed status checks")
+    if not finished or job.status != "ACTIVE":
+        problems.append("failed status checks were not retried")
+
+    timeout = 0.5
+    begin = time.perf_counter()
+    job, ready, _, _, finished = provision(FakeMemoryClient(activation_seconds=60), timeout=timeout)
+    took = time.perf_counter() - begin
+    print(f"timeout    {job.status} ({job.error}) after {took:.2f}s, timeout {timeout}s")
+    if not finished or job.status != "FAILED" or not (job.error or "").startswith("Not ACTIVE after"):
+        problems.append("stuck memory was not timed out")
+    if took > timeout + BACKOFF["max_delay"] + 0.1:
+        problems.append(f"timeout noticed {took - timeout:.2f}s late")
+
+    print("PASS" if not problems else "FAIL " + "; ".join(problems))
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Helpers shared by the AgentCore Memory demo apps.
+The apps add the parent Memory/ folder to sys.path so this package is importable
+when running `streamlit run app.py` from any of the demo folders.
+"""
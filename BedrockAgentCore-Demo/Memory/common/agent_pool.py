@@ -0,0 +1,113 @@
+"""
+Bounded pool of Strands agents shared by every browser session
+Agents are keyed by (memory_id, actor_id) instead of living in st.session_state,
+so memory is capped by the pool size rather than by the number of open tabs.
+Idle and least recently used agents are dropped and rebuilt on their next turn
+(their hooks reload the conversation, e.g. through the history cache).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+
+class _Slot:
+    __slots__ = ("lock", "value", "leases", "last_used")
+
+    def __init__(self):
+        self.lock = threading.Lock()  # one turn at a time per actor
+        self.value = None
+        self.leases = 0  # sessions holding or waiting for the agent; never evicted while > 0
+        self.last_used = time.monotonic()
+
+
+class AgentPool:
+    """LRU pool of agents built on demand by factory(key).
+
+        with pool.lease((memory_id, actor_id)) as agent:
+            agent(prompt)
+
+    A lease holds the key's lock, so turns for the same actor run one after
+    another while different actors run in parallel. Agents are built under that
+    lock (not the pool's), so a slow build only delays its own actor. When more
+    than max_agents are pooled, the least recently used idle ones are evicted;
+    agents in use are kept, so the pool can exceed the cap while every slot is busy.
+    """
+
+    def __init__(self, factory: Callable[[Hashable], Any], max_agents: int = 64,
+                 idle_ttl_seconds: Optional[float] = None):
+        self.factory = factory
+        self.max_agents = max_agents
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.stats = {"hits": 0, "builds": 0, "evictions": 0, "waits": 0, "peak": 0}
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[Hashable, _Slot]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for slot in self._slots.values() if slot.value is not None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            slot = self._slots.get(key)
+            return slot is not None and slot.value is not None
+
+    @contextmanager
+    def lease(self, key: Hashable, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Exclusive use of the key's agent, building it first if needed.
+
+        Raises TimeoutError if another session keeps it busy for longer than timeout.
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+            self._slots.move_to_end(key)
+            slot.leases += 1
+        try:
+            if not slot.lock.acquire(blocking=False):
+                with self._lock:
+                    self.stats["waits"] += 1
+                if not slot.lock.acquire(timeout=-1 if timeout is None else timeout):
+                    raise TimeoutError(f"Agent for {key} is busy with another turn")
+            try:
+                if slot.value is None:
+                    slot.value = self.factory(key)
+                    with self._lock:
+                        self.stats["builds"] += 1
+                else:
+                    with self._lock:
+                        self.stats["hits"] += 1
+                yield slot.value
+            finally:
+                slot.last_used = time.monotonic()
+                slot.lock.release()
+        finally:
+            with self._lock:
+                slot.leases -= 1
+                self._evict()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """The key's agent if it is pooled, without waiting, building or refreshing its LRU position"""
+        with self._lock:
+            slot = self._slots.get(key)
+            return slot.value if slot is not None else None
+
+    def _evict(self):
+        size = sum(1 for slot in self._slots.values() if slot.value is not None)
+        self.stats["peak"] = max(self.stats["peak"], size)
+        expired_before = (time.monotonic() - self.idle_ttl_seconds) if self.idle_ttl_seconds else None
+        for key in list(self._slots):  # least recently used first
+            slot = self._slots[key]
+            if slot.leases:
+                continue
+            expired = expired_before is not None and slot.last_used < expired_before
+            if slot.value is None or expired or size > self.max_agents:
+                del self._slots[key]
+                if slot.value is not None:
+                    size -= 1
+                    self.stats["evictions"] += 1
+            elif expired_before is None:
+                break  # the rest are newer and the pool is within its cap
@@ -0,0 +1,185 @@
+"""
+Write-behind batching for AgentCore Memory events
+Collects messages per (memory_id, actor_id, session_id) and writes them with a
+single multi-message create_event call instead of one call per message.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EventKey = Tuple[str, str, str]  # (memory_id, actor_id, session_id)
+
+
+class EventBatcher:
+    """Background writer that coalesces memory messages into batched events.
+
+    A session's buffer is sealed into a batch when flush() is called (end of
+    turn), when it holds max_batch_messages, when its oldest message is older
+    than max_delay_seconds, or at interpreter shutdown. One worker thread sends
+    sealed batches in FIFO order, so messages of a session are never reordered.
+    At most max_pending_messages are held in memory; add() blocks beyond that.
+
+    Nothing here is durable: a batch that still fails after max_retries is
+    parked in memory (see parked() and retry_parked()) and is lost with the
+    process, as is anything queued at a crash. common.journal.EventJournal is
+    the durable drop-in replacement.
+    """
+
+    def __init__(self, memory_client, max_batch_messages: int = 20, max_delay_seconds: float = 2.0,
+                 max_pending_messages: int = 1000, max_retries: int = 2, retry_backoff_seconds: float = 0.5):
+        self.memory_client = memory_client
+        self.max_batch_messages = max_batch_messages
+        self.max_delay_seconds = max_delay_seconds
+        self.max_pending_messages = max_pending_messages
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.stats = {"messages": 0, "events": 0, "failures": 0}
+
+        self._cond = threading.Condition()
+        self._buffers: Dict[EventKey, List[Tuple[str, str]]] = {}
+        self._deadlines: Dict[EventKey, float] = {}
+        self._ready: deque = deque()  # sealed (key, messages) batches waiting for the worker
+        self._parked: List[Tuple[EventKey, List[Tuple[str, str]]]] = []  # batches that gave up
+        self._in_flight: Optional[EventKey] = None
+        self._pending = 0  # messages buffered, sealed or in flight
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name="EventBatcher", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def add(self, memory_id: str, actor_id: str, session_id: str, text: str, role: str):
+        """Queue one message; returns immediately unless the queue is full"""
+        key = (memory_id, actor_id, session_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EventBatcher is closed")
+            if self._pending >= self.max_pending_messages:
+                # Backpressure: hand everything to the worker and wait for room
+                self._seal_all()
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._pending < self.max_pending_messages or self._closed)
+                if self._closed:
+                    raise RuntimeError("EventBatcher is closed")
+
+            buffer = self._buffers.setdefault(key, [])
+            if not buffer:
+                self._deadlines[key] = time.monotonic() + self.max_delay_seconds
+            buffer.append((text, role))
+            self._pending += 1
+            self.stats["messages"] += 1
+            if len(buffer) >= self.max_batch_messages:
+                self._seal(key)
+            self._cond.notify_all()
+
+    def flush(self, key: Optional[EventKey] = None, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        """Seal buffered messages (one session or all) and optionally wait until they are written.
+
+        Returns False if wait timed out before the messages were sent.
+        """
+        with self._cond:
+            if key is None:
+                self._seal_all()
+            else:
+                self._seal(key)
+            self._cond.notify_all()
+            if not wait:
+                return True
+            return self._cond.wait_for(lambda: not self._has_unsent(key), timeout)
+
+    def pending(self) -> int:
+        """Messages queued or being sent"""
+        with self._cond:
+            return self._pending
+
+    def parked(self) -> int:
+        """Messages whose batch failed max_retries times (kept until retry_parked or exit)"""
+        with self._cond:
+            return sum(len(messages) for _, messages in self._parked)
+
+    def retry_parked(self) -> int:
+        """Send parked batches again, ahead of anything queued since"""
+        with self._cond:
+            parked, self._parked = self._parked, []
+            self._ready.extendleft(reversed(parked))
+            count = sum(len(messages) for _, messages in parked)
+            self._pending += count
+            self._cond.notify_all()
+        return count
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush everything and stop the worker thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._seal_all()
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        if self._parked:
+            logger.error("Losing %d parked messages at shutdown", self.parked())
+
+    def _seal(self, key: EventKey):
+        buffer = self._buffers.pop(key, None)
+        self._deadlines.pop(key, None)
+        if buffer:
+            self._ready.append((key, buffer))
+
+    def _seal_all(self):
+        for key in list(self._buffers):
+            self._seal(key)
+
+    def _has_unsent(self, key: Optional[EventKey]) -> bool:
+        if key is None:
+            return self._pending > 0
+        return (key in self._buffers or self._in_flight == key
+                or any(ready_key == key for ready_key, _ in self._ready))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    for key, deadline in list(self._deadlines.items()):
+                        if deadline <= now:
+                            self._seal(key)
+                    if self._ready:
+                        break
+                    if self._closed:
+                        return
+                    next_deadline = min(self._deadlines.values(), default=None)
+                    self._cond.wait(None if next_deadline is None else next_deadline - now)
+                key, messages = self._ready.popleft()
+                self._in_flight = key
+
+            sent = self._send(key, messages)
+
+            with self._cond:
+                self._in_flight = None
+                self._pending -= len(messages)
+                self.stats["events" if sent else "failures"] += 1
+                if not sent:
+                    self._parked.append((key, messages))
+                self._cond.notify_all()
+
+    def _send(self, key: EventKey, messages: List[Tuple[str, str]]) -> bool:
+        memory_id, actor_id, session_id = key
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.memory_client.create_event(
+                    memory_id=memory_id, actor_id=actor_id, session_id=session_id, messages=messages
+                )
+                return True
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Parking %d messages for session %s after %d attempts",
+                                     len(messages), session_id, attempt + 1)
+                    return False
+                time.sleep(self.retry_backoff_seconds * (2 ** attempt))
+        return False
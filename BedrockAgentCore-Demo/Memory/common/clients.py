@@ -0,0 +1,78 @@
+"""
+Process-wide AgentCore Memory client and memory catalog
+One MemoryClient (and its HTTP connection pools) is shared by every browser
+session, and list_memories results are cached for a short TTL. boto3 and
+bedrock_agentcore are imported by the first get_memory_client() call.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from bedrock_agentcore.memory import MemoryClient
+
+# Sized for many concurrent Streamlit sessions plus background writers (botocore Config kwargs)
+POOL_CONFIG = dict(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+)
+
+_clients: Dict[Optional[str], MemoryClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_memory_client(region_name: Optional[str] = None) -> MemoryClient:
+    """Return the shared MemoryClient for a region (boto3 clients are thread-safe)"""
+    with _clients_lock:
+        client = _clients.get(region_name)
+        if client is None:
+            import boto3
+            import botocore.session
+            from botocore.config import Config
+            from bedrock_agentcore.memory import MemoryClient
+            # Every client the session creates starts from the tuned pool config; the SDK's own
+            # config (its user agent) is merged on top, so its two clients are built only once
+            core_session = botocore.session.get_session()
+            core_session.set_default_client_config(Config(**POOL_CONFIG))
+            client = MemoryClient(region_name=region_name, boto3_session=boto3.Session(botocore_session=core_session))
+            _clients[region_name] = client
+        return client
+
+
+class MemoryCatalog:
+    """TTL cache of list_memories; call invalidate() after creating a memory"""
+
+    def __init__(self, client: MemoryClient, ttl_seconds: float = 60):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memories: Optional[List[Dict]] = None
+        self._expires_at = 0.0
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            if self._memories is None or self._expires_at <= time.monotonic():
+                self._memories = self.client.list_memories()
+                self._expires_at = time.monotonic() + self.ttl_seconds
+            return list(self._memories)
+
+    def invalidate(self):
+        with self._lock:
+            self._memories = None
+
+
+_catalogs: Dict[Optional[str], MemoryCatalog] = {}
+
+
+def get_memory_catalog(region_name: Optional[str] = None) -> MemoryCatalog:
+    """Return the shared memory catalog for a region"""
+    client = get_memory_client(region_name)
+    with _clients_lock:
+        catalog = _catalogs.get(region_name)
+        if catalog is None:
+            catalog = _catalogs[region_name] = MemoryCatalog(client)
+        return catalog
@@ -0,0 +1,181 @@
+"""
+Conversation compaction for long sessions
+After every invocation, keeps a sliding window of recent turns in agent.messages,
+folds older turns into a short summary, and strips memory context that was
+injected into earlier user messages, so prompt size stops growing with each turn.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from common.text import estimate_tokens
+from common.tracing import Tracer
+
+if TYPE_CHECKING:  # strands is imported on first use (see common/startup.py)
+    from strands.hooks import AfterInvocationEvent, HookRegistry
+
+logger = logging.getLogger(__name__)
+
+# Appended by the long-term hook to the user's message; only the current turn needs it
+CONTEXT_MARKER = "\n\nPrevious context: "
+SUMMARY_PREFIX = "Summary of our earlier conversation:\n"
+SUMMARY_REPLY = "Thanks, I'll keep that in mind."
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+Summarizer = Callable[[str, List[Dict]], str]  # (previous summary, dropped messages) -> summary
+
+
+def message_text(message: Dict) -> str:
+    return " ".join(block["text"] for block in message.get("content", []) if "text" in block)
+
+
+def message_tokens(message: Dict) -> int:
+    """Estimated tokens of a message, tool calls and results included"""
+    return sum(estimate_tokens(block["text"] if "text" in block else json.dumps(block, default=str))
+               for block in message.get("content", []))
+
+
+def split_turns(messages: List[Dict]) -> List[List[Dict]]:
+    """Group messages into turns; a turn starts at a user message that isn't a tool result"""
+    turns: List[List[Dict]] = []
+    for message in messages:
+        starts_turn = message["role"] == "user" and not any("toolResult" in b for b in message.get("content", []))
+        if not turns or starts_turn:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class LocalSummarizer:
+    """Extractive summary: the first sentence of each dropped message, newest lines kept within token_budget"""
+
+    def __init__(self, token_budget: int = 300, max_chars: int = 200):
+        self.token_budget = token_budget
+        self.max_chars = max_chars
+
+    def __call__(self, previous: str, messages: List[Dict]) -> str:
+        lines = [line for line in previous.splitlines() if line.strip()]
+        for message in messages:
+            text = " ".join(message_text(message).split())
+            if not text:
+                continue
+            sentence = _SENTENCE_END.split(text, 1)[0]
+            if len(sentence) > self.max_chars:
+                sentence = sentence[:self.max_chars - 1].rstrip() + "…"
+            lines.append(f"- {'User' if message['role'] == 'user' else 'Assistant'}: {sentence}")
+        kept, tokens = [], 0
+        for line in reversed(lines):
+            tokens += estimate_tokens(line) + 1
+            if tokens > self.token_budget:
+                break
+            kept.append(line)
+        return "\n".join(reversed(kept))
+
+
+class MemorySummarizer:
+    """Uses the session summary written by an AgentCore summary strategy, else falls back.
+
+    The strategy summarizes events in the background, so right after a turn is
+    saved the summary may lag behind; older (dropped) turns are normally covered.
+    """
+
+    def __init__(self, client, memory_id: str, namespace: str, fallback: Optional[Summarizer] = None,
+                 token_budget: int = 300):
+        self.client = client
+        self.memory_id = memory_id
+        self.namespace = namespace
+        self.fallback = fallback or LocalSummarizer(token_budget)
+        self.token_budget = token_budget
+
+    def __call__(self, previous: str, messages: List[Dict]) -> str:
+        try:
+            records = self.client.retrieve_memories(memory_id=self.memory_id, namespace=self.namespace,
+                                                    query="conversation summary", top_k=1)
+        except Exception as e:
+            logger.warning("Summary lookup failed, summarizing locally: %s", e)
+            records = []
+        text = records[0].get("content", {}).get("text", "").strip() if records else ""
+        if not text:
+            return self.fallback(previous, messages)
+        return text[:self.token_budget * 4]
+
+
+class ConversationCompactor:
+    """Caps agent.messages at keep_turns recent turns plus one summary exchange (a strands HookProvider).
+
+    Turns are only summarized once the conversation is over min_tokens, since
+    summarizing a handful of short messages saves nothing. Register it before the memory hooks (After* callbacks run in reverse order),
+    so those still see the full turn when they save it.
+    """
+
+    def __init__(self, keep_turns: int = 6, min_tokens: int = 1000, summarizer: Optional[Summarizer] = None,
+                 strip_context: bool = True, tracer: Tracer = None):
+        self.keep_turns = keep_turns
+        self.min_tokens = min_tokens
+        self.summarizer = summarizer or LocalSummarizer()
+        self.strip_context = strip_context
+        self.tracer = tracer or Tracer()
+        self.stats = {"compactions": 0, "turns_dropped": 0, "contexts_stripped": 0,
+                      "tokens_before": 0, "tokens_after": 0}
+        self._lock = threading.Lock()
+
+    def compact(self, messages: List[Dict]) -> List[Dict]:
+        """Compacted copy of a Strands message list"""
+        stripped = 0
+        if self.strip_context:
+            original, messages = messages, [self._strip(message) for message in messages]
+            stripped = sum(1 for old, new in zip(original, messages) if old is not new)
+
+        summary = ""
+        if len(messages) >= 2 and messages[0]["role"] == "user" and message_text(messages[0]).startswith(SUMMARY_PREFIX):
+            summary = message_text(messages[0])[len(SUMMARY_PREFIX):]
+            messages = messages[2:]
+        turns = split_turns(messages)
+        dropped = turns[:-self.keep_turns] if self.keep_turns else turns
+        if sum(message_tokens(m) for m in messages) < self.min_tokens:
+            dropped = []
+        if dropped:
+            summary = self.summarizer(summary, [m for turn in dropped for m in turn])
+            messages = [m for turn in turns[len(dropped):] for m in turn]
+        if summary:
+            messages = [{"role": "user", "content": [{"text": SUMMARY_PREFIX + summary}]},
+                        {"role": "assistant", "content": [{"text": SUMMARY_REPLY}]}] + messages
+        with self._lock:
+            self.stats["contexts_stripped"] += stripped
+            self.stats["turns_dropped"] += len(dropped)
+            self.stats["compactions"] += bool(dropped)
+        return messages
+
+    def _strip(self, message: Dict) -> Dict:
+        if message["role"] != "user" or not any(CONTEXT_MARKER in b.get("text", "") for b in message["content"]):
+            return message
+        content = [{**b, "text": b["text"].split(CONTEXT_MARKER, 1)[0]} if "text" in b else b
+                   for b in message["content"]]
+        return {**message, "content": content}
+
+    def on_after_invocation(self, event: AfterInvocationEvent):
+        messages = event.agent.messages
+        with self.tracer.span("conversation.compact", messages=len(messages)) as span:
+            try:
+                before = sum(message_tokens(m) for m in messages)
+                compacted = self.compact(messages)
+                after = sum(message_tokens(m) for m in compacted)
+                messages[:] = compacted
+                with self._lock:
+                    self.stats["tokens_before"] += before
+                    self.stats["tokens_after"] += after
+                span.set(kept=len(compacted), tokens_before=before, tokens_after=after)
+            except Exception as e:
+                # Never lose the conversation over a failed compaction
+                logger.exception("Conversation compaction failed")
+                span.set(error=repr(e))
+
+    def register_hooks(self, registry: HookRegistry):
+        from strands.hooks import AfterInvocationEvent
+        registry.add_callback(AfterInvocationEvent, self.on_after_invocation)
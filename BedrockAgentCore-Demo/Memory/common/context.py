@@ -0,0 +1,150 @@
+"""
+Token-budgeted context assembly
+Ranks and packs memory snippets (long-term memories or short-term history turns)
+into a fixed token budget before they are sent to the model; long-term memories
+are also deduplicated.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from common.text import cosine, estimate_tokens, normalize_text, trigram_profile
+
+
+@dataclass
+class ContextItem:
+    text: str
+    score: float = 0.0  # relevance from the memory service (0.0 - 1.0)
+    timestamp: Optional[float] = None  # epoch seconds, used for recency
+    payload: Any = None  # caller data carried through (e.g. history messages)
+    position: int = 0  # index in the input list
+    tokens: int = 0
+
+
+@dataclass
+class AssembledContext:
+    items: List[ContextItem] = field(default_factory=list)  # selected, best first
+    tokens_used: int = 0
+    tokens_in: int = 0  # tokens offered before deduplication and packing
+    duplicates: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_used
+
+    @property
+    def texts(self) -> List[str]:
+        return [item.text for item in self.items]
+
+    def in_input_order(self) -> List[ContextItem]:
+        return sorted(self.items, key=lambda item: item.position)
+
+
+class ContextAssembler:
+    """Shared context stage used by the short-term and long-term hook providers.
+
+    Long-term memories whose normalized text is near-identical (trigram cosine at
+    or above duplicate_threshold) to a better-ranked one are dropped; history turns
+    never are, since a repeated question is still part of the conversation. Ranking blends the
+    relevance score with recency (halving every recency_half_life_hours), then
+    items are packed greedily until token_budget is reached.
+    """
+
+    def __init__(self, token_budget: int = 1000, duplicate_threshold: float = 0.9,
+                 recency_weight: float = 0.3, recency_half_life_hours: float = 72):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.recency_weight = recency_weight
+        self.recency_half_life_hours = recency_half_life_hours
+        self.stats = {"calls": 0, "tokens_in": 0, "tokens_used": 0, "tokens_saved": 0}
+        self._lock = threading.Lock()
+
+    def assemble(self, items: List[ContextItem], token_budget: Optional[int] = None,
+                 stop_when_full: bool = False, deduplicate: bool = True) -> AssembledContext:
+        """Deduplicate (optionally), rank and pack items; stop_when_full keeps only the best contiguous run"""
+        budget = self.token_budget if token_budget is None else token_budget
+        result = AssembledContext()
+        for position, item in enumerate(items):
+            item.position = position
+            item.tokens = estimate_tokens(item.text)
+            result.tokens_in += item.tokens
+
+        now = time.time()
+        ranked = sorted(items, key=lambda item: self._rank(item, now), reverse=True)
+
+        kept_profiles = []
+        for item in ranked:
+            if deduplicate:
+                profile = trigram_profile(normalize_text(item.text))
+                if any(cosine(profile, kept) >= self.duplicate_threshold for kept in kept_profiles):
+                    result.duplicates += 1
+                    continue
+                kept_profiles.append(profile)
+            if result.tokens_used + item.tokens > budget or (stop_when_full and result.dropped):
+                result.dropped += 1
+                continue
+            result.items.append(item)
+            result.tokens_used += item.tokens
+
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["tokens_in"] += result.tokens_in
+            self.stats["tokens_used"] += result.tokens_used
+            self.stats["tokens_saved"] += result.tokens_saved
+        return result
+
+    def assemble_memories(self, memories: List[Dict], token_budget: Optional[int] = None) -> AssembledContext:
+        """Pack retrieve_memories records (uses their score and createdAt)"""
+        items = []
+        for memory in memories:
+            if not isinstance(memory, dict):
+                continue
+            content = memory.get("content", {})
+            text = content.get("text", "").strip() if isinstance(content, dict) else ""
+            if text:
+                items.append(ContextItem(text=text, score=float(memory.get("score") or 0.0),
+                                         timestamp=_epoch(memory.get("createdAt")), payload=memory))
+        return self.assemble(items, token_budget)
+
+    def assemble_history(self, messages: List[Dict], token_budget: Optional[int] = None):
+        """Keep the newest whole turns of a Strands message list that fit the budget.
+
+        Returns (messages in chronological order, AssembledContext).
+        """
+        turns: List[List[Dict]] = []
+        for message in messages:
+            if not turns or (message["role"] == "user" and turns[-1][-1]["role"] == "assistant"):
+                turns.append([])
+            turns[-1].append(message)
+
+        # History has no relevance score: rank turns by position so newer turns win
+        items = [
+            ContextItem(text="\n".join(block.get("text", "") for m in turn for block in m["content"]),
+                        score=(index + 1) / len(turns), payload=turn)
+            for index, turn in enumerate(turns)
+        ]
+        # Stop at the first turn that doesn't fit, and keep repeated turns, so the kept history has no gaps
+        result = self.assemble(items, token_budget, stop_when_full=True, deduplicate=False)
+        kept = [message for item in result.in_input_order() for message in item.payload]
+        return kept, result
+
+    def _rank(self, item: ContextItem, now: float) -> float:
+        if item.timestamp is None:
+            recency = 0.0
+        else:
+            age_hours = max(0.0, now - item.timestamp) / 3600
+            recency = math.pow(0.5, age_hours / self.recency_half_life_hours)
+        return (1 - self.recency_weight) * item.score + self.recency_weight * recency
+
+
+def _epoch(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
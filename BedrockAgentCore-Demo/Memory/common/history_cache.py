@@ -0,0 +1,102 @@
+"""
+Read-through cache for short-term conversation history
+Keeps recent turns per (memory_id, actor_id, session_id) in process so building
+an Agent for a warm session does not call get_last_k_turns again.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+SessionKey = Tuple[str, str, str]  # (memory_id, actor_id, session_id)
+Turn = List[Tuple[str, str]]  # [(role, text), ...] with Strands roles "user"/"assistant"
+
+
+class _Entry:
+    __slots__ = ("turns", "complete", "expires_at")
+
+    def __init__(self, turns: List[Turn], complete: bool, expires_at: float):
+        self.turns = turns
+        self.complete = complete  # True when turns hold the whole remote history
+        self.expires_at = expires_at
+
+
+class HistoryCache:
+    """Process-wide LRU + TTL cache of conversation turns.
+
+    Entries are seeded from get_last_k_turns and then kept current by the hook's
+    own writes (append), so they only go back to the service when they expire,
+    are evicted, or hold fewer turns than requested.
+    """
+
+    def __init__(self, max_sessions: int = 512, ttl_seconds: float = 900, max_turns: int = 50):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[SessionKey, _Entry]" = OrderedDict()
+
+    def get(self, key: SessionKey, k: int) -> Optional[List[Dict]]:
+        """Return the last k turns as Strands messages, or None if the cache can't answer"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self._entries.pop(key, None)
+                self.stats["misses"] += 1
+                return None
+            if len(entry.turns) < k and not entry.complete:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return _to_messages(entry.turns[-k:])
+
+    def load(self, key: SessionKey, k: int, fetch: Callable[[int], List[List[Dict]]]) -> List[Dict]:
+        """Read-through: answer from cache or call fetch(k) (get_last_k_turns) and store the result"""
+        messages = self.get(key, k)
+        if messages is not None:
+            return messages
+        turns = [
+            [("assistant" if m["role"] == "ASSISTANT" else "user", m["content"]["text"]) for m in turn]
+            for turn in fetch(k) or []
+        ]
+        self.put(key, turns, complete=len(turns) < k)
+        return _to_messages(turns)
+
+    def put(self, key: SessionKey, turns: List[Turn], complete: bool):
+        with self._lock:
+            self._entries[key] = _Entry(turns[-self.max_turns:], complete and len(turns) <= self.max_turns,
+                                        time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def append(self, key: SessionKey, role: str, text: str):
+        """Record a message written through the hook"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # Only the newest turns are known; older history still needs a fetch
+                entry = self._entries[key] = _Entry([], False, time.monotonic() + self.ttl_seconds)
+            turns = entry.turns
+            # Same boundary as get_last_k_turns: a user message after an assistant reply starts a turn
+            if not turns or (role == "user" and any(r == "assistant" for r, _ in turns[-1])):
+                turns.append([])
+            turns[-1].append((role, text))
+            if len(turns) > self.max_turns:
+                del turns[0]
+                entry.complete = False
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: SessionKey):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def _to_messages(turns: List[Turn]) -> List[Dict]:
+    """Build fresh Strands message dicts (the agent mutates its message list)"""
+    return [{"role": role, "content": [{"text": text}]} for turn in turns for role, text in turn]
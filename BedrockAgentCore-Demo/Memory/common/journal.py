@@ -0,0 +1,334 @@
+"""
+Durable write-ahead journal for AgentCore Memory events
+Messages are committed to a local SQLite file before add()/append() return; a
+background replayer delivers them to AgentCore Memory in order, in batches and
+with idempotency tokens, then compacts delivered rows away. Events still in the
+journal after a crash are delivered the next time the journal is opened.
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+EventKey = Tuple[str, str, str]  # (memory_id, actor_id, session_id)
+
+PENDING, DELIVERED, PARKED = 0, 1, 2
+
+# Errors a resend can't fix (bad request, missing permission, unknown memory): park the batch at once
+PERMANENT_ERRORS = frozenset({"ValidationException", "AccessDeniedException", "ResourceNotFoundException"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    memory_id TEXT NOT NULL,
+    actor_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    batch INTEGER,                     -- fixed before sending, so a resend reuses the same token
+    state INTEGER NOT NULL DEFAULT 0,  -- 0 pending, 1 delivered, 2 parked after max_attempts
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0  -- wall clock time a failed batch may be resent
+);
+CREATE INDEX IF NOT EXISTS events_by_state ON events (state, seq);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (memory_id, actor_id, session_id, state, seq);
+"""
+
+
+class JournalLocked(RuntimeError):
+    """The journal file is open in another EventJournal, whose replayer would deliver the same events"""
+
+
+class EventJournal:
+    """Drop-in replacement for EventBatcher whose queue survives crashes.
+
+    Like EventBatcher, a session's messages are sent as one multi-message event
+    when flush() is called (end of turn), when max_batch_messages are waiting or
+    when the oldest is max_delay_seconds old. Each batch is sent with a client
+    token derived from the journal id and the batch number, so resending it after
+    a timeout or crash does not create a duplicate event. A failed batch is
+    retried with its own backoff while other sessions keep flowing (later messages
+    of its session wait behind it, to keep them in order). It is parked after
+    max_attempts, or right away when the service rejects it for good (see
+    PERMANENT_ERRORS); parked batches stay in the file, see retry_parked().
+
+    The file is locked for as long as the journal is open: opening one that
+    another journal (e.g. a second copy of the app) is using raises JournalLocked.
+    """
+
+    def __init__(self, path, memory_client, max_batch_messages: int = 20, max_delay_seconds: float = 2.0,
+                 max_attempts: int = 8, retry_backoff_seconds: float = 0.5, max_backoff_seconds: float = 30.0,
+                 compact_interval_seconds: float = 60.0, synchronous: str = "FULL"):
+        self.path = Path(path)
+        self.memory_client = memory_client
+        self.max_batch_messages = max_batch_messages
+        self.max_delay_seconds = max_delay_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.compact_interval_seconds = compact_interval_seconds
+        self.synchronous = synchronous  # FULL also survives power loss; NORMAL only process crashes
+        self.stats = {"appended": 0, "messages": 0, "events": 0, "retries": 0, "parked": 0, "compacted": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = self._lock()
+        self._cond = threading.Condition()
+        self._db = self._connect()  # appends from any thread, serialized by _cond
+        self._db.executescript(SCHEMA)
+        if "next_attempt" not in {row[1] for row in self._db.execute("PRAGMA table_info(events)")}:
+            self._db.execute("ALTER TABLE events ADD COLUMN next_attempt REAL NOT NULL DEFAULT 0")  # older files
+        self.journal_id = self._load_journal_id()
+        self._urgent = False  # flush() asked to send without waiting for max_delay_seconds
+        self._dirty = False  # something changed since the replayer last looked
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name="EventJournal", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _lock(self):
+        """Exclusive lock on <journal>.lock; the OS releases it if the process dies"""
+        lock_file = open(self.path.with_name(self.path.name + ".lock"), "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            raise JournalLocked(f"{self.path} is in use by another process (pid in {lock_file.name}); "
+                                f"give each app process its own MEMORY_JOURNAL file") from None
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(f"PRAGMA synchronous={self.synchronous}")
+        return db
+
+    def _load_journal_id(self) -> str:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'journal_id'").fetchone()
+        if row:
+            return row[0]
+        journal_id = uuid.uuid4().hex
+        self._db.execute("INSERT INTO meta (key, value) VALUES ('journal_id', ?)", (journal_id,))
+        return journal_id
+
+    def add(self, memory_id: str, actor_id: str, session_id: str, text: str, role: str):
+        """Durably record one message (same signature as EventBatcher.add)"""
+        self.append(memory_id, actor_id, session_id, [(text, role)])
+
+    def append(self, memory_id: str, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> List[int]:
+        """Durably record messages [(text, role), ...] in one transaction; returns their sequence numbers"""
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EventJournal is closed")
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                seqs = [self._db.execute(
+                    "INSERT INTO events (memory_id, actor_id, session_id, role, text, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (memory_id, actor_id, session_id, role, text, now),
+                ).lastrowid for text, role in messages]
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.stats["appended"] += len(seqs)
+            self._dirty = True
+            self._cond.notify_all()
+        return seqs
+
+    def flush(self, key: Optional[EventKey] = None, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        """Send pending messages now (one session or all) and optionally wait until delivered.
+
+        Returns False if wait timed out first (the messages stay in the journal).
+        """
+        with self._cond:
+            self._urgent = self._dirty = True
+            self._cond.notify_all()
+            if not wait:
+                return True
+            return self._cond.wait_for(lambda: self._closed or self.pending(key) == 0, timeout)
+
+    def pending(self, key: Optional[EventKey] = None) -> int:
+        """Messages recorded but not yet delivered"""
+        if key is None:
+            sql, args = "SELECT COUNT(*) FROM events WHERE state = 0", ()
+        else:
+            sql, args = ("SELECT COUNT(*) FROM events WHERE memory_id = ? AND actor_id = ? AND session_id = ?"
+                         " AND state = 0", key)
+        with self._cond:
+            return self._db.execute(sql, args).fetchone()[0]
+
+    def parked(self) -> int:
+        """Messages whose batch gave up after max_attempts"""
+        with self._cond:
+            return self._db.execute("SELECT COUNT(*) FROM events WHERE state = 2").fetchone()[0]
+
+    def retry_parked(self) -> int:
+        """Give parked batches another round of attempts"""
+        with self._cond:
+            count = self._db.execute(
+                "UPDATE events SET state = 0, attempts = 0, next_attempt = 0 WHERE state = 2").rowcount
+            self._urgent = self._dirty = True
+            self._cond.notify_all()
+        return count
+
+    def close(self, timeout: float = 5.0):
+        """Try to deliver what is pending, then stop; undelivered events stay in the file"""
+        if self._closed:
+            return
+        self.flush(wait=True, timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        self._lock_file.close()  # releases the lock
+
+    def _run(self):
+        db = self._connect()
+        next_compaction = time.monotonic() + self.compact_interval_seconds
+        while not self._closed:
+            with self._cond:
+                self._dirty = False
+            try:
+                batch, wait = self._next_batch(db)
+            except sqlite3.Error:
+                logger.exception("Reading the journal failed")
+                batch, wait = None, self.retry_backoff_seconds
+            if batch is None:
+                if time.monotonic() >= next_compaction:
+                    self._compact(db)
+                    next_compaction = time.monotonic() + self.compact_interval_seconds
+                with self._cond:
+                    self._cond.wait_for(lambda: self._dirty or self._closed, min(wait, self.compact_interval_seconds))
+                continue
+
+            batch_id, key, rows = batch
+            try:
+                self._send(batch_id, key, rows)
+            except Exception as e:
+                attempts = rows[0][3] + 1
+                permanent = error_code(e) in PERMANENT_ERRORS
+                state = PARKED if permanent or attempts >= self.max_attempts else PENDING
+                # Only this batch (and its session) waits out the backoff; other sessions go on
+                backoff = min(self.retry_backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+                db.execute("UPDATE events SET attempts = ?, state = ?, next_attempt = ? WHERE batch = ?",
+                           (attempts, state, time.time() + backoff, batch_id))
+                if state == PARKED:
+                    self.stats["parked"] += 1
+                    logger.error("Parked journal batch %s for %s after %d attempts: %s", batch_id, key, attempts, e)
+                else:
+                    self.stats["retries"] += 1
+                    logger.warning("Delivering journal batch %s failed (attempt %d): %s", batch_id, attempts, e)
+                with self._cond:
+                    self._cond.notify_all()
+                continue
+
+            db.execute("UPDATE events SET state = 1 WHERE batch = ?", (batch_id,))
+            with self._cond:
+                self.stats["messages"] += len(rows)
+                self.stats["events"] += 1
+                self._cond.notify_all()
+        db.close()
+
+    def _next_batch(self, db: sqlite3.Connection):
+        """Returns ((batch_id, key, rows), 0) or (None, seconds to wait before looking again)"""
+        now = time.time()
+        # A batch that was assigned but not confirmed (crash or failure) is resent unchanged once its
+        # backoff is over; the oldest due one goes first
+        row = db.execute("SELECT batch FROM events WHERE state = 0 AND batch IS NOT NULL AND next_attempt <= ?"
+                         " ORDER BY seq LIMIT 1", (now,)).fetchone()
+        if row:
+            return self._load_batch(db, row[0]), 0
+        retry_at = db.execute("SELECT MIN(next_attempt) FROM events WHERE state = 0 AND batch IS NOT NULL").fetchone()[0]
+        wait = self.compact_interval_seconds if retry_at is None else retry_at - now
+
+        # New messages of sessions that have no batch waiting to be resent
+        oldest = db.execute(
+            "SELECT memory_id, actor_id, session_id, created_at FROM events AS e WHERE state = 0 AND batch IS NULL"
+            " AND NOT EXISTS (SELECT 1 FROM events AS b WHERE b.state = 0 AND b.batch IS NOT NULL"
+            " AND b.memory_id = e.memory_id AND b.actor_id = e.actor_id AND b.session_id = e.session_id)"
+            " ORDER BY seq LIMIT 1"
+        ).fetchone()
+        if oldest is None:
+            with self._cond:
+                self._urgent = False
+            return None, wait
+        key = tuple(oldest[:3])
+        seqs = [r[0] for r in db.execute(
+            "SELECT seq FROM events WHERE memory_id = ? AND actor_id = ? AND session_id = ? AND state = 0"
+            " ORDER BY seq LIMIT ?", (*key, self.max_batch_messages),
+        )]
+        age = time.time() - oldest[3]
+        if not self._urgent and len(seqs) < self.max_batch_messages and age < self.max_delay_seconds:
+            return None, min(wait, self.max_delay_seconds - age)  # let the rest of the turn arrive
+
+        batch_id = seqs[0]
+        db.execute(f"UPDATE events SET batch = ? WHERE seq IN ({','.join('?' * len(seqs))})", (batch_id, *seqs))
+        return self._load_batch(db, batch_id), 0
+
+    def _load_batch(self, db: sqlite3.Connection, batch_id: int):
+        rows = db.execute(
+            "SELECT memory_id, actor_id, session_id, attempts, role, text, created_at FROM events"
+            " WHERE batch = ? ORDER BY seq", (batch_id,),
+        ).fetchall()
+        return batch_id, tuple(rows[0][:3]), rows
+
+    def _send(self, batch_id: int, key: EventKey, rows):
+        memory_id, actor_id, session_id = key
+        token = f"{self.journal_id}-{batch_id}"
+        timestamp = datetime.fromtimestamp(rows[0][6], timezone.utc)  # keeps event order when delivered late
+        messages = [(text, role.upper()) for _, _, _, _, role, text, _ in rows]
+        gmdp_client = getattr(self.memory_client, "gmdp_client", None)
+        if gmdp_client is not None:
+            # MemoryClient.create_event doesn't take an idempotency token, so call the API directly
+            gmdp_client.create_event(
+                memoryId=memory_id, actorId=actor_id, sessionId=session_id, eventTimestamp=timestamp,
+                payload=[{"conversational": {"content": {"text": text}, "role": role}} for text, role in messages],
+                clientToken=token,
+            )
+        else:
+            self.memory_client.create_event(
+                memory_id=memory_id, actor_id=actor_id, session_id=session_id, messages=messages,
+                event_timestamp=timestamp, client_token=token,
+            )
+
+    def _compact(self, db: sqlite3.Connection):
+        """Drop delivered rows and shrink the write-ahead log"""
+        try:
+            removed = db.execute("DELETE FROM events WHERE state = 1").rowcount
+            if removed:
+                db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.stats["compacted"] += removed
+        except sqlite3.Error:
+            logger.exception("Journal compaction failed")
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """botocore ClientError code, e.g. "AccessDeniedException" (None for other errors)"""
+    response = getattr(error, "response", None)
+    return response.get("Error", {}).get("Code") if isinstance(response, dict) else None
@@ -0,0 +1,147 @@
+"""
+Concurrent retrieval across several long-term memory namespaces
+Each strategy (semantic facts, user preferences, session summaries) extracts into
+its own namespace. MultiNamespaceRetriever searches them at the same time, waits
+at most one overall deadline, and merges the answers by score with a quota per
+namespace and duplicates removed.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from common.resilience import DeadlineExceeded
+from common.text import cosine, normalize_text, trigram_profile
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[str, int], List[Dict]]  # (namespace, top_k) -> retrieve_memories records
+
+
+@dataclass(frozen=True)
+class NamespaceQuery:
+    name: str  # label for stats and the "source" of merged records
+    template: str  # e.g. "/students/math/{actorId}"; {actorId} and {sessionId} are filled in
+    quota: int = 3  # most records kept from this namespace
+    top_k: int = 3  # records requested from it
+    weight: float = 1.0  # multiplies the service's relevance score when merging
+
+    def path(self, actor_id: str, session_id: str) -> str:
+        return self.template.format(actorId=actor_id, sessionId=session_id)
+
+
+@dataclass
+class MergedMemories:
+    records: List[Dict] = field(default_factory=list)  # best first, each tagged with "source"
+    answered: List[str] = field(default_factory=list)  # namespace names, in order of arrival
+    late: List[str] = field(default_factory=list)  # still running at the deadline (left out)
+    failed: List[str] = field(default_factory=list)
+    duplicates: int = 0
+    seconds: float = 0.0
+
+
+class MultiNamespaceRetriever:
+    """Searches every configured namespace concurrently and merges the top_k best records.
+
+    Namespaces that haven't answered by deadline_seconds are left out of this
+    turn (their calls finish in the background), and one that fails doesn't
+    sink the others. Only when none answered does retrieve() raise: the first
+    error, or DeadlineExceeded. With a single namespace the call runs inline.
+
+    merge="score" compares the records' relevance scores across namespaces;
+    use merge="rank" when the scores aren't on one scale (e.g. some namespaces
+    answered by the local vector mirror's cosine similarity), which scores each
+    record weight / (1 + its rank within its namespace) instead.
+    """
+
+    def __init__(self, namespaces: List[NamespaceQuery], top_k: int = 6, deadline_seconds: Optional[float] = 1.2,
+                 duplicate_threshold: float = 0.9, max_workers: int = 16, merge: str = "score"):
+        if merge not in ("score", "rank"):
+            raise ValueError(f"merge must be 'score' or 'rank', not {merge!r}")
+        self.namespaces = list(namespaces)
+        self.top_k = top_k
+        self.deadline_seconds = deadline_seconds
+        self.duplicate_threshold = duplicate_threshold
+        self.merge = merge
+        self.stats = {"searches": 0, "late": 0, "failed": 0, "duplicates": 0}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-fanout")
+
+    def paths(self, actor_id: str, session_id: str) -> Dict[str, str]:
+        """name -> namespace for one student's session"""
+        return {ns.name: ns.path(actor_id, session_id) for ns in self.namespaces}
+
+    def retrieve(self, fetch: Fetch, paths: Dict[str, str]) -> MergedMemories:
+        start = time.monotonic()
+        result = MergedMemories()
+        answers: Dict[str, List[Dict]] = {}
+        errors = []
+        if len(self.namespaces) == 1:
+            ns = self.namespaces[0]
+            answers[ns.name] = fetch(paths[ns.name], ns.top_k) or []
+            result.answered.append(ns.name)
+        else:
+            futures = {self._executor.submit(fetch, paths[ns.name], ns.top_k): ns.name for ns in self.namespaces}
+            pending = set(futures)
+            while pending:
+                remaining = None
+                if self.deadline_seconds is not None:
+                    remaining = self.deadline_seconds - (time.monotonic() - start)
+                    if remaining <= 0:
+                        break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    if future.exception() is not None:
+                        logger.warning("Retrieval from %s failed: %s", name, future.exception())
+                        result.failed.append(name)
+                        errors.append(future.exception())
+                    else:
+                        answers[name] = future.result() or []
+                        result.answered.append(name)
+            result.late = [futures[future] for future in pending]
+
+        self._merge(answers, result)
+        result.seconds = time.monotonic() - start
+        with self._lock:
+            self.stats["searches"] += 1
+            self.stats["late"] += len(result.late)
+            self.stats["failed"] += len(result.failed)
+            self.stats["duplicates"] += result.duplicates
+        if not result.answered:
+            raise errors[0] if errors else DeadlineExceeded(
+                f"No memory namespace answered within {self.deadline_seconds:.1f}s")
+        return result
+
+    def _merge(self, answers: Dict[str, List[Dict]], result: MergedMemories):
+        candidates = []
+        for ns in self.namespaces:
+            records = [record for record in answers.get(ns.name, []) if isinstance(record, dict)]
+            if self.merge == "rank":
+                records.sort(key=lambda record: float(record.get("score") or 0.0), reverse=True)
+            for rank, record in enumerate(records):
+                score = 1.0 / (1 + rank) if self.merge == "rank" else float(record.get("score") or 0.0)
+                candidates.append((score * ns.weight, ns, record))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        taken: Dict[str, int] = {}
+        seen_ids, kept_profiles = set(), []
+        for score, ns, record in candidates:
+            if len(result.records) >= self.top_k:
+                break
+            if taken.get(ns.name, 0) >= ns.quota:
+                continue
+            record_id = record.get("memoryRecordId")
+            content = record.get("content")
+            profile = trigram_profile(normalize_text(content.get("text", "") if isinstance(content, dict) else ""))
+            if (record_id and record_id in seen_ids) or any(
+                    cosine(profile, kept) >= self.duplicate_threshold for kept in kept_profiles):
+                result.duplicates += 1
+                continue
+            seen_ids.add(record_id)
+            kept_profiles.append(profile)
+            taken[ns.name] = taken.get(ns.name, 0) + 1
+            result.records.append(dict(record, score=score, source=ns.name))
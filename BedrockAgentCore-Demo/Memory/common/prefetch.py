@@ -0,0 +1,83 @@
+"""
+Speculative memory reads
+The apps know the submitted prompt (and which agent it is for) at the top of the
+script run, well before the agent's hooks ask for memory. Prefetcher starts those
+reads right away in the background, so they overlap with rendering the chat and
+building the agent, and the hook picks up the result instead of calling again.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from common.resilience import DeadlineExceeded
+
+
+class Prefetcher:
+    """One-shot background reads keyed by what the hook will ask for.
+
+    start(key, fetch) runs fetch() on a small thread pool (once per key until it
+    is taken). take(key, fetch) returns that result, waiting up to wait_seconds
+    for it if it is still running, and calls fetch() itself only when nothing
+    was started for key. A prefetch that failed raises its error from take().
+    Results nobody takes are dropped after ttl_seconds, and discard(key) drops
+    one at once: call it when something writes what the prefetch read.
+    """
+
+    def __init__(self, wait_seconds: float = 2.0, ttl_seconds: float = 5, max_entries: int = 256,
+                 max_workers: int = 8):
+        self.wait_seconds = wait_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"started": 0, "ready": 0, "waited": 0, "missed": 0, "expired": 0, "discarded": 0,
+                      "overlap_seconds": 0.0}
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Future, float]] = {}  # key -> (future, started at)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-prefetch")
+
+    def start(self, key: Hashable, fetch: Callable[[], Any]) -> bool:
+        """Begin fetching in the background; False if a prefetch for key is already pending"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                return False
+            future = self._executor.submit(self._timed, fetch)
+            self._entries[key] = (future, now)
+            self.stats["started"] += 1
+        return True
+
+    def discard(self, key: Hashable):
+        """Forget a prefetch for key (finished or not) whose result a write has made stale"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats["discarded"] += 1
+
+    def take(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        asked_at = time.monotonic()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.stats["missed"] += 1
+        if entry is None:
+            return fetch()
+        future, started_at = entry
+        status = "ready" if future.done() else "waited"
+        if status == "waited" and not wait([future], timeout=self.wait_seconds).done:
+            raise DeadlineExceeded(f"Prefetched memory read took longer than {self.wait_seconds:.1f}s")
+        result, finished_at = future.result()  # re-raises the prefetch's error
+        with self._lock:
+            self.stats[status] += 1
+            # Time the read ran before the hook needed it: taken off the turn's critical path
+            self.stats["overlap_seconds"] += max(0.0, min(asked_at, finished_at) - started_at)
+        return result
+
+    def _timed(self, fetch: Callable[[], Any]):
+        return fetch(), time.monotonic()
+
+    def _expire(self, now: float):
+        for key, (_, started_at) in list(self._entries.items()):
+            if started_at + self.ttl_seconds <= now or len(self._entries) >= self.max_entries:
+                del self._entries[key]  # oldest first (dicts keep insertion order)
+                self.stats["expired"] += 1
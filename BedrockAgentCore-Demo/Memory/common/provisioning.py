@@ -0,0 +1,121 @@
+"""
+Non-blocking memory provisioning
+Starts create_memory and polls get_memory_status from a background worker
+(with backoff) instead of blocking the Streamlit script in create_memory_and_wait.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMemory:
+    name: str
+    memory_id: str
+    status: str = "CREATING"  # CREATING -> ACTIVE | FAILED
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    ready_at: Optional[float] = None
+    polls: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("ACTIVE", "FAILED")
+
+
+class MemoryProvisioner:
+    """Registry of memories being created plus a background status poller.
+
+    Polls start after initial_delay seconds and back off by backoff_factor up to
+    max_delay; a memory not ACTIVE after timeout seconds is marked FAILED.
+    on_ready callbacks run on the worker thread (e.g. to invalidate a catalog).
+    """
+
+    def __init__(self, client, initial_delay: float = 2.0, max_delay: float = 30.0,
+                 backoff_factor: float = 2.0, timeout: float = 900.0,
+                 on_ready: Optional[Callable[[PendingMemory], None]] = None):
+        self.client = client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.on_ready = on_ready
+        self._cond = threading.Condition()
+        self._jobs: Dict[str, PendingMemory] = {}
+        self._schedule: List = []  # heap of (next_poll_at, memory_id, delay)
+        self._worker = threading.Thread(target=self._run, name="MemoryProvisioner", daemon=True)
+        self._worker.start()
+
+    def start(self, name: str, strategies: Optional[List[Dict]] = None, description: Optional[str] = None,
+              event_expiry_days: int = 90) -> PendingMemory:
+        """Request a new memory and return immediately"""
+        memory = self.client.create_memory(
+            name=name, strategies=strategies or [], description=description, event_expiry_days=event_expiry_days
+        )
+        return self.track(memory.get("memoryId", memory.get("id")), name)
+
+    def track(self, memory_id: str, name: str = "") -> PendingMemory:
+        """Poll an existing memory (e.g. one found in CREATING state) until it is ready"""
+        with self._cond:
+            job = self._jobs.get(memory_id)
+            if job is None:
+                job = self._jobs[memory_id] = PendingMemory(name=name or memory_id, memory_id=memory_id)
+                heapq.heappush(self._schedule, (time.monotonic() + self.initial_delay, memory_id, self.initial_delay))
+                self._cond.notify_all()
+            return job
+
+    def jobs(self) -> List[PendingMemory]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def pending(self) -> List[PendingMemory]:
+        return [job for job in self.jobs() if not job.done]
+
+    def get(self, memory_id: str) -> Optional[PendingMemory]:
+        with self._cond:
+            return self._jobs.get(memory_id)
+
+    def wait(self, memory_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until a tracked memory is ACTIVE or FAILED (mainly for scripts and tests)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._jobs[memory_id].done, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._schedule or self._schedule[0][0] > time.monotonic():
+                    self._cond.wait(self._schedule[0][0] - time.monotonic() if self._schedule else None)
+                _, memory_id, delay = heapq.heappop(self._schedule)
+                job = self._jobs[memory_id]
+
+            try:
+                status = self.client.get_memory_status(memory_id)
+                error = "Memory creation failed" if status == "FAILED" else None
+            except Exception as e:
+                logger.warning("Status check for %s failed: %s", memory_id, e)
+                status, error = job.status, None
+
+            if status not in ("ACTIVE", "FAILED") and time.monotonic() - job.started_at > self.timeout:
+                status, error = "FAILED", f"Not ACTIVE after {self.timeout:g}s"
+
+            with self._cond:
+                job.polls += 1
+                job.status, job.error = status, error
+                if job.done:
+                    job.ready_at = time.monotonic()
+                else:
+                    delay = min(delay * self.backoff_factor, self.max_delay)
+                    heapq.heappush(self._schedule, (time.monotonic() + delay, memory_id, delay))
+                self._cond.notify_all()
+
+            if job.status == "ACTIVE" and self.on_ready:
+                try:
+                    self.on_ready(job)
+                except Exception:
+                    logger.exception("on_ready callback failed for %s", memory_id)
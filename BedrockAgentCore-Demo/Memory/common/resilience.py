@@ -0,0 +1,210 @@
+"""
+Deadlines, hedged reads and a circuit breaker for AgentCore Memory calls
+ResilientClient wraps a MemoryClient so a slow or failing memory service costs a
+chat turn at most a fixed deadline; while the service is unhealthy the breaker
+opens and the hooks answer without memory (the apps show a degraded flag).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from common.journal import error_code
+
+logger = logging.getLogger(__name__)
+
+# Seconds a chat turn waits for each call before giving up on memory. A create_event past
+# its deadline keeps running and often lands: callers should report it as unconfirmed, not lost
+DEFAULT_DEADLINES = {"retrieve_memories": 1.0, "get_last_k_turns": 2.0, "create_event": 3.0}
+# Reads that are safe to send twice
+HEDGED_METHODS = frozenset({"retrieve_memories", "get_last_k_turns"})
+# Searches the service rejects for the request itself, not because it is unhealthy
+REQUEST_ERRORS = frozenset({"ValidationException", "ResourceNotFoundException"})
+
+
+class MemoryUnavailable(Exception):
+    """Memory call skipped or abandoned; callers should carry on without memory"""
+
+
+class DeadlineExceeded(MemoryUnavailable, TimeoutError):
+    pass
+
+
+class CircuitOpen(MemoryUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """Opens when too many of the recent calls failed or were slow.
+
+    Outcomes of the last `window` calls are kept; once there are min_calls of
+    them and the failure or slow-call share reaches its threshold, the breaker
+    opens for cooldown_seconds. After that a single probe call is let through
+    (half-open): if it is fast and succeeds the breaker closes, otherwise it
+    opens again.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 1.0, slow_rate: float = 0.5, cooldown_seconds: float = 30.0):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.stats = {"opened": 0, "short_circuited": 0}
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def degraded(self) -> bool:
+        return self.state != "closed"
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe while open"""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state = "half_open"
+            if self.state == "closed" or (self.state == "half_open" and not self._probing):
+                self._probing = self.state == "half_open"
+                return True
+            self.stats["short_circuited"] += 1
+            return False
+
+    def record(self, seconds: float, failed: bool):
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    logger.info("Memory circuit closed")
+                return
+            if self.state == "open":
+                return  # a call started before the breaker opened
+            self._outcomes.append((failed, slow))
+            n = len(self._outcomes)
+            if n >= self.min_calls and (sum(f for f, _ in self._outcomes) >= self.failure_rate * n
+                                        or sum(s for _, s in self._outcomes) >= self.slow_rate * n):
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.stats["opened"] += 1
+        logger.warning("Memory circuit open for %.0fs", self.cooldown_seconds)
+
+
+class ResilientClient:
+    """MemoryClient proxy with per-call deadlines, hedged reads and a circuit breaker.
+
+    Calls in `deadlines` run on a small thread pool and raise DeadlineExceeded
+    when they take longer than their deadline (the request itself keeps running
+    in the background, since boto3 calls can't be cancelled). Reads in
+    HEDGED_METHODS that haven't answered after hedge_after seconds are sent a
+    second time and the first answer wins; hedge_budget caps the extra requests
+    at that share of all calls. While the breaker is open, calls raise
+    CircuitOpen without touching the service. Other attributes pass through.
+    """
+
+    def __init__(self, client, deadlines: Optional[Dict[str, float]] = None, hedge_after: Optional[float] = 0.3,
+                 hedge_budget: float = 0.1, breaker: CircuitBreaker = None, max_workers: int = 32):
+        self._client = client
+        self.deadlines = dict(DEFAULT_DEADLINES if deadlines is None else deadlines)
+        self.hedge_after = hedge_after
+        self.hedge_budget = hedge_budget
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"calls": 0, "failures": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory-call")
+
+    @property
+    def degraded(self) -> bool:
+        return self.breaker.degraded
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self.deadlines or not callable(attr):
+            return attr
+
+        def guarded(*args, **kwargs):
+            return self._call(name, lambda: attr(*args, **kwargs))
+
+        setattr(self, name, guarded)  # later lookups skip __getattr__
+        return guarded
+
+    def retrieve_memories(self, memory_id: str, namespace: str, query: str, top_k: int = 3) -> List[Dict]:
+        """MemoryClient.retrieve_memories logs a failed search and returns [], which hides an
+        outage from the breaker; send retrieve_memory_records here so failures count"""
+        if "retrieve_memories" not in self.deadlines:
+            return self._client.retrieve_memories(memory_id=memory_id, namespace=namespace, query=query, top_k=top_k)
+
+        def search():
+            try:
+                response = self._client.retrieve_memory_records(
+                    memoryId=memory_id, namespace=namespace, searchCriteria={"searchQuery": query, "topK": top_k})
+            except Exception as e:
+                if error_code(e) not in REQUEST_ERRORS:
+                    raise
+                logger.warning("Memory search in %s rejected: %s", namespace, e)
+                return []
+            return response.get("memoryRecordSummaries", [])
+
+        return self._call("retrieve_memories", search)
+
+    def _call(self, name: str, fn):
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Memory is degraded; skipped {name} (retrying in {self.breaker.retry_in():.0f}s)")
+        deadline = self.deadlines[name]
+        start = time.monotonic()
+        failed = True
+        futures = [self._executor.submit(fn)]
+        try:
+            if name in HEDGED_METHODS and self.hedge_after is not None and (deadline is None or self.hedge_after < deadline):
+                done, _ = wait(futures, timeout=self.hedge_after)
+                if not done and self._take_hedge():
+                    futures.append(self._executor.submit(fn))
+            pending, error = set(futures), None
+            while pending:
+                remaining = None if deadline is None else deadline - (time.monotonic() - start)
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    with self._lock:
+                        self.stats["timeouts"] += 1
+                    raise DeadlineExceeded(f"{name} took longer than {deadline:.1f}s")
+                for future in done:
+                    if future.exception() is None:
+                        failed = False
+                        if future is not futures[0]:
+                            with self._lock:
+                                self.stats["hedge_wins"] += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            with self._lock:
+                self.stats["calls"] += 1
+                self.stats["failures"] += failed
+            self.breaker.record(time.monotonic() - start, failed)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.stats["hedges"] >= self.hedge_budget * (self.stats["calls"] + 1):
+                return False
+            self.stats["hedges"] += 1
+            return True
@@ -0,0 +1,130 @@
+"""
+Query cache for long-term memory retrieval
+Answers repeated or lightly rephrased queries in the same namespace without
+calling retrieve_memories again.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.text import cosine, normalize_text, trigram_profile
+
+CacheKey = Tuple[str, str, str]  # (memory_id, namespace, normalized query)
+_NUMBERS = re.compile(r"\d+")
+
+
+def _numbers(normalized: str) -> Tuple[str, ...]:
+    return tuple(sorted(_NUMBERS.findall(normalized)))
+
+
+class _Entry:
+    __slots__ = ("memories", "profile", "numbers", "created_at", "expires_at")
+
+    def __init__(self, memories: List[Dict], query: str, created_at: float, expires_at: float):
+        self.memories = memories
+        self.profile = trigram_profile(query)
+        self.numbers = _numbers(query)
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+
+class RetrievalCache:
+    """LRU + TTL cache of retrieve_memories results.
+
+    Exact hits are keyed by (memory_id, namespace, normalized query). On a miss,
+    cached queries of the same namespace are compared with character-trigram
+    cosine similarity and anything at or above similarity_threshold that has the
+    same numbers is reused ("12 times 13" never answers "12 times 14").
+    Long-term extraction is asynchronous, so after new events are written
+    mark_stale() lets a namespace's entries expire once extraction should have
+    caught up; invalidate() drops them right away.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300, similarity_threshold: float = 0.9):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._stale_at: Dict[Tuple[str, str], List[float]] = {}  # (memory_id, namespace) -> pending times
+
+    def get(self, memory_id: str, namespace: str, query: str) -> Optional[List[Dict]]:
+        normalized = normalize_text(query)
+        key = (memory_id, namespace, normalized)
+        now = time.monotonic()
+        with self._lock:
+            self._expire_stale(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return list(entry.memories)
+
+            if self.similarity_threshold < 1.0:
+                profile, numbers = trigram_profile(normalized), _numbers(normalized)
+                best_key, best_score = None, self.similarity_threshold
+                for other_key, other in self._entries.items():
+                    if other_key[:2] != key[:2] or other.expires_at <= now or other.numbers != numbers:
+                        continue
+                    score = cosine(profile, other.profile)
+                    if score >= best_score:
+                        best_key, best_score = other_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.stats["near_hits"] += 1
+                    return list(self._entries[best_key].memories)
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, memory_id: str, namespace: str, query: str, memories: List[Dict]):
+        normalized = normalize_text(query)
+        with self._lock:
+            now = time.monotonic()
+            key = (memory_id, namespace, normalized)
+            self._entries[key] = _Entry(list(memories), normalized, now, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            # Drop expired entries from the cold end, then enforce the size bound
+            while self._entries:
+                oldest_key, oldest = next(iter(self._entries.items()))
+                if len(self._entries) <= self.max_entries and oldest.expires_at > now:
+                    break
+                del self._entries[oldest_key]
+
+    def get_or_fetch(self, memory_id: str, namespace: str, query: str,
+                     fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        memories = self.get(memory_id, namespace, query)
+        if memories is None:
+            memories = fetch() or []
+            self.put(memory_id, namespace, query, memories)
+        return memories
+
+    def mark_stale(self, memory_id: str, namespace: str, after: float):
+        """Expire the namespace's current entries `after` seconds from now (when new records should be in)"""
+        with self._lock:
+            self._stale_at.setdefault((memory_id, namespace), []).append(time.monotonic() + after)
+
+    def invalidate(self, memory_id: str, namespace: Optional[str] = None):
+        """Forget cached results for a namespace (or the whole memory)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == memory_id and namespace in (None, k[1])]:
+                del self._entries[key]
+
+    def _expire_stale(self, now: float):
+        """Drop entries cached before a stale time that has passed"""
+        for scope, times in list(self._stale_at.items()):
+            due = [t for t in times if t <= now]
+            if not due:
+                continue
+            cutoff = max(due)
+            for key in [k for k, e in self._entries.items() if k[:2] == scope and e.created_at < cutoff]:
+                del self._entries[key]
+            remaining = [t for t in times if t > now]
+            if remaining:
+                self._stale_at[scope] = remaining
+            else:
+                del self._stale_at[scope]
@@ -0,0 +1,48 @@
+"""
+Cold-start helpers for the demo apps
+The apps import strands and strands_tools (about a second together) on first use
+rather than at module top, so the first page renders right away; prewarm() starts
+those imports in a background thread while the user looks at the page.
+create_model() builds the Bedrock model client that every agent in the process shares.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Imported in the background by prewarm() and on first use by the apps
+HEAVY_MODULES = ("strands", "strands.models.bedrock")
+
+import_seconds: Dict[str, float] = {}  # module -> time prewarm() spent importing it
+_started = set()
+_lock = threading.Lock()
+
+
+def prewarm(*modules: str):
+    """Import modules in a daemon thread (once per process); a later import waits for it instead of starting over"""
+    with _lock:
+        todo = [name for name in modules or HEAVY_MODULES if name not in _started]
+        _started.update(todo)
+    if not todo:
+        return
+
+    def run():
+        for name in todo:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception:
+                logger.exception("Prewarming %s failed", name)
+            import_seconds[name] = time.perf_counter() - start
+
+    threading.Thread(target=run, name="prewarm", daemon=True).start()
+
+
+def create_model(**model_config):
+    """Bedrock model for Agent(model=...); one instance (and boto3 client) can serve every agent"""
+    from strands.models import BedrockModel
+    return BedrockModel(**model_config)
@@ -0,0 +1,69 @@
+"""
+Streaming agent responses for the Streamlit demo apps
+Drives Agent.stream_async on the script thread so text can be rendered as it
+arrives (st.write_stream) while hook callbacks keep running where st.* works.
+"""
+
+import asyncio
+import time
+from typing import Iterator, Optional
+
+_DONE = object()
+
+
+class StreamedTurn:
+    """Iterable over the text chunks of one agent turn, with per-turn timings.
+
+    After iteration: ttft is the time to the first text chunk, total the time to
+    the end of the turn (both in seconds) and result the AgentResult.
+    """
+
+    def __init__(self, agent, prompt: str):
+        self.agent = agent
+        self.prompt = prompt
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+        self.result = None
+
+    def __iter__(self) -> Iterator[str]:
+        loop = asyncio.new_event_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        async def drain():
+            # One task owns the agent stream so its context (tracing, cancel scopes) stays intact
+            try:
+                async for event in self.agent.stream_async(self.prompt):
+                    if event.get("data"):
+                        chunks.put_nowait(event["data"])
+                    if "result" in event:
+                        self.result = event["result"]
+            finally:
+                chunks.put_nowait(_DONE)
+
+        start = time.perf_counter()
+        task = loop.create_task(drain())
+        try:
+            while True:
+                chunk = loop.run_until_complete(chunks.get())
+                if chunk is _DONE:
+                    break
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - start
+                yield chunk
+            loop.run_until_complete(task)  # re-raise agent errors
+        finally:
+            self.total = time.perf_counter() - start
+            if not task.done():
+                task.cancel()
+                loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+            loop.close()
+
+    @property
+    def timings(self) -> dict:
+        return {"ttft": self.ttft, "total": self.total}
+
+
+def format_timings(timings: dict) -> str:
+    """One-line summary of a turn's timings for the info panels"""
+    ttft = f"{timings['ttft']:.2f}s" if timings.get("ttft") is not None else "n/a"
+    return f"first token {ttft}, total {timings['total']:.2f}s"
@@ -0,0 +1,39 @@
+"""
+Small text helpers: normalization, trigram similarity and token estimates
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Tuple
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+TrigramProfile = Tuple[Counter, float]  # (trigram counts, vector norm)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+def trigram_profile(normalized: str) -> TrigramProfile:
+    padded = f"  {normalized} "
+    counts = Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+    return counts, math.sqrt(sum(c * c for c in counts.values()))
+
+
+def cosine(a: TrigramProfile, b: TrigramProfile) -> float:
+    """Cosine similarity of two trigram profiles (0.0 - 1.0)"""
+    (a_counts, a_norm), (b_counts, b_norm) = a, b
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a_counts) > len(b_counts):
+        a_counts, b_counts = b_counts, a_counts
+    return sum(count * b_counts[gram] for gram, count in a_counts.items()) / (a_norm * b_norm)
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate (~4 characters per token for English text)"""
+    return (len(text) + 3) // 4
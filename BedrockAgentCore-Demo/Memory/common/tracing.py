@@ -0,0 +1,306 @@
+"""
+Lightweight per-turn tracing for the demo apps
+Timing spans around hook callbacks, model/tool calls and MemoryClient operations,
+grouped per turn for the info panels and exportable as JSON lines or OTLP/JSON.
+When a tracer is disabled, span() returns a shared no-op object.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:  # strands is imported on first use (see common/startup.py)
+    from strands.hooks import (AfterModelCallEvent, AfterToolCallEvent, BeforeModelCallEvent,
+                               BeforeToolCallEvent, HookRegistry)
+
+# MemoryClient methods wrapped by TracedClient
+TRACED_METHODS = frozenset({
+    "create_event", "get_last_k_turns", "retrieve_memories", "list_memories",
+    "create_memory", "get_memory_status", "list_memory_records",
+})
+
+# Innermost open span on this thread/task; hook callbacks running on another
+# thread fall back to the root span of the tracer's current turn.
+_current_span: contextvars.ContextVar = contextvars.ContextVar("memory_demo_span", default=None)
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        return self
+
+    def end(self, error: Optional[str] = None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    _perf_start: float = field(default_factory=time.perf_counter, repr=False)
+    _duration: Optional[float] = field(default=None, repr=False)
+    _token: Any = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self._duration is None else self._duration * 1000
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def end(self, error: Optional[str] = None):
+        if self.end_ns is None:
+            self._duration = time.perf_counter() - self._perf_start
+            self.end_ns = self.start_ns + int(self._duration * 1e9)
+            self.error = error
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(repr(exc) if exc else None)
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                pass  # exited in a different context than it was entered
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms, "attributes": self.attributes, "error": self.error,
+        }
+
+
+@dataclass
+class TurnTrace:
+    trace_id: str
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Rows for display: every span in start order, indented by depth"""
+        depth = {self.root.span_id: 0}
+        rows = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            details = ", ".join(f"{k}={v}" for k, v in span.attributes.items() if v is not None)
+            if span.error:
+                details = f"{details}, error={span.error}" if details else f"error={span.error}"
+            rows.append({
+                "span": "  " * depth[span.span_id] + span.name,
+                "ms": round(span.duration_ms, 1) if span.duration_ms is not None else None,
+                "details": details,
+            })
+        return rows
+
+
+class Tracer:
+    """Collects spans for the turn in progress and keeps the last max_turns turns.
+
+        with tracer.turn("turn", prompt_chars=len(prompt)):
+            with tracer.span("history.load", memory_id=memory_id) as span:
+                ...
+                span.set(messages=len(messages))
+
+    Finished turns are appended as JSON lines to sink_path when it is set.
+    """
+
+    def __init__(self, enabled: bool = False, max_turns: int = 20, service_name: str = "agentcore-memory-demo",
+                 sink_path: Optional[str] = None):
+        self.enabled = enabled
+        self.service_name = service_name
+        self.sink_path = sink_path
+        self.turns: deque = deque(maxlen=max_turns)
+        self._current: Optional[TurnTrace] = None
+        self._lock = threading.Lock()
+
+    def turn(self, name: str = "turn", **attributes):
+        """Root span of a new turn (agent setup counts as a turn too)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        trace = TurnTrace(trace_id=os.urandom(16).hex())
+        root = Span(name, trace.trace_id, os.urandom(8).hex(), None, attributes=attributes)
+        trace.spans.append(root)
+        self._current = trace
+        return _TurnContext(self, trace, root)
+
+    def span(self, name: str, **attributes):
+        """Child span of the innermost open span (use as a context manager, or call end())"""
+        trace = self._current
+        if not self.enabled or trace is None:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        parent_id = parent.span_id if parent is not None and parent.trace_id == trace.trace_id else trace.root.span_id
+        span = Span(name, trace.trace_id, os.urandom(8).hex(), parent_id, attributes=attributes)
+        with self._lock:
+            trace.spans.append(span)
+        return span
+
+    def last_turn(self) -> Optional[TurnTrace]:
+        return self.turns[-1] if self.turns else None
+
+    def _finish(self, trace: TurnTrace):
+        for span in trace.spans:
+            span.end()  # close spans left open by an error
+        self.turns.append(trace)
+        if self._current is trace:
+            self._current = None
+        if self.sink_path:
+            with open(self.sink_path, "a") as f:
+                f.write(to_jsonl([trace]))
+
+    def export_jsonl(self) -> str:
+        return to_jsonl(self.turns)
+
+    def export_otlp(self) -> str:
+        return json.dumps(to_otlp(self.turns, self.service_name))
+
+
+class _TurnContext:
+    def __init__(self, tracer: Tracer, trace: TurnTrace, root: Span):
+        self.tracer = tracer
+        self.trace = trace
+        self.root = root
+
+    def set(self, **attributes):
+        self.root.set(**attributes)
+        return self
+
+    def end(self, error: Optional[str] = None):
+        self.root.end(error)
+
+    def __enter__(self):
+        self.root.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.root.__exit__(*exc)
+        self.tracer._finish(self.trace)
+        return False
+
+
+def to_jsonl(turns: Iterable[TurnTrace]) -> str:
+    """One JSON object per span"""
+    return "".join(json.dumps(span.to_dict(), default=str) + "\n" for trace in turns for span in trace.spans)
+
+
+def _otlp_value(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(turns: Iterable[TurnTrace], service_name: str = "agentcore-memory-demo") -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest body (POST to a collector's /v1/traces)"""
+    spans = []
+    for trace in turns:
+        for span in trace.spans:
+            record = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items() if v is not None],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                record["parentSpanId"] = span.parent_id
+            spans.append(record)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{"scope": {"name": "common.tracing"}, "spans": spans}],
+    }]}
+
+
+class TracedClient:
+    """MemoryClient proxy that records a span per TRACED_METHODS call while tracing is on"""
+
+    def __init__(self, client, tracer: Tracer):
+        self._client = client
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in TRACED_METHODS or not callable(attr):
+            return attr
+        tracer = self._tracer
+
+        def traced(*args, **kwargs):
+            if not tracer.enabled:
+                return attr(*args, **kwargs)
+            with tracer.span(f"memory.{name}", memory_id=kwargs.get("memory_id")) as span:
+                result = attr(*args, **kwargs)
+                if isinstance(result, list):
+                    span.set(results=len(result))
+                return result
+
+        setattr(self, name, traced)  # later lookups skip __getattr__
+        return traced
+
+
+class TracingHookProvider:
+    """Spans for each model call and tool call of an agent (a strands HookProvider)"""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._model_span = NOOP_SPAN
+        self._tool_spans: Dict[str, Any] = {}
+
+    def before_model(self, event: BeforeModelCallEvent):
+        self._model_span = self.tracer.span("model", messages=len(event.agent.messages))
+
+    def after_model(self, event: AfterModelCallEvent):
+        stop = getattr(event, "stop_response", None)
+        self._model_span.set(stop_reason=getattr(stop, "stop_reason", None))
+        self._model_span.end(repr(event.exception) if getattr(event, "exception", None) else None)
+        self._model_span = NOOP_SPAN
+
+    def before_tool(self, event: BeforeToolCallEvent):
+        tool = event.tool_use
+        self._tool_spans[tool["toolUseId"]] = self.tracer.span(f"tool.{tool['name']}")
+
+    def after_tool(self, event: AfterToolCallEvent):
+        span = self._tool_spans.pop(event.tool_use["toolUseId"], NOOP_SPAN)
+        span.end(repr(event.exception) if getattr(event, "exception", None) else None)
+
+    def register_hooks(self, registry: HookRegistry):
+        from strands.hooks import AfterModelCallEvent, AfterToolCallEvent, BeforeModelCallEvent, BeforeToolCallEvent
+        registry.add_callback(BeforeModelCallEvent, self.before_model)
+        registry.add_callback(AfterModelCallEvent, self.after_model)
+        registry.add_callback(BeforeToolCallEvent, self.before_tool)
+        registry.add_callback(AfterToolCallEvent, self.after_tool)
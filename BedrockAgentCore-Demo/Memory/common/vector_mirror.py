@@ -0,0 +1,218 @@
+"""
+In-process mirror of long-term memory records
+Keeps each tracked namespace's records and their embeddings in a NumPy matrix
+so retrieve_memories can be answered locally with a top-k cosine search.
+A background thread re-syncs the mirror from the memory store; searches on a
+mirror that has not synced recently return None so callers use the service.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (memory_id, namespace) -> memory records shaped like retrieve_memories results
+RecordSource = Callable[[str, str], List[Dict]]
+# list of texts -> (len(texts), dim) float array
+Embedder = Callable[[List[str]], np.ndarray]
+
+
+class HashingEmbedder:
+    """Deterministic local embedder: hashed character-trigram counts (for tests and offline runs)"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()} "
+            for i in range(len(padded) - 2):
+                digest = hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest()
+                vectors[row, int.from_bytes(digest, "little") % self.dim] += 1.0
+        return vectors
+
+
+class TitanEmbedder:
+    """Embeds texts with Amazon Titan Text Embeddings through bedrock-runtime"""
+
+    def __init__(self, bedrock_runtime=None, model_id: str = "amazon.titan-embed-text-v2:0", dim: int = 512):
+        if bedrock_runtime is None:
+            import boto3
+            bedrock_runtime = boto3.client("bedrock-runtime")
+        self.bedrock_runtime = bedrock_runtime
+        self.model_id = model_id
+        self.dim = dim
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            response = self.bedrock_runtime.invoke_model(
+                modelId=self.model_id,
+                body=json.dumps({"inputText": text, "dimensions": self.dim, "normalize": True}),
+                contentType="application/json",
+            )
+            vectors[row] = json.loads(response["body"].read())["embedding"]
+        return vectors
+
+
+def memory_record_source(client) -> RecordSource:
+    """Sync source that pages through list_memory_records on a MemoryClient"""
+    def fetch(memory_id: str, namespace: str) -> List[Dict]:
+        records, token = [], None
+        while True:
+            params = {"memoryId": memory_id, "namespace": namespace, "maxResults": 100}
+            if token:
+                params["nextToken"] = token
+            response = client.list_memory_records(**params)
+            records.extend(response.get("memoryRecordSummaries", []))
+            token = response.get("nextToken")
+            if not token:
+                return records
+    return fetch
+
+
+class _NamespaceIndex:
+    __slots__ = ("ids", "records", "matrix", "synced_at")
+
+    def __init__(self, dim: int):
+        self.ids: List[str] = []
+        self.records: List[Dict] = []
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.synced_at: Optional[float] = None
+
+
+class VectorMirror:
+    """Local top-k cosine index over the records of tracked namespaces.
+
+    The search itself is local, but the query still has to be embedded: with
+    HashingEmbedder that is local too (well under a millisecond), with
+    TitanEmbedder it is one Bedrock call per new query. Query vectors are kept
+    in a small LRU, so searching the same query in several namespaces (or again)
+    embeds it once. Scores are cosine similarities, not the service's relevance
+    scores: merge mirror and service results by rank, not by raw score.
+    """
+
+    def __init__(self, source: RecordSource, embedder: Embedder, dim: int,
+                 refresh_seconds: float = 60, max_staleness_seconds: float = 180, background: bool = True,
+                 query_cache_size: int = 256):
+        self.source = source
+        self.embedder = embedder
+        self.dim = dim
+        self.refresh_seconds = refresh_seconds
+        self.max_staleness_seconds = max_staleness_seconds
+        self.query_cache_size = query_cache_size
+        self.stats = {"local_hits": 0, "stale": 0, "syncs": 0, "embedded": 0, "queries_embedded": 0,
+                      "query_cache_hits": 0}
+        self._lock = threading.Lock()
+        self._query_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._indexes: Dict[Tuple[str, str], _NamespaceIndex] = {}
+        self._wake = threading.Event()
+        self._closed = False
+        self._worker = None
+        if background:
+            self._worker = threading.Thread(target=self._run, name="VectorMirror", daemon=True)
+            self._worker.start()
+
+    def track(self, memory_id: str, namespace: str):
+        """Start mirroring a namespace (first sync happens in the background)"""
+        with self._lock:
+            if (memory_id, namespace) in self._indexes:
+                return
+            self._indexes[(memory_id, namespace)] = _NamespaceIndex(self.dim)
+        self._wake.set()
+
+    def sync(self, memory_id: str, namespace: str):
+        """Pull records from the source and embed the ones not seen before"""
+        records = self.source(memory_id, namespace)
+        with self._lock:
+            index = self._indexes.setdefault((memory_id, namespace), _NamespaceIndex(self.dim))
+            known = dict(zip(index.ids, range(len(index.ids))))
+            matrix_before = index.matrix
+
+        texts, ids, kept = [], [], []
+        for record in records:
+            text = record.get("content", {}).get("text", "").strip()
+            if not text:
+                continue
+            record_id = record.get("memoryRecordId") or hashlib.sha1(text.encode()).hexdigest()
+            ids.append(record_id)
+            kept.append(record)
+            if record_id not in known:
+                texts.append(text)
+
+        new_vectors = iter(_normalize(self.embedder(texts)) if texts else ())
+        matrix = np.zeros((len(ids), self.dim), dtype=np.float32)
+        for row, record_id in enumerate(ids):
+            matrix[row] = matrix_before[known[record_id]] if record_id in known else next(new_vectors)
+
+        with self._lock:
+            index.ids, index.records, index.matrix = ids, kept, matrix
+            index.synced_at = time.monotonic()
+            self.stats["syncs"] += 1
+            self.stats["embedded"] += len(texts)
+
+    def search(self, memory_id: str, namespace: str, query: str, top_k: int = 3) -> Optional[List[Dict]]:
+        """Top-k records by cosine similarity, or None if the mirror is missing or stale"""
+        with self._lock:
+            index = self._indexes.get((memory_id, namespace))
+            if (index is None or index.synced_at is None
+                    or time.monotonic() - index.synced_at > self.max_staleness_seconds):
+                self.stats["stale"] += 1
+                return None
+            records, matrix = index.records, index.matrix
+            self.stats["local_hits"] += 1
+        if not records:
+            return []
+
+        scores = matrix @ self._embed_query(query)
+        k = min(top_k, len(records))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{**records[i], "score": float(scores[i])} for i in top]
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        with self._lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                self.stats["query_cache_hits"] += 1
+                return vector
+        vector = _normalize(self.embedder([query]))[0]
+        with self._lock:
+            self._query_vectors[query] = vector
+            while len(self._query_vectors) > self.query_cache_size:
+                self._query_vectors.popitem(last=False)
+            self.stats["queries_embedded"] += 1
+        return vector
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            # Clear before looking for work: a track()/refresh() from here on wakes the next wait
+            self._wake.clear()
+            with self._lock:
+                due = [key for key, index in self._indexes.items()
+                       if index.synced_at is None or time.monotonic() - index.synced_at >= self.refresh_seconds]
+            for memory_id, namespace in due:
+                try:
+                    self.sync(memory_id, namespace)
+                except Exception:
+                    logger.exception("Mirror sync failed for %s", namespace)
+            self._wake.wait(self.refresh_seconds)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
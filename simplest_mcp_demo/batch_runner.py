@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Batch mode for mcp_client.py: many prompts through one MCP session and one Bedrock client
+
+Each input line is a JSON object:
+    {"id": "q1", "prompt": "It is {get_current_datetime}. {hello} Reply briefly.",
+     "tools": {"get_current_datetime": {}, "hello": {"name": "Ana"}}, "max_tokens": 100}
+The tools are called on the shared MCP session (all at once), their text results fill
+the {tool name} placeholders in the prompt, and the prompt goes to Bedrock. "id"
+defaults to the line number, "tools" to none, "temperature" to --temperature.
+A line that isn't a JSON object gets an error result under its line number and
+the rest of the batch carries on.
+
+At most --concurrency prompts are in flight. Each result is appended to --output as
+soon as it finishes, so the output doubles as the checkpoint: rerunning the same
+command skips ids that already have an answer and retries the ones that failed.
+
+Run with: uv run python batch_runner.py prompts.jsonl --output results.jsonl --concurrency 16
+Offline:  uv run python batch_runner.py --sample 500 > prompts.jsonl
+          uv run python batch_runner.py prompts.jsonl --output results.jsonl --fake-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+from bedrock_async import DEFAULT_MODEL_ID, AsyncBedrock
+from fake_bedrock import StubBedrockClient
+from mcp_pool import LOCAL_SERVER, MCPSessionPool
+from response_cache import ResponseCache
+
+# The local server without its per-request INFO logs, which cost more than the calls at this volume
+BATCH_SERVER = LOCAL_SERVER.model_copy(update={"args": LOCAL_SERVER.args + ["--log-level", "WARNING"]})
+
+
+def read_prompts(path) -> Iterator[Dict[str, Any]]:
+    """Yield input records lazily, so huge files aren't loaded at once"""
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = {"_invalid": f"line {number} is not valid JSON: {e}"}
+            if not isinstance(record, dict):
+                record = {"_invalid": f"line {number} is not a JSON object"}
+            record.setdefault("id", str(number))
+            yield record
+
+
+def completed_ids(path) -> Set[str]:
+    """Ids that already have an answer in a previous run's output (the checkpoint)"""
+    done = set()
+    if not Path(path).exists():
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # cut off by a crash mid-write; that prompt runs again
+            if "output" in result:
+                done.add(str(result["id"]))
+    return done
+
+
+def sample_prompts(count: int) -> Iterator[Dict[str, Any]]:
+    for i in range(count):
+        yield {
+            "id": f"sample-{i}",
+            "prompt": "I got the current time: {get_current_datetime} and a greeting: {hello}. "
+                      "Create a brief, friendly response.",
+            "tools": {"get_current_datetime": {}, "hello": {"name": f"User {i}"}},
+        }
+
+
+class BatchRunner:
+    """Streams prompt records through a shared MCPSessionPool and AsyncBedrock.
+
+    run() keeps at most `concurrency` prompts in flight (a semaphore, taken
+    before the next record is even read), writes one JSON line per finished
+    prompt and returns throughput and latency stats.
+    """
+
+    def __init__(self, pool: MCPSessionPool, bedrock: AsyncBedrock, concurrency: int = 8,
+                 model_id: str = DEFAULT_MODEL_ID, max_tokens: int = 100, progress_every: float = 5.0,
+                 temperature: Optional[float] = None):
+        self.pool = pool
+        self.bedrock = bedrock
+        self.concurrency = concurrency
+        self.model_id = model_id
+        self.max_tokens = max_tokens
+        self.progress_every = progress_every
+        self.temperature = temperature  # 0 makes replies cacheable (see response_cache.py)
+        self.stats = {"done": 0, "failed": 0, "skipped": 0}
+        self._latencies = []
+        self._tool_seconds = 0.0
+        self._model_seconds = 0.0
+
+    async def run(self, records, output, skip: Optional[Set[str]] = None) -> Dict[str, Any]:
+        skip = skip or set()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        start = time.perf_counter()
+        progress = asyncio.create_task(self._report_progress(start))
+
+        async def process(record):
+            try:
+                result = await self._process(record)
+                output.write(json.dumps(result) + "\n")
+                output.flush()  # a crash loses at most the prompts still in flight
+            finally:
+                semaphore.release()
+
+        try:
+            for record in records:
+                if str(record["id"]) in skip:
+                    self.stats["skipped"] += 1
+                    continue
+                await semaphore.acquire()
+                task = asyncio.create_task(process(record))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # Even if reading the input fails, let the prompts in flight finish and be written
+            await asyncio.gather(*tasks, return_exceptions=True)
+            progress.cancel()
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, wall: float) -> Dict[str, Any]:
+        processed = self.stats["done"] + self.stats["failed"]
+        latencies = sorted(self._latencies)
+        return dict(
+            self.stats,
+            wall_seconds=round(wall, 3),
+            prompts_per_second=round(processed / wall, 2) if wall else 0.0,
+            p50_ms=round(statistics.median(latencies) * 1000, 1) if latencies else None,
+            p95_ms=round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+            if latencies else None,
+            tool_seconds=round(self._tool_seconds, 2),
+            model_seconds=round(self._model_seconds, 2),
+        )
+
+    async def _process(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result = {"id": record["id"]}
+        try:
+            if "_invalid" in record:
+                raise ValueError(record["_invalid"])
+            tools = record.get("tools") or {}
+            # Independent tool calls: send them together on the shared session
+            responses = await asyncio.gather(*(self.pool.call_tool(name, args) for name, args in tools.items()))
+            tools_done = time.perf_counter()
+            self._tool_seconds += tools_done - start
+            values = {}
+            for name, response in zip(tools, responses):
+                text = response.content[0].text if response.content else ""
+                if response.isError:
+                    raise RuntimeError(f"Tool {name} failed: {text}")
+                values[name] = text
+            prompt = record["prompt"].format(**values) if tools else record["prompt"]
+            result["output"] = await self.bedrock.ask(
+                prompt, max_tokens=record.get("max_tokens", self.max_tokens), model_id=self.model_id,
+                temperature=record.get("temperature", self.temperature))
+            self._model_seconds += time.perf_counter() - tools_done
+            self.stats["done"] += 1
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            self.stats["failed"] += 1
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        self._latencies.append(result["seconds"])
+        return result
+
+    async def _report_progress(self, start: float):
+        while True:
+            await asyncio.sleep(self.progress_every)
+            processed = self.stats["done"] + self.stats["failed"]
+            print(f"{processed} prompts ({self.stats['failed']} failed), "
+                  f"{processed / (time.perf_counter() - start):.1f} prompts/s", file=sys.stderr)
+
+
+async def main(args):
+    client = StubBedrockClient(args.fake_latency) if args.fake_latency is not None else None
+    cache = ResponseCache(args.cache) if args.cache else None
+    skip = set() if args.restart else completed_ids(args.output)
+    if skip:
+        print(f"Resuming: {len(skip)} prompts already answered in {args.output}", file=sys.stderr)
+    if not args.restart and Path(args.output).exists() and Path(args.output).stat().st_size:
+        with open(args.output, "rb+") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")  # end a line cut off by a crash, so the next result starts cleanly
+
+    async with MCPSessionPool(BATCH_SERVER, size=args.sessions) as pool:
+        async with AsyncBedrock(max_concurrency=args.concurrency, client=client, cache=cache) as bedrock:
+            runner = BatchRunner(pool, bedrock, args.concurrency, args.model_id, args.max_tokens,
+                                 args.progress_every, args.temperature)
+            with open(args.output, "w" if args.restart else "a") as output:
+                summary = await runner.run(read_prompts(args.input), output, skip)
+    if bedrock.cache is not None:
+        summary["cache_hit_rate"] = round(bedrock.cache.hit_rate(), 3)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="JSONL file of prompts")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL results, appended (and resumed from)")
+    parser.add_argument("--concurrency", type=int, default=8, help="prompts in flight")
+    parser.add_argument("--sessions", type=int, default=1, help="MCP server sessions to share")
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--max-tokens", type=int, default=100)
+    parser.add_argument("--temperature", type=float, help="model temperature (default: the model's, 1.0)")
+    parser.add_argument("--cache", metavar="PATH", help="ResponseCache file; only temperature 0 replies are cached")
+    parser.add_argument("--fake-latency", type=float, help="use StubBedrockClient with this latency (offline)")
+    parser.add_argument("--restart", action="store_true", help="ignore and overwrite an existing --output")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--sample", type=int, metavar="N", help="print N sample prompts as JSONL and exit")
+    args = parser.parse_args()
+    if args.sample:
+        for record in sample_prompts(args.sample):
+            print(json.dumps(record))
+    elif not args.input:
+        parser.error("an input file is required (or --sample N)")
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Async adapter for Bedrock invoke_model that never blocks the event loop"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import boto3
+from botocore import UNSIGNED
+from botocore.config import Config
+
+from response_cache import ResponseCache
+
+DEFAULT_MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
+
+
+class AsyncBedrock:
+    """Runs the synchronous boto3 invoke_model on a bounded thread pool.
+
+    max_concurrency caps both the worker threads and the HTTP connection pool,
+    so a burst of coroutines queues here instead of opening unbounded requests.
+    Set endpoint_url (or BEDROCK_ENDPOINT_URL) to use another endpoint, e.g. a VPC
+    or FIPS one; requests are signed with the usual credential chain. For the
+    local fake in fake_bedrock.py also set fake_endpoint=True (or
+    BEDROCK_FAKE_ENDPOINT=1), which sends unsigned requests, so no credentials
+    are needed. Or pass any object with boto3's invoke_model signature as client
+    (see StubBedrockClient there).
+    With a ResponseCache (or BEDROCK_RESPONSE_CACHE=<path to a cache file>),
+    repeated deterministic requests (temperature=0) are answered from disk.
+
+        async with AsyncBedrock() as bedrock:
+            text = await bedrock.ask("Hi!")
+    """
+
+    def __init__(self, region_name: str = "us-east-1", endpoint_url: Optional[str] = None,
+                 max_concurrency: int = 8, client=None, cache: Optional[ResponseCache] = None,
+                 fake_endpoint: Optional[bool] = None):
+        endpoint_url = endpoint_url or os.environ.get("BEDROCK_ENDPOINT_URL")
+        if fake_endpoint is None:
+            fake_endpoint = os.environ.get("BEDROCK_FAKE_ENDPOINT", "0") == "1"
+        if client is None:
+            config = Config(max_pool_connections=max_concurrency)
+            if fake_endpoint:
+                # The fake does not check signatures; don't require real credentials for it
+                config = config.merge(Config(signature_version=UNSIGNED))
+            client = boto3.client(
+                "bedrock-runtime", region_name=region_name, endpoint_url=endpoint_url, config=config,
+            )
+        self.client = client
+        if cache is None and os.environ.get("BEDROCK_RESPONSE_CACHE"):
+            cache = ResponseCache(os.environ["BEDROCK_RESPONSE_CACHE"])
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bedrock")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def invoke_model(self, body: Dict[str, Any], model_id: str = DEFAULT_MODEL_ID,
+                           cache: Optional[bool] = None) -> Dict[str, Any]:
+        """invoke_model with a JSON body; returns the decoded JSON response.
+
+        cache=False skips the response cache (e.g. when you want a fresh sample);
+        by default only requests with temperature 0 are cached.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._invoke_cached, model_id, body, cache)
+
+    async def ask(self, prompt: str, max_tokens: int = 100, model_id: str = DEFAULT_MODEL_ID,
+                  cache: Optional[bool] = None, temperature: Optional[float] = None) -> str:
+        """Single-turn Anthropic messages call; returns the text of the reply.
+
+        Leaving temperature unset uses the model's default (1.0, sampled, never
+        cached); temperature=0 makes the reply cacheable.
+        """
+        body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if temperature is not None:
+            body["temperature"] = temperature
+        result = await self.invoke_model(body, model_id, cache)
+        return result["content"][0]["text"]
+
+    def _invoke_cached(self, model_id: str, body: Dict[str, Any], cache: Optional[bool]) -> Dict[str, Any]:
+        # Runs on the worker thread, so cache reads and writes stay off the event loop too
+        if self.cache is None:
+            return self._invoke(model_id, json.dumps(body))
+        return self.cache.fetch(model_id, body, lambda: self._invoke(model_id, json.dumps(body)), cache)
+
+    def _invoke(self, model_id: str, body: str) -> Dict[str, Any]:
+        response = self.client.invoke_model(modelId=model_id, body=body, contentType="application/json")
+        return json.loads(response["body"].read())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Blocking vs async Bedrock calls inside the event loop, fully offline
+Starts fake_bedrock.py in-process and fires N model calls at once:
+
+Blocking: boto3 invoke_model called directly in coroutines (the old mcp_client.py)
+Async:    the same calls through AsyncBedrock's bounded thread pool
+
+For each, prints wall time and the worst event loop stall seen by a 10ms ticker.
+
+Run with: uv run python benchmark_async.py --calls 8 --latency 0.5 --max-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from bedrock_async import DEFAULT_MODEL_ID, AsyncBedrock
+from fake_bedrock import start_fake_bedrock
+
+BODY = {
+    "anthropic_version": "bedrock-2023-05-31",
+    "max_tokens": 100,
+    "messages": [{"role": "user", "content": "ping"}]
+}
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Largest delay between ticks, i.e. how long the loop was frozen"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def measure(label: str, calls):
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    await asyncio.sleep(0)  # let the watcher take its first tick
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    wall = time.perf_counter() - start
+    stop.set()
+    stall = await watcher
+    print(f"{label:<10} wall={wall:6.2f}s  worst loop stall={stall * 1000:8.1f}ms")
+
+
+async def main(calls: int, latency: float, max_concurrency: int):
+    server, url = start_fake_bedrock(latency)
+    print(f"{calls} calls, {latency}s fake model latency, endpoint {url}")
+    try:
+        async with AsyncBedrock(endpoint_url=url, max_concurrency=max_concurrency, fake_endpoint=True) as bedrock:
+            async def blocking_call():
+                response = bedrock.client.invoke_model(
+                    modelId=DEFAULT_MODEL_ID, body=json.dumps(BODY), contentType="application/json"
+                )
+                return json.loads(response["body"].read())
+
+            await measure("blocking", [blocking_call() for _ in range(calls)])
+            # Same body every time: keep BEDROCK_RESPONSE_CACHE from answering from disk
+            await measure("async", [bedrock.invoke_model(BODY, cache=False) for _ in range(calls)])
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency, args.max_concurrency))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Prompts per second: one process per prompt vs batch_runner.py, fully offline
+Uses the local MCP server and StubBedrockClient (--latency seconds per model call):
+
+Per prompt: what running mcp_client.py once per prompt costs, i.e. a new server
+            subprocess, handshake and Bedrock client every time (--cold prompts)
+Batch:      BatchRunner over one shared session and client at several concurrencies
+
+Run with: uv run python benchmark_batch.py --prompts 200 --latency 0.5 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from mcp import ClientSession
+from mcp.client.stdio import stdio_client
+
+from batch_runner import BATCH_SERVER, BatchRunner, sample_prompts
+from bedrock_async import AsyncBedrock
+from fake_bedrock import StubBedrockClient
+from mcp_pool import MCPSessionPool
+
+
+async def per_prompt(record, latency: float):
+    async with stdio_client(BATCH_SERVER) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            responses = await asyncio.gather(*(session.call_tool(name, args)
+                                               for name, args in record["tools"].items()))
+            values = {name: response.content[0].text for name, response in zip(record["tools"], responses)}
+            async with AsyncBedrock(client=StubBedrockClient(latency)) as bedrock:
+                await bedrock.ask(record["prompt"].format(**values))
+
+
+async def main(prompts: int, cold: int, latency: float, concurrencies):
+    print(f"{latency}s fake model latency")
+    start = time.perf_counter()
+    for record in sample_prompts(cold):
+        await per_prompt(record, latency)
+    wall = time.perf_counter() - start
+    print(f"{'per prompt':<14} n={cold:<5} wall={wall:6.2f}s  {cold / wall:7.1f} prompts/s")
+
+    async with MCPSessionPool(BATCH_SERVER, size=1) as pool:
+        for concurrency in concurrencies:
+            async with AsyncBedrock(client=StubBedrockClient(latency), max_concurrency=concurrency) as bedrock:
+                runner = BatchRunner(pool, bedrock, concurrency, progress_every=3600)
+                summary = await runner.run(sample_prompts(prompts), io.StringIO())
+            print(f"{f'batch x{concurrency}':<14} n={prompts:<5} wall={summary['wall_seconds']:6.2f}s  "
+                  f"{summary['prompts_per_second']:7.1f} prompts/s  p50={summary['p50_ms']:6.0f}ms "
+                  f"p95={summary['p95_ms']:6.0f}ms  failed={summary['failed']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--cold", type=int, default=10, help="prompts for the process-per-prompt baseline")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    asyncio.run(main(args.prompts, args.cold, args.latency, args.concurrency))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Bedrock calls with and without the response cache, fully offline
+Sends a workload of prompts where each distinct prompt repeats --repeats times
+(like an eval or batch job rerun) through AsyncBedrock with StubBedrockClient:
+
+No cache:   every request reaches the model
+Cold cache: the first request per prompt does, concurrent duplicates wait for it
+Warm cache: a second run over the same cache file, e.g. the next day's rerun
+
+Every request sets temperature 0, which is what makes it cacheable. Then shows
+LRU eviction under a small max_bytes, TTL expiry, and that sampled requests
+(temperature above 0, or not set) bypass the cache.
+
+Run with: uv run python benchmark_cache.py --prompts 20 --repeats 5 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from bedrock_async import DEFAULT_MODEL_ID, AsyncBedrock
+from fake_bedrock import StubBedrockClient
+from response_cache import ResponseCache
+
+
+async def run(label: str, prompts, latency: float, max_concurrency: int, cache=None):
+    stub = StubBedrockClient(latency)
+    async with AsyncBedrock(client=stub, max_concurrency=max_concurrency, cache=cache) as bedrock:
+        start = time.perf_counter()
+        await asyncio.gather(*(bedrock.ask(prompt, temperature=0) for prompt in prompts))
+        wall = time.perf_counter() - start
+    line = f"{label:<11} wall={wall:6.2f}s  model calls={sum(stub.calls.values()):4d}"
+    if cache is not None:
+        stats = cache.stats
+        line += (f"  hits={stats['hits']:4d} misses={stats['misses']:4d} coalesced={stats['coalesced']:3d}"
+                 f"  entries={len(cache)} ({cache.size_bytes / 1024:.1f} KiB)")
+    print(line)
+
+
+async def main(distinct: int, repeats: int, latency: float, max_concurrency: int):
+    prompts = [f"Summarize document {i % distinct}" for i in range(distinct * repeats)]
+    print(f"{len(prompts)} requests, {distinct} distinct prompts, {latency}s fake model latency, "
+          f"{max_concurrency} workers")
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "bedrock.db"
+        await run("no cache", prompts, latency, max_concurrency)
+        cache = ResponseCache(path)
+        await run("cold cache", prompts, latency, max_concurrency, cache)
+        cache.close()
+        cache = ResponseCache(path)  # fresh process: everything comes from disk
+        await run("warm cache", prompts, latency, max_concurrency, cache)
+        cache.close()
+
+        # Room for about a quarter of the responses: the least recently used go first, so
+        # repeats that arrive close together still hit (cycling through all prompts would not)
+        entry = cache.size_bytes // distinct
+        small = ResponseCache(Path(workdir) / "small.db", max_bytes=entry * max(1, distinct // 4))
+        await run("small cache", sorted(prompts), latency, max_concurrency, small)
+        print(f"  max_bytes={small.max_bytes} kept {len(small)} of {distinct} responses, "
+              f"{small.stats['evictions']} evicted")
+
+        stale = ResponseCache(Path(workdir) / "stale.db", ttl_seconds=0.05)
+        body = {"temperature": 0, "messages": [{"role": "user", "content": "hi"}]}
+        stale.fetch(DEFAULT_MODEL_ID, body, lambda: {"n": 1})
+        time.sleep(0.1)
+        stale.fetch(DEFAULT_MODEL_ID, body, lambda: {"n": 2})
+        print(f"  ttl_seconds=0.05: {stale.stats['expired']} expired, {stale.stats['misses']} misses")
+
+        for label, sampled in (("temperature=0.7", {"temperature": 0.7}), ("no temperature", {}),
+                               ("temperature=0, top_p=0.9", {"temperature": 0, "top_p": 0.9})):
+            bypassed = stale.stats["bypassed"]
+            for _ in range(3):
+                stale.fetch(DEFAULT_MODEL_ID, dict(sampled, messages=[{"role": "user", "content": "hi"}]),
+                            lambda: {"n": 3})
+            print(f"  {label}: {stale.stats['bypassed'] - bypassed} of 3 requests bypassed the cache")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=20, help="distinct prompts")
+    parser.add_argument("--repeats", type=int, default=5, help="times each prompt is sent")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.prompts, args.repeats, args.latency, args.max_concurrency))
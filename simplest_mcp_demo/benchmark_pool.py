@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cold vs pooled MCP tool-call latency against the local mcp_server/server.py
+
+Cold:   every call starts the server subprocess, initializes a session, calls
+        the tool and tears everything down (what mcp_client.py used to do).
+Pooled: calls go through a warm MCPSessionPool, one at a time and concurrently.
+
+Run with: uv run python benchmark_pool.py --calls 20 --pool-size 2 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from mcp import ClientSession
+from mcp.client.stdio import stdio_client
+
+from mcp_pool import LOCAL_SERVER, MCPSessionPool
+
+
+def summarize(label: str, latencies: list, wall: float):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<22} n={len(latencies):<4} mean={statistics.mean(latencies) * 1000:8.1f}ms "
+          f"p50={statistics.median(latencies) * 1000:8.1f}ms p95={p95 * 1000:8.1f}ms "
+          f"throughput={len(latencies) / wall:8.1f} calls/s")
+
+
+async def cold_call():
+    start = time.perf_counter()
+    async with stdio_client(LOCAL_SERVER) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool("hello", {"name": "Benchmark"})
+    return time.perf_counter() - start
+
+
+async def pooled_call(pool: MCPSessionPool):
+    start = time.perf_counter()
+    await pool.call_tool("hello", {"name": "Benchmark"})
+    return time.perf_counter() - start
+
+
+async def main(calls: int, pool_size: int, concurrency: int):
+    start = time.perf_counter()
+    cold = [await cold_call() for _ in range(calls)]
+    summarize("cold (spawn per call)", cold, time.perf_counter() - start)
+
+    async with MCPSessionPool(LOCAL_SERVER, size=pool_size) as pool:
+        await pooled_call(pool)  # warm-up
+
+        start = time.perf_counter()
+        sequential = [await pooled_call(pool) for _ in range(calls)]
+        summarize("pooled sequential", sequential, time.perf_counter() - start)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with semaphore:
+                return await pooled_call(pool)
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*[bounded() for _ in range(calls * concurrency)])
+        summarize(f"pooled x{concurrency} concurrent", concurrent, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.pool_size, args.concurrency))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Bedrock Runtime invoke_model endpoint (Anthropic messages format)
+Answers every request after a fixed latency so overlap can be measured offline.
+StubBedrockClient does the same in process, without HTTP, for AsyncBedrock(client=...).
+
+Run with: python fake_bedrock.py --port 8765 --latency 1.0
+Then:     BEDROCK_ENDPOINT_URL=http://127.0.0.1:8765 BEDROCK_FAKE_ENDPOINT=1 uv run python mcp_client.py
+"""
+
+import argparse
+import io
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_reply(body: dict) -> dict:
+    """Anthropic messages response echoing the last user message"""
+    prompt = body.get("messages", [{}])[-1].get("content", "")
+    return {
+        "id": "msg_fake",
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": f"(fake) You said: {prompt}"}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 8},
+    }
+
+
+class StubBedrockClient:
+    """Stand-in for boto3's bedrock-runtime client: invoke_model sleeps latency seconds and echoes"""
+
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+        self.calls = Counter()  # modelId -> invoke_model calls
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId: str, body, contentType: str = "application/json", **kwargs):
+        with self._lock:
+            self.calls[modelId] += 1
+        time.sleep(self.latency)
+        payload = json.dumps(fake_reply(json.loads(body))).encode()
+        return {"body": io.BytesIO(payload), "contentType": "application/json"}
+
+
+class FakeBedrockHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+
+    def do_POST(self):
+        # Path looks like /model/<modelId>/invoke
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency)
+
+        payload = json.dumps(fake_reply(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+def start_fake_bedrock(latency: float = 0.5, port: int = 0):
+    """Start the fake in a background thread; returns (server, endpoint_url)"""
+    handler = type("Handler", (FakeBedrockHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-bedrock", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per invoke_model")
+    args = parser.parse_args()
+    server, url = start_fake_bedrock(args.latency, args.port)
+    print(f"Fake Bedrock listening on {url} (latency {args.latency}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load generator for the MCP server over streamable HTTP or SSE
+Opens --clients independent MCP sessions and keeps each one busy for --duration
+seconds, alternating `hello` and `get_current_datetime` calls. Reports throughput,
+p50/p99 latency per tool, and the server's own per-tool timings from /stats.
+
+Against a running server:
+    python mcp_server/server.py --transport streamable-http --port 8000 --workers 16 --log-level WARNING
+    uv run python load_test.py --url http://127.0.0.1:8000 --clients 50 --duration 10
+Or let the script start the server itself:
+    uv run python load_test.py --spawn --workers 16 --clients 50
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+CALLS = [("hello", {"name": "Load"}), ("get_current_datetime", {})]
+
+
+def percentile(values, q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def connect(url: str, transport: str):
+    if transport == "sse":
+        return sse_client(f"{url}/sse")
+    return streamablehttp_client(f"{url}/mcp")
+
+
+async def client_loop(index: int, url: str, transport: str, deadline: float, latencies, errors):
+    async with connect(url, transport) as streams:
+        read, write = streams[0], streams[1]
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            i = index  # stagger so clients don't all call the same tool at once
+            while time.perf_counter() < deadline:
+                name, arguments = CALLS[i % len(CALLS)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    result = await session.call_tool(name, arguments)
+                    if result.isError:
+                        raise RuntimeError(result.content[0].text)
+                    latencies[name].append(time.perf_counter() - start)
+                except Exception:
+                    errors[name] += 1
+
+
+def wait_for_port(port: int, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def spawn_server(transport: str, workers: int, stateless: bool):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    cmd = [sys.executable, "-m", "mcp_server.server", "--transport", transport, "--port", str(port),
+           "--workers", str(workers), "--log-level", "WARNING"]
+    if stateless:
+        cmd.append("--stateless")
+    process = subprocess.Popen(cmd, cwd=Path(__file__).resolve().parent)
+    wait_for_port(port)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def run(url: str, transport: str, clients: int, duration: float):
+    latencies, errors = defaultdict(list), defaultdict(int)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[client_loop(i, url, transport, deadline, latencies, errors) for i in range(clients)],
+        return_exceptions=True,
+    )
+    wall = time.perf_counter() - start
+    failed_clients = [r for r in results if isinstance(r, BaseException)]
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{clients} clients, {transport}, {wall:.1f}s: {total} calls, {total / wall:.1f} calls/s, "
+          f"{sum(errors.values())} errors, {len(failed_clients)} clients failed")
+    if failed_clients:
+        print(f"  first client failure: {failed_clients[0]!r}")
+    for name, values in sorted(latencies.items()):
+        print(f"  {name:<22} n={len(values):<7} p50={percentile(values, 50) * 1000:7.2f}ms "
+              f"p99={percentile(values, 99) * 1000:7.2f}ms")
+
+    try:
+        with urllib.request.urlopen(f"{url}/stats", timeout=5) as response:
+            print("Server-side timings:")
+            print(json.dumps(json.loads(response.read()), indent=2))
+    except Exception as e:
+        print(f"(server stats unavailable: {e})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server base URL (ignored with --spawn)")
+    parser.add_argument("--transport", choices=["streamable-http", "sse"], default="streamable-http")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--spawn", action="store_true", help="start mcp_server.server on a free port")
+    parser.add_argument("--workers", type=int, default=8, help="server tool workers (with --spawn)")
+    parser.add_argument("--stateless", action="store_true", help="stateless streamable-http (with --spawn)")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url.rstrip("/")
+    if args.spawn:
+        process, url = spawn_server(args.transport, args.workers, args.stateless)
+    try:
+        asyncio.run(run(url, args.transport, args.clients, args.duration))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 
 import asyncio
-import json
-import boto3
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from bedrock_async import AsyncBedrock
+
 async def main():
     # ========================================
     # MCP SERVER AUTO-START CONFIGURATION
@@ -40,14 +40,14 @@ async def main():
             # ========================================
             # CALLING MCP SERVER TOOLS
             # ========================================
-            # Now we can call tools provided by our auto-started server
-            
-            # Call the 'get_current_datetime' tool from the server
-            time_result = await session.call_tool("get_current_datetime", {})
+            # Now we can call tools provided by our auto-started server.
+            # The two calls are independent, so send both at once and wait for
+            # both results (one session handles several requests in flight).
+            time_result, hello_result = await asyncio.gather(
+                session.call_tool("get_current_datetime", {}),
+                session.call_tool("hello", {"name": "Bedrock Agent"}),
+            )
             current_time = time_result.content[0].text
-            
-            # Call the 'hello' tool from the server with a parameter
-            hello_result = await session.call_tool("hello", {"name": "Bedrock Agent"})
             greeting = hello_result.content[0].text
             
             print(f"MCP Time: {current_time}")
@@ -56,25 +56,14 @@ async def main():
             # ========================================
             # AWS BEDROCK INTEGRATION
             # ========================================
-            # Use the results from MCP server tools as input to AWS Bedrock
-            bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-            
+            # Use the results from MCP server tools as input to AWS Bedrock.
+            # boto3 is synchronous, so AsyncBedrock runs invoke_model on a small
+            # thread pool and the event loop stays free for other coroutines.
+            # Set BEDROCK_ENDPOINT_URL and BEDROCK_FAKE_ENDPOINT=1 to use a local fake (see fake_bedrock.py).
             prompt = f"I got the current time: {current_time} and a greeting: {greeting}. Create a brief, friendly response."
             
-            body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 100,
-                "messages": [{"role": "user", "content": prompt}]
-            }
-            
-            response = bedrock.invoke_model(
-                modelId="anthropic.claude-3-haiku-20240307-v1:0",
-                body=json.dumps(body),
-                contentType="application/json"
-            )
-            
-            result = json.loads(response['body'].read())
-            bedrock_response = result['content'][0]['text']
+            async with AsyncBedrock(region_name='us-east-1') as bedrock:
+                bedrock_response = await bedrock.ask(prompt, max_tokens=100)
             
             print(f"Bedrock Agent: {bedrock_response}")
     
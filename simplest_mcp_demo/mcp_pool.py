@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Pool of warm MCP server sessions shared by many coroutines"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+
+logger = logging.getLogger(__name__)
+
+# The local demo server, started with the current interpreter from this folder
+LOCAL_SERVER = StdioServerParameters(
+    command=sys.executable,
+    args=["-m", "mcp_server.server"],
+    cwd=str(Path(__file__).resolve().parent),
+)
+
+
+class _Slot:
+    """One server subprocess + initialized ClientSession, owned by its own task"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.restarts = 0
+        self.restart = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class MCPSessionPool:
+    """Keeps `size` MCP server sessions warm and spreads call_tool across them.
+
+    Each session is opened and closed inside its own task (stdio_client needs
+    that), pinged every health_check_interval seconds and restarted with backoff
+    when it crashes, times out or fails a ping. call_tool picks the least busy
+    ready session and retries once on another session after a transport error.
+    If no session is ready within startup_timeout seconds (e.g. a wrong server
+    command), start() and call_tool raise with the last startup error.
+
+        async with MCPSessionPool(LOCAL_SERVER, size=2) as pool:
+            result = await pool.call_tool("hello", {"name": "Pool"})
+    """
+
+    def __init__(self, server_params: StdioServerParameters = LOCAL_SERVER, size: int = 2,
+                 health_check_interval: float = 30.0, call_timeout: float = 30.0,
+                 restart_backoff: float = 0.5, max_restart_backoff: float = 10.0, startup_timeout: float = 30.0):
+        self.server_params = server_params
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.call_timeout = call_timeout
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.startup_timeout = startup_timeout
+        self.last_error: Optional[BaseException] = None  # why the last session failed to start
+        self.stats = {"calls": 0, "retries": 0, "restarts": 0}
+        self._slots: List[_Slot] = []
+        self._changed: Optional[asyncio.Condition] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self, wait: bool = True):
+        """Spawn the server sessions; by default wait until at least one is ready"""
+        self._changed = asyncio.Condition()
+        self._slots = [_Slot(i) for i in range(self.size)]
+        for slot in self._slots:
+            slot.task = asyncio.create_task(self._run_slot(slot), name=f"mcp-session-{slot.index}")
+        self._health_task = asyncio.create_task(self._health_loop(), name="mcp-health")
+        if wait:
+            try:
+                await self._ready_slot()
+            except Exception:
+                await self.close()  # stop the restart loops; __aexit__ won't run
+                raise
+
+    async def close(self):
+        self._closing = True
+        for slot in self._slots:
+            slot.restart.set()
+        tasks = [slot.task for slot in self._slots if slot.task] + [self._health_task]
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*[t for t in tasks if t], return_exceptions=True)
+
+    @property
+    def ready(self) -> int:
+        return sum(1 for slot in self._slots if slot.session is not None)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None):
+        """Call a tool on the least busy ready session (safe to use from many coroutines)"""
+        self.stats["calls"] += 1
+        for attempt in range(2):
+            slot = await self._ready_slot()
+            session = slot.session
+            slot.in_flight += 1
+            try:
+                return await asyncio.wait_for(session.call_tool(name, arguments or {}), self.call_timeout)
+            except McpError:
+                raise  # the server answered with an error; the session itself is fine
+            except Exception as e:
+                logger.warning("MCP session %d failed (%r); restarting it", slot.index, e)
+                self._restart(slot, session)
+                if attempt:
+                    raise
+                self.stats["retries"] += 1
+            finally:
+                slot.in_flight -= 1
+
+    async def list_tools(self):
+        slot = await self._ready_slot()
+        return await asyncio.wait_for(slot.session.list_tools(), self.call_timeout)
+
+    async def _ready_slot(self) -> _Slot:
+        try:
+            await asyncio.wait_for(self._wait_ready(), self.startup_timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No MCP session ready after {self.startup_timeout:g}s "
+                               f"(last startup error: {self.last_error!r})") from self.last_error
+        if self._closing:
+            raise RuntimeError("MCPSessionPool is closed")
+        return min((s for s in self._slots if s.session is not None), key=lambda s: s.in_flight)
+
+    async def _wait_ready(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.ready > 0 or self._closing)
+
+    def _restart(self, slot: _Slot, session: ClientSession):
+        # Ignore reports about a session that has already been replaced
+        if slot.session is session:
+            slot.session = None  # stop routing calls to it right away
+            slot.restart.set()
+
+    async def _set_session(self, slot: _Slot, session: Optional[ClientSession]):
+        slot.session = session
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _run_slot(self, slot: _Slot):
+        backoff = self.restart_backoff
+        while not self._closing:
+            try:
+                async with stdio_client(self.server_params) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await asyncio.wait_for(session.initialize(), self.call_timeout)
+                        self.last_error = None
+                        await self._set_session(slot, session)
+                        backoff = self.restart_backoff
+                        await slot.restart.wait()
+            except Exception as e:
+                logger.warning("MCP session %d stopped: %r", slot.index, e)
+                if slot.session is None:
+                    self.last_error = e  # never got ready
+            finally:
+                await self._set_session(slot, None)
+            if self._closing:
+                return
+            slot.restart.clear()
+            slot.restarts += 1
+            self.stats["restarts"] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_restart_backoff)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for slot in self._slots:
+                session = slot.session
+                if session is None:
+                    continue
+                try:
+                    await asyncio.wait_for(session.send_ping(), self.call_timeout)
+                except Exception as e:
+                    logger.warning("MCP session %d failed health check (%r)", slot.index, e)
+                    self._restart(slot, session)
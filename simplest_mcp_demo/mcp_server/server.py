@@ -1,20 +1,119 @@
 #!/usr/bin/env python3
-"""Simplest MCP Server"""
+"""Simplest MCP Server
 
+Run over stdio (default, one client process):
+    python mcp_server/server.py
+Or over the network for many concurrent clients:
+    python mcp_server/server.py --transport streamable-http --port 8000 --workers 16
+"""
+
+import argparse
+import functools
+import logging
+import statistics
+import time
+from collections import deque
 from datetime import datetime
+
+import anyio
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 mcp = FastMCP("simple-server")
 
+
+class ToolStats:
+    """Per-tool call counts and latencies (time waiting for a worker + time running)"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._tools = {}
+
+    def record(self, name: str, wait: float, run: float, ok: bool):
+        tool = self._tools.setdefault(name, {
+            "calls": 0, "errors": 0, "wait": deque(maxlen=self.window), "run": deque(maxlen=self.window)
+        })
+        tool["calls"] += 1
+        tool["errors"] += 0 if ok else 1
+        tool["wait"].append(wait)
+        tool["run"].append(run)
+
+    def snapshot(self) -> dict:
+        return {name: {
+            "calls": tool["calls"],
+            "errors": tool["errors"],
+            "wait_p50_ms": _percentile_ms(tool["wait"], 50),
+            "run_p50_ms": _percentile_ms(tool["run"], 50),
+            "run_p99_ms": _percentile_ms(tool["run"], 99),
+        } for name, tool in self._tools.items()}
+
+
+def _percentile_ms(values, q: int):
+    if len(values) < 2:
+        return round(values[0] * 1000, 3) if values else None
+    return round(statistics.quantiles(values, n=100, method="inclusive")[q - 1] * 1000, 3)
+
+
+tool_stats = ToolStats()
+
+# Sync tools run on worker threads so a slow tool never stalls the event loop
+# serving other clients; --workers sets how many may run at once. The thread
+# limiter is sized to match, so time spent queued shows up as wait in tool_stats.
+_workers = anyio.CapacityLimiter(8)
+_threads = anyio.CapacityLimiter(8)
+
+
+def timed(fn):
+    """Run a sync tool on the worker pool and record its timing in tool_stats"""
+    @functools.wraps(fn)
+    async def wrapper(**kwargs):
+        queued = time.perf_counter()
+        async with _workers:
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = await anyio.to_thread.run_sync(functools.partial(fn, **kwargs), limiter=_threads)
+                ok = True
+                return result
+            finally:
+                tool_stats.record(fn.__name__, started - queued, time.perf_counter() - started, ok)
+    return wrapper
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Per-tool timings (HTTP transports only)"""
+    return JSONResponse({"workers": _workers.total_tokens, "tools": tool_stats.snapshot()})
+
+
 @mcp.tool()
+@timed
 def hello(name: str = "World") -> str:
     """Say hello to someone"""
     return f"Hello, {name}!"
 
 @mcp.tool()
+@timed
 def get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S") -> str:
     """Get the current date and time in the specified format"""
     return datetime.now().strftime(format)
 
 if __name__ == "__main__":
-    mcp.run()
+    parser = argparse.ArgumentParser(description="Simplest MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="tool calls allowed to run at once")
+    parser.add_argument("--stateless", action="store_true",
+                        help="streamable-http without per-client sessions (cheaper, horizontally scalable)")
+    parser.add_argument("--log-level", default="INFO", help="use WARNING under load; per-request INFO logs are costly")
+    args = parser.parse_args()
+
+    _workers.total_tokens = _threads.total_tokens = args.workers
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.settings.stateless_http = args.stateless
+    mcp.settings.log_level = args.log_level.upper()
+    logging.getLogger().setLevel(mcp.settings.log_level)
+    mcp.run(transport=args.transport)
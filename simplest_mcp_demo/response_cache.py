@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Disk-backed cache of Bedrock invoke_model responses, keyed by model and request body"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model_id TEXT NOT NULL,
+    response BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+"""
+
+
+def cache_key(model_id: str, body: Dict[str, Any]) -> str:
+    """sha256 of the model id and the canonical JSON body (sorted keys, no whitespace)"""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{model_id}\n{canonical}".encode()).hexdigest()
+
+
+def is_deterministic(body: Dict[str, Any]) -> bool:
+    """True only for an explicit temperature of 0 without top_p/top_k sampling.
+
+    Bedrock's Anthropic models default to temperature 1.0, so a body that doesn't
+    set one samples and may answer differently on every call.
+    """
+    return body.get("temperature") == 0 and "top_p" not in body and "top_k" not in body
+
+
+class ResponseCache:
+    """LRU + TTL cache of invoke_model responses in a SQLite file.
+
+    Entries are content-addressed by cache_key(), so the same prompt with the
+    same parameters is answered from disk, also by later runs. Once the stored
+    responses exceed max_bytes the least recently used are evicted; entries
+    older than ttl_seconds count as misses. Concurrent misses for the same key
+    wait for the first call instead of repeating it. Safe to use from threads.
+
+        cache = ResponseCache("~/.cache/mcp-demo/bedrock.db")
+        response = cache.fetch(model_id, body, lambda: call_bedrock(model_id, body))
+    """
+
+    def __init__(self, path, max_bytes: int = 64 * 2**20, ttl_seconds: Optional[float] = 7 * 86400):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "coalesced": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, threading.Lock] = {}
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and row[2] + self.ttl_seconds <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= row[1]
+                self.stats["expired"] += 1
+                row = None
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, model_id: str, response: Dict[str, Any]):
+        data = json.dumps(response, separators=(",", ":")).encode()
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, model_id, data, len(data), now, now))
+            self._bytes += len(data) - (old[0] if old else 0)
+            self._evict()
+
+    def fetch(self, model_id: str, body: Dict[str, Any], call: Callable[[], Dict[str, Any]],
+              cache: Optional[bool] = None) -> Dict[str, Any]:
+        """Cached response for (model_id, body), or call() and store its result.
+
+        cache=None caches only deterministic bodies (temperature 0, see is_deterministic),
+        cache=False always calls, cache=True caches regardless.
+        """
+        if cache is False or (cache is None and not is_deterministic(body)):
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return call()
+        key = cache_key(model_id, body)
+        response = self.get(key)
+        if response is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return response
+        with self._lock:
+            key_lock = self._in_flight.setdefault(key, threading.Lock())
+        with key_lock:
+            response = self.get(key)  # filled in while we waited for the same request
+            if response is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["coalesced"] += 1
+                return response
+            with self._lock:
+                self.stats["misses"] += 1
+            try:
+                response = call()
+                self.put(key, model_id, response)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (called with the lock held)"""
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 32").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                self.stats["evictions"] += 1